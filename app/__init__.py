@@ -2,18 +2,24 @@ from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
 from flask_jwt_extended import JWTManager
 from flask_cors import CORS
-from flasgger import Swagger
 
 from app.config import config
+from app.session import RoutingSession
 
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 jwt = JWTManager()
 
 
 def create_app(config_name='default'):
     """Application factory."""
     app = Flask(__name__)
-    app.config.from_object(config[config_name])
+    # Unknown names (e.g. FLASK_ENV=staging) get the default config
+    app.config.from_object(config.get(config_name, config['default']))
+
+    # Client IPs (used by the rate limiter) from the trusted proxies
+    if app.config.get('TRUSTED_PROXIES'):
+        from werkzeug.middleware.proxy_fix import ProxyFix
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=app.config['TRUSTED_PROXIES'])
 
     # Initialize extensions
     db.init_app(app)
@@ -27,41 +33,15 @@ def create_app(config_name='default'):
         "supports_credentials": True
     }})
 
-    # Swagger configuration
-    swagger_config = {
-        "headers": [],
-        "specs": [
-            {
-                "endpoint": "apispec",
-                "route": "/apispec.json",
-                "rule_filter": lambda rule: True,
-                "model_filter": lambda tag: True,
-            }
-        ],
-        "static_url_path": "/flasgger_static",
-        "swagger_ui": True,
-        "specs_route": "/api-docs"
-    }
-
-    swagger_template = {
-        "swagger": "2.0",
-        "info": {
-            "title": "Gym Flow API",
-            "description": "API documentation for the Gym Flow application - A comprehensive gym management system",
-            "version": "1.0.0"
-        },
-        "securityDefinitions": {
-            "Bearer": {
-                "type": "apiKey",
-                "name": "Authorization",
-                "in": "header",
-                "description": "JWT Authorization header using the Bearer scheme. Example: 'Bearer {token}'"
-            }
-        },
-        "security": [{"Bearer": []}]
-    }
-
-    Swagger(app, config=swagger_config, template=swagger_template)
+    # API docs: flasgger in development, prebuilt spec in production
+    from app.apispec import init_api_docs
+    init_api_docs(app)
+
+    from app.middleware.auth import init_auth
+    init_auth(app)
+
+    from app.middleware.rate_limit import init_rate_limit
+    init_rate_limit(app)
 
     # Register blueprints
     from app.routes.auth import auth_bp
@@ -71,7 +51,9 @@ def create_app(config_name='default'):
     from app.routes.reports import reports_bp
     from app.routes.admin_reports import admin_reports_bp
     from app.routes.admin_invites import admin_invites_bp
+    from app.routes.admin_users import admin_users_bp
     from app.routes.member_requests import member_requests_bp
+    from app.routes.internal import internal_bp
 
     app.register_blueprint(auth_bp, url_prefix='/api/auth')
     app.register_blueprint(members_bp, url_prefix='/api/members')
@@ -80,7 +62,9 @@ def create_app(config_name='default'):
     app.register_blueprint(reports_bp, url_prefix='/api/reports')
     app.register_blueprint(admin_reports_bp, url_prefix='/api/admin/reports')
     app.register_blueprint(admin_invites_bp, url_prefix='/api/admin/invites')
+    app.register_blueprint(admin_users_bp, url_prefix='/api/admin/users')
     app.register_blueprint(member_requests_bp, url_prefix='/api/member-requests')
+    app.register_blueprint(internal_bp, url_prefix='/api/internal')
 
     # Root route
     @app.route('/')
@@ -98,48 +82,19 @@ def create_app(config_name='default'):
         from datetime import datetime
         return {'status': 'ok', 'timestamp': datetime.utcnow().isoformat()}
 
-    # Create tables and seed data (non-blocking)
-    try:
-        with app.app_context():
-            # Import all models to register them with SQLAlchemy
-            from app.models import User, Member, Attendance, Workout, AdminInvite, MemberRequest
-            
-            try:
-                db.create_all()
-                print("Database tables created successfully")
-            except Exception as e:
-                print(f"Database create error: {e}")
-
-            # Seed admin user if not exists
-            try:
-                from app.models.user import User
-                admin = User.query.filter_by(email='admin@example.com').first()
-                if not admin:
-                    admin = User(
-                        name='Admin User',
-                        email='admin@example.com',
-                        role='admin'
-                    )
-                    admin.set_password('password123')
-                    db.session.add(admin)
-                    db.session.commit()
-                    print("Admin user created: admin@example.com")
-
-                # Seed test user if not exists
-                test_user = User.query.filter_by(email='user@example.com').first()
-                if not test_user:
-                    test_user = User(
-                        name='Test User',
-                        email='user@example.com',
-                        role='user'
-                    )
-                    test_user.set_password('password123')
-                    db.session.add(test_user)
-                    db.session.commit()
-                    print("Test user created: user@example.com")
-            except Exception as e:
-                print(f"Seed error: {e}")
-    except Exception as e:
-        print(f"Database init skipped: {e}")
+    # Schema creation and seeding run once per deploy via `flask bootstrap-db`
+    # (see app/bootstrap.py), so building the app does no database I/O.
+    from app.bootstrap import bootstrap_db_command
+    from app.apispec import build_apispec_command
+    from app.sweeper import sweep_expired_command
+    from app.memberships import expire_memberships_command
+    from app.search import rebuild_search_index_command
+    from app.rollups import rebuild_attendance_rollups_command
+    app.cli.add_command(bootstrap_db_command)
+    app.cli.add_command(build_apispec_command)
+    app.cli.add_command(sweep_expired_command)
+    app.cli.add_command(expire_memberships_command)
+    app.cli.add_command(rebuild_search_index_command)
+    app.cli.add_command(rebuild_attendance_rollups_command)
 
     return app
@@ -0,0 +1,178 @@
+"""
+API Documentation (OpenAPI / Swagger)
+=====================================
+Purpose: Serve the API spec and Swagger UI without paying for flasgger on
+every worker.
+
+Modes (API_SPEC_MODE):
+  dynamic  - flasgger is initialised in create_app and walks the view
+             docstrings to build /apispec.json (development default).
+  prebuilt - /apispec.json serves the bytes written by
+             `flask build-apispec`, with a strong ETag. flasgger is only
+             imported when /api-docs assets are requested, or once if the
+             prebuilt file is missing (production default).
+
+Build step:
+  flask --app run build-apispec [--output apispec.json]
+"""
+
+import hashlib
+import json
+import os
+import threading
+
+import click
+from flask import Response, current_app, request, send_from_directory
+from flask.cli import with_appcontext
+
+SPEC_ENDPOINT = 'apispec'
+SPEC_ROUTE = '/apispec.json'
+DOCS_ROUTE = '/api-docs'
+STATIC_URL_PATH = '/flasgger_static'
+
+SWAGGER_CONFIG = {
+    "headers": [],
+    "specs": [
+        {
+            "endpoint": SPEC_ENDPOINT,
+            "route": SPEC_ROUTE,
+            "rule_filter": lambda rule: True,
+            "model_filter": lambda tag: True,
+        }
+    ],
+    "static_url_path": STATIC_URL_PATH,
+    "swagger_ui": True,
+    "specs_route": DOCS_ROUTE
+}
+
+SWAGGER_TEMPLATE = {
+    "swagger": "2.0",
+    "info": {
+        "title": "Gym Flow API",
+        "description": "API documentation for the Gym Flow application - A comprehensive gym management system",
+        "version": "1.0.0"
+    },
+    "securityDefinitions": {
+        "Bearer": {
+            "type": "apiKey",
+            "name": "Authorization",
+            "in": "header",
+            "description": "JWT Authorization header using the Bearer scheme. Example: 'Bearer {token}'"
+        }
+    },
+    "security": [{"Bearer": []}]
+}
+
+DOCS_PAGE = """<!DOCTYPE html>
+<html>
+<head>
+  <meta charset="utf-8">
+  <title>{title}</title>
+  <link rel="stylesheet" href="{static}/swagger-ui.css">
+</head>
+<body>
+  <div id="swagger-ui"></div>
+  <script src="{static}/swagger-ui-bundle.js"></script>
+  <script src="{static}/swagger-ui-standalone-preset.js"></script>
+  <script>
+    window.ui = SwaggerUIBundle({{
+      url: "{spec}",
+      dom_id: "#swagger-ui",
+      presets: [SwaggerUIBundle.presets.apis, SwaggerUIStandalonePreset],
+      layout: "StandaloneLayout"
+    }});
+  </script>
+</body>
+</html>
+"""
+
+
+def generate_spec(app):
+    """Build the spec dict by walking the app's view docstrings."""
+    from flasgger import Swagger
+
+    # An unattached Swagger instance: it only needs the config, the
+    # template and the app's url_map, not its views or url_rule wrapper.
+    swagger = Swagger(config=dict(SWAGGER_CONFIG), template=SWAGGER_TEMPLATE)
+    swagger.app = app
+    swagger.load_config(app)
+    with app.app_context():
+        return swagger.get_apispecs(SPEC_ENDPOINT)
+
+
+def serialize_spec(spec):
+    """Serialize a spec to stable (byte-for-byte reproducible) JSON."""
+    return json.dumps(spec, sort_keys=True, separators=(',', ':')).encode('utf-8')
+
+
+class PrebuiltSpec:
+    """The serialized spec and its ETag, loaded once per process."""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._body = None
+        self.etag = None
+
+    def load(self, app):
+        if self._body is None:
+            with self._lock:
+                if self._body is None:
+                    if os.path.exists(self.path):
+                        with open(self.path, 'rb') as f:
+                            body = f.read()
+                    else:
+                        app.logger.warning(
+                            'Prebuilt API spec %s not found; generating it in-process. '
+                            'Run `flask build-apispec` during the build.', self.path)
+                        body = serialize_spec(generate_spec(app))
+                    self.etag = hashlib.sha256(body).hexdigest()
+                    self._body = body
+        return self._body
+
+
+def init_api_docs(app):
+    """Register /apispec.json and /api-docs according to API_SPEC_MODE."""
+    if app.config.get('API_SPEC_MODE', 'dynamic') == 'dynamic':
+        from flasgger import Swagger
+        Swagger(app, config=dict(SWAGGER_CONFIG), template=SWAGGER_TEMPLATE)
+        return
+
+    prebuilt = PrebuiltSpec(app.config['API_SPEC_PATH'])
+
+    @app.route(SPEC_ROUTE, endpoint=SPEC_ENDPOINT)
+    def apispec():
+        body = prebuilt.load(current_app._get_current_object())
+        response = Response(body, mimetype='application/json')
+        response.set_etag(prebuilt.etag)
+        response.headers['Cache-Control'] = 'no-cache'
+        return response.make_conditional(request)
+
+    @app.route(DOCS_ROUTE, endpoint='apidocs')
+    def apidocs():
+        return DOCS_PAGE.format(
+            title=SWAGGER_TEMPLATE['info']['title'],
+            static=STATIC_URL_PATH,
+            spec=SPEC_ROUTE
+        )
+
+    @app.route(f'{STATIC_URL_PATH}/<path:filename>', endpoint='apidocs_static')
+    def apidocs_static(filename):
+        # flasgger is imported here, on the first docs request, only to
+        # locate its bundled Swagger UI assets.
+        import flasgger
+        static_folder = os.path.join(os.path.dirname(flasgger.__file__), 'ui3', 'static')
+        return send_from_directory(static_folder, filename, max_age=86400)
+
+
+@click.command('build-apispec')
+@click.option('--output', '-o', default=None,
+              help='Where to write the spec (defaults to API_SPEC_PATH).')
+@with_appcontext
+def build_apispec_command(output):
+    """Generate the OpenAPI spec once and write it to disk."""
+    path = output or current_app.config['API_SPEC_PATH']
+    body = serialize_spec(generate_spec(current_app._get_current_object()))
+    with open(path, 'wb') as f:
+        f.write(body)
+    click.echo(f'API spec written to {path} ({len(body)} bytes)')
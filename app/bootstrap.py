@@ -0,0 +1,178 @@
+"""
+Database Bootstrap
+==================
+Purpose: One-shot schema creation and default-user seeding.
+
+This used to run inside create_app(), so every gunicorn worker (and every
+restart) paid for create_all() plus the seed lookups and bcrypt hashes.
+It now runs once per deploy, before the workers start. It also adds
+columns and indexes introduced by model changes to existing tables
+(create_all() only creates missing tables):
+
+  flask --app run bootstrap-db            # tables + default users
+  flask --app run bootstrap-db --no-seed  # tables only
+
+init_db.py and seed_db.py call the same functions.
+"""
+
+import click
+import sqlalchemy as sa
+from flask.cli import with_appcontext
+from app import db
+
+DEFAULT_USERS = [
+    {'name': 'Admin User', 'email': 'admin@example.com', 'role': 'admin'},
+    {'name': 'Test User', 'email': 'user@example.com', 'role': 'user'},
+]
+DEFAULT_PASSWORD = 'password123'
+
+
+def create_schema():
+    """Create missing tables and add new columns and indexes.
+
+    Returns (kind, name) pairs for what was added, e.g. ('Column', 'users.phone').
+    """
+    # Import all models to register them with SQLAlchemy
+    import app.models  # noqa: F401
+
+    db.create_all()
+    added = [('Column', name) for name in add_missing_columns()]
+    # Before the indexes: uq_attendances_member_date needs the dates
+    backfill_check_in_dates()
+    added += [('Index', name) for name in add_missing_indexes()]
+
+    # Member search index for tables created before it existed
+    from app.search import install_search_index
+    with db.engine.begin() as connection:
+        install_search_index(connection)
+    return added
+
+
+def add_missing_columns():
+    """Add model columns that existing tables lack. Returns 'table.column' names.
+
+    create_all() only creates missing tables. This covers additive model
+    changes, which must be nullable or carry a server_default.
+    """
+    engine = db.engine
+    inspector = sa.inspect(engine)
+    preparer = engine.dialect.identifier_preparer
+    added = []
+
+    for table in db.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {column['name'] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing:
+                continue
+            if not column.nullable and column.server_default is None:
+                raise RuntimeError(
+                    f'Cannot add NOT NULL column {table.name}.{column.name} without a server_default'
+                )
+            column_ddl = sa.schema.CreateColumn(column).compile(dialect=engine.dialect)
+            db.session.execute(sa.text(
+                f'ALTER TABLE {preparer.format_table(table)} ADD COLUMN {column_ddl}'
+            ))
+            added.append(f'{table.name}.{column.name}')
+
+    db.session.commit()
+    return added
+
+
+def backfill_check_in_dates():
+    """Fill attendances.check_in_date for rows that predate the column.
+
+    Only the first check-in of a member's day gets a date. Same-day
+    duplicates left by the old check-then-insert race keep NULL (which the
+    unique index ignores), so uq_attendances_member_date can be built.
+    Returns the number of rows updated.
+    """
+    from app.models import Attendance
+
+    sqlite = db.engine.dialect.name == 'sqlite'
+
+    def day(column):
+        return sa.func.date(column) if sqlite else sa.cast(column, sa.Date)
+
+    attendances = Attendance.__table__
+    other = attendances.alias('other')
+    first_of_day = sa.select(other.c.id).where(
+        other.c.member_id == attendances.c.member_id,
+        day(other.c.check_in_time) == day(attendances.c.check_in_time)
+    ).order_by(other.c.check_in_time, other.c.id).limit(1).scalar_subquery()
+    already_dated = sa.exists().where(
+        other.c.member_id == attendances.c.member_id,
+        other.c.check_in_date == day(attendances.c.check_in_time)
+    )
+    result = db.session.execute(
+        sa.update(attendances)
+        .where(attendances.c.check_in_date.is_(None),
+               attendances.c.id == first_of_day,
+               ~already_dated)
+        .values(check_in_date=day(attendances.c.check_in_time))
+    )
+    db.session.commit()
+    return result.rowcount
+
+
+def add_missing_indexes():
+    """Create model indexes that existing tables lack. Returns their names."""
+    engine = db.engine
+    inspector = sa.inspect(engine)
+    added = []
+
+    for table in db.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {index['name'] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in existing:
+                index.create(engine)
+                added.append(index.name)
+    return added
+
+
+def seed_default_users(users=None, password=DEFAULT_PASSWORD):
+    """Create the default admin/test users if missing. Returns created emails."""
+    from app.models import User
+
+    users = DEFAULT_USERS if users is None else users
+    emails = [u['email'] for u in users]
+    existing = {
+        email for (email,) in
+        db.session.query(User.email).filter(User.email.in_(emails))
+    }
+
+    created = []
+    for spec in users:
+        if spec['email'] in existing:
+            continue
+        user = User(name=spec['name'], email=spec['email'], role=spec['role'])
+        user.set_password(password)
+        db.session.add(user)
+        created.append(spec['email'])
+
+    if created:
+        db.session.commit()
+    return created
+
+
+def bootstrap(seed=True):
+    """Create the schema and optionally seed default users."""
+    create_schema()
+    return seed_default_users() if seed else []
+
+
+@click.command('bootstrap-db')
+@click.option('--seed/--no-seed', default=True, help='Create the default admin and test users.')
+@with_appcontext
+def bootstrap_db_command(seed):
+    """Create database tables and seed default users (idempotent)."""
+    added = create_schema()
+    click.echo('Database tables created successfully')
+    for kind, name in added:
+        click.echo(f'{kind} added: {name}')
+    created = seed_default_users() if seed else []
+    for email in created:
+        click.echo(f'User created: {email}')
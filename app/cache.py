@@ -0,0 +1,138 @@
+"""
+Process-Local Caches
+====================
+Purpose: Small bounded caches that let hot request paths skip database
+round trips. Every gunicorn worker has its own copy, so entries must be
+safe to serve stale for up to their TTL, and writers invalidate the
+entries they change in their own process.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+_MISSING = object()
+
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries expire after `ttl` seconds."""
+
+    def __init__(self, maxsize=1024, ttl=60, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is not _MISSING:
+                value, expires_at = entry
+                if expires_at > self._clock():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+            self.misses += 1
+            return default
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (value, self._clock() + self.ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def get_or_load(self, key, loader):
+        """Return the cached value, calling loader() and caching it on a miss."""
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = loader()
+            self.set(key, value)
+        return value
+
+    def invalidate(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'size': len(self._data),
+                'maxsize': self.maxsize,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+            }
+
+    def __len__(self):
+        return len(self._data)
+
+
+class ExpiringSet:
+    """Thread-safe set whose members expire at a per-member timestamp.
+
+    Members are grouped into buckets of `bucket_seconds` by expiry, so
+    expired members are dropped a whole bucket at a time (at most
+    `bucket_seconds` late) instead of being tracked one by one.
+    Membership tests are a single dict lookup.
+    """
+
+    def __init__(self, bucket_seconds=300, clock=time.time):
+        self.bucket_seconds = bucket_seconds
+        self._clock = clock
+        self._members = {}
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def add(self, member, expires_at):
+        """Add a member until `expires_at` (seconds since the epoch)."""
+        bucket = int(expires_at // self.bucket_seconds) + 1
+        with self._lock:
+            if bucket <= self._current_bucket():
+                return
+            previous = self._members.get(member)
+            if previous is not None and previous >= bucket:
+                return
+            if previous is not None:
+                self._buckets[previous].discard(member)
+            self._members[member] = bucket
+            self._buckets.setdefault(bucket, set()).add(member)
+
+    def __contains__(self, member):
+        bucket = self._members.get(member)
+        if bucket is None:
+            return False
+        if bucket > self._current_bucket():
+            return True
+        self.expire()
+        return False
+
+    def expire(self):
+        """Drop every bucket whose members have all expired."""
+        with self._lock:
+            current = self._current_bucket()
+            for bucket in [b for b in self._buckets if b <= current]:
+                for member in self._buckets.pop(bucket):
+                    del self._members[member]
+
+    def _current_bucket(self):
+        return int(self._clock() // self.bucket_seconds)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'size': len(self._members),
+                'buckets': len(self._buckets),
+                'bucketSeconds': self.bucket_seconds,
+            }
+
+    def __len__(self):
+        return len(self._members)
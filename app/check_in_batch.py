@@ -0,0 +1,183 @@
+"""
+Batch Check-in
+==============
+Purpose: Record check-ins buffered by a kiosk while it was offline
+(POST /api/attendance/checkin/batch).
+
+Each item is {member_id, check_in_time, client_event_id}; the kiosk
+generates client_event_id once per tap and sends it again on every retry.
+A batch of up to CHECK_IN_BATCH_MAX_ITEMS is processed in one transaction:
+  1. every item is validated up front (ISO check_in_time, converted to
+     naive UTC and not in the future; an event id repeated in the request
+     gets the result of its first occurrence)
+  2. one SELECT finds event ids already recorded (replays) and one SELECT
+     loads the status of every member in the batch
+  3. per member and UTC day only the earliest remaining tap is kept
+  4. one multi-row INSERT ... ON CONFLICT DO NOTHING RETURNING writes them,
+     sorted by hour and member so that concurrent batches update the
+     attendance rollups (app/rollups.py) in the same order;
+     rows that conflicted (a check-in that day, or the same event recorded
+     by a concurrent request) are resolved with one more SELECT
+
+Outcomes per item: 'created' and 'replayed' (with the attendance id),
+'already_checked_in', or 'error' with a message. Replaying a batch
+returns 'replayed' for what was created and the same outcome for the rest,
+and never records a tap twice.
+
+Membership status is checked as it is now, not as it was at check_in_time.
+"""
+
+import uuid
+from datetime import datetime, timedelta, timezone
+from app import db
+from app.models import Attendance, Member
+from app.models.attendance import CHECK_IN_STATUSES
+from app.sql import dialect_insert
+
+DEFAULT_MAX_ITEMS = 1000
+# Kiosk clocks drift; taps this far ahead of the server are still accepted
+CLOCK_SKEW = timedelta(minutes=5)
+EVENT_ID_LENGTH = Attendance.__table__.c.client_event_id.type.length
+
+
+def _parse_time(value):
+    try:
+        when = datetime.fromisoformat(str(value))
+    except ValueError:
+        raise ValueError('check_in_time must be an ISO datetime') from None
+    if when.tzinfo is not None:
+        when = when.astimezone(timezone.utc).replace(tzinfo=None)
+    if when > datetime.utcnow() + CLOCK_SKEW:
+        raise ValueError('check_in_time is in the future')
+    return when
+
+
+def clean_item(item):
+    """Validate one batch item. Returns ((member_id, time, event id), error)."""
+    if not isinstance(item, dict):
+        return None, 'Item must be an object'
+    member_id = item.get('member_id')
+    event_id = item.get('client_event_id')
+    if not member_id or not isinstance(member_id, str):
+        return None, 'member_id is required'
+    if not event_id or not isinstance(event_id, str):
+        return None, 'client_event_id is required'
+    if len(event_id) > EVENT_ID_LENGTH:
+        return None, f'client_event_id must be at most {EVENT_ID_LENGTH} characters'
+    if not item.get('check_in_time'):
+        return None, 'check_in_time is required'
+    try:
+        when = _parse_time(item['check_in_time'])
+    except ValueError as exc:
+        return None, str(exc)
+    return (member_id, when, event_id), None
+
+
+def _recorded(event_ids):
+    """{client_event_id: attendance id} for events already in the database."""
+    if not event_ids:
+        return {}
+    return dict(db.session.execute(
+        db.select(Attendance.client_event_id, Attendance.id)
+        .where(Attendance.client_event_id.in_(event_ids))
+    ).all())
+
+
+def _insert(rows):
+    """Insert rows in one statement. Returns {client_event_id: id} of those written."""
+    statement = dialect_insert(Attendance.__table__).values(rows).on_conflict_do_nothing()
+    table = Attendance.__table__
+    return dict(db.session.execute(
+        statement.returning(table.c.client_event_id, table.c.id)
+    ).all())
+
+
+def _result(number, event_id, status, **extra):
+    return {'item': number, 'clientEventId': event_id, 'status': status, **extra}
+
+
+def check_in_batch(items, user_id=None):
+    """Validate and record a batch of check-ins. The caller commits.
+
+    Returns (response body, [(member_id, check_in_date)] created).
+    """
+    results = {}
+    first_item = {}  # client_event_id -> item number of its first occurrence
+    repeats = {}     # item number -> first occurrence
+    valid = []
+    for number, item in enumerate(items, start=1):
+        cleaned, error = clean_item(item)
+        if error:
+            event_id = item.get('client_event_id') if isinstance(item, dict) else None
+            results[number] = _result(number, event_id, 'error', message=error)
+        elif cleaned[2] in first_item:
+            repeats[number] = first_item[cleaned[2]]
+        else:
+            first_item[cleaned[2]] = number
+            valid.append((number, *cleaned))
+
+    recorded = _recorded([event_id for *_, event_id in valid])
+    member_ids = {member_id for _, member_id, _, _ in valid}
+    statuses = dict(db.session.execute(
+        db.select(Member.id, Member.membership_status).where(Member.id.in_(member_ids))
+    ).all()) if member_ids else {}
+
+    kept = {}  # (member_id, day) -> earliest tap
+    for number, member_id, when, event_id in sorted(valid, key=lambda entry: entry[2]):
+        status = statuses.get(member_id)
+        if event_id in recorded:
+            results[number] = _result(number, event_id, 'replayed', id=recorded[event_id])
+        elif member_id not in statuses:
+            results[number] = _result(number, event_id, 'error', message='Member not found')
+        elif status not in CHECK_IN_STATUSES:
+            results[number] = _result(number, event_id, 'error',
+                                      message=f'Cannot check in. Membership status: {status}')
+        elif (member_id, when.date()) in kept:
+            results[number] = _result(number, event_id, 'already_checked_in')
+        else:
+            kept[(member_id, when.date())] = (number, member_id, when, event_id)
+
+    now = datetime.utcnow()
+    numbers = {event_id: number for number, _, _, event_id in kept.values()}
+    rows = [{
+        'id': str(uuid.uuid4()),
+        'member_id': member_id,
+        'user_id': user_id,
+        'check_in_time': when,
+        'check_in_date': when.date(),
+        'client_event_id': event_id,
+        'created_at': now,
+    } for _, member_id, when, event_id in kept.values()]
+    # Rollup row locks in one order across batches: by hour, then member
+    rows.sort(key=lambda row: (row['check_in_time'].replace(minute=0, second=0, microsecond=0), row['member_id']))
+    written = _insert(rows) if rows else {}
+    # Not written: already checked in that day, or recorded meanwhile by a
+    # concurrent replay of the same event
+    raced = _recorded([event_id for event_id in numbers if event_id not in written])
+
+    created = []
+    for row in rows:
+        event_id = row['client_event_id']
+        number = numbers[event_id]
+        if event_id in written:
+            results[number] = _result(number, event_id, 'created', id=written[event_id])
+            created.append((row['member_id'], row['check_in_date']))
+        elif event_id in raced:
+            results[number] = _result(number, event_id, 'replayed', id=raced[event_id])
+        else:
+            results[number] = _result(number, event_id, 'already_checked_in')
+    for number, first in repeats.items():
+        results[number] = {**results[first], 'item': number}
+
+    ordered = [results[number] for number in sorted(results)]
+    counts = {'created': 0, 'replayed': 0, 'already_checked_in': 0, 'error': 0}
+    for result in ordered:
+        counts[result['status']] += 1
+    return {
+        'processed': len(ordered),
+        'created': counts['created'],
+        'replayed': counts['replayed'],
+        'alreadyCheckedIn': counts['already_checked_in'],
+        'failed': counts['error'],
+        'results': ordered,
+    }, created
@@ -0,0 +1,122 @@
+"""
+Check-in Caches
+===============
+Purpose: Let POST /api/attendance/checkin refuse repeated kiosk taps
+without touching the database. Two per-worker structures sit in front of
+Attendance.check_in():
+
+  checked_in_today - ids of members with a check-in on the current UTC
+                     day. Loaded from attendances.check_in_date on first
+                     use and again at day rollover, resynced every
+                     CHECK_IN_CACHE_SYNC_SECONDS to pick up other workers'
+                     check-ins and deletions, and extended by this
+                     worker's own check-ins as they commit.
+  member_statuses  - membership status of members whose check-in was
+                     refused (None for unknown ids), for
+                     CHECK_IN_STATUS_CACHE_TTL seconds. Members that may
+                     check in are never cached: their next tap is answered
+                     by checked_in_today.
+
+Both can only short-circuit a refusal. An accepted tap still goes to the
+database, where the unique (member_id, check_in_date) index decides, so
+a stale entry delays a legitimate check-in (by at most the sync interval
+or TTL) but never lets a duplicate through. Member writes in this worker
+drop the member's cached status.
+"""
+
+import threading
+import time
+from datetime import datetime
+
+import sqlalchemy as sa
+from flask import current_app
+from app import db
+from app.cache import TTLCache
+from app.models import Attendance
+
+
+class CheckedInToday:
+    """Per-worker set of member ids that have checked in on the current UTC day."""
+
+    def __init__(self, sync_interval=60, clock=time.monotonic):
+        self.sync_interval = sync_interval
+        self._clock = clock
+        self._snapshot = (None, set())  # (day, member ids)
+        self._next_sync = 0.0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.syncs = 0
+
+    def __contains__(self, member_id):
+        today = datetime.utcnow().date()
+        if self._snapshot[0] != today or self._clock() >= self._next_sync:
+            self.sync(today)
+        day, ids = self._snapshot
+        # A sync running in another thread may still hold yesterday's ids
+        if day == today and member_id in ids:
+            self.hits += 1
+            return True
+        self.misses += 1
+        return False
+
+    def sync(self, today=None):
+        """Reload today's ids from the database."""
+        # One thread syncs; the others keep answering from memory
+        if not self._lock.acquire(blocking=False):
+            return
+        try:
+            today = today or datetime.utcnow().date()
+            self.sync_interval = current_app.config.get('CHECK_IN_CACHE_SYNC_SECONDS', self.sync_interval)
+            self._next_sync = self._clock() + self.sync_interval
+            ids = db.session.execute(
+                sa.select(Attendance.member_id).where(Attendance.check_in_date == today)
+            ).scalars()
+            self._snapshot = (today, set(ids))
+            self.syncs += 1
+        finally:
+            self._lock.release()
+
+    def add(self, member_id, day):
+        """Record a check-in committed by this worker."""
+        snapshot_day, ids = self._snapshot
+        if snapshot_day == day:
+            ids.add(member_id)
+
+    def discard(self, member_id, day):
+        """Forget a check-in deleted by this worker."""
+        snapshot_day, ids = self._snapshot
+        if snapshot_day == day:
+            ids.discard(member_id)
+
+    def reset(self):
+        self._snapshot = (None, set())
+        self._next_sync = 0.0
+
+    def stats(self):
+        day, ids = self._snapshot
+        return {
+            'day': day.isoformat() if day else None,
+            'size': len(ids),
+            'syncSeconds': self.sync_interval,
+            'hits': self.hits,
+            'misses': self.misses,
+            'syncs': self.syncs,
+        }
+
+
+checked_in_today = CheckedInToday()
+
+# member_id -> membership status that refused a check-in (None: no such member)
+member_statuses = TTLCache(maxsize=10000, ttl=60)
+
+
+def cached_refusal(member_id, default=None):
+    """The cached refusing status of a member, or `default` if not cached."""
+    member_statuses.ttl = current_app.config.get('CHECK_IN_STATUS_CACHE_TTL', member_statuses.ttl)
+    return member_statuses.get(member_id, default)
+
+
+def forget_member(member_id):
+    """Drop a member's cached status after this worker changed the member."""
+    member_statuses.invalidate(member_id)
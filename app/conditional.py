@@ -0,0 +1,123 @@
+"""
+Conditional GETs
+================
+Purpose: Let clients that poll a resource revalidate it cheaply. Responses
+carry an ETag (and Last-Modified where there is one); a request whose
+If-None-Match / If-Modified-Since still matches gets an empty 304 and the
+body is never built.
+
+Validators:
+  resource_validators(*rows) - strong ETag from each row's table, id and
+                               updated_at; Last-Modified is the newest
+                               updated_at. Every write goes through
+                               updated_at (onupdate), so the ETag changes
+                               exactly when the serialized row can.
+  data_version(*columns)     - ETag for aggregates (reports): COUNT(*) and
+                               MAX(column) (SUM for counters) per table in
+                               one query, which changes on any insert,
+                               update or delete.
+  static_etag(value)         - ETag of a constant (e.g. a catalog).
+
+@versioned(*columns) wraps a report view with data_version(): a matching
+If-None-Match costs one small aggregate query instead of the report.
+
+If-None-Match wins over If-Modified-Since when both are sent (RFC 9110).
+Responses are `Cache-Control: private, no-cache`: they depend on the
+caller's token, and clients must revalidate before reuse.
+"""
+
+import hashlib
+import json
+from datetime import timezone
+from functools import wraps
+import sqlalchemy as sa
+from flask import current_app, request
+from app import db
+
+CACHE_CONTROL = 'private, no-cache'
+
+
+def make_etag(*parts):
+    """Opaque ETag value for `parts` (anything with a stable str())."""
+    raw = '|'.join(str(part) for part in parts)
+    return hashlib.sha256(raw.encode()).hexdigest()[:32]
+
+
+def static_etag(value):
+    return make_etag(json.dumps(value, sort_keys=True))
+
+
+def _http_date(value):
+    """Naive UTC datetime -> aware, whole seconds (HTTP date precision)."""
+    if value is None:
+        return None
+    return value.replace(tzinfo=timezone.utc, microsecond=0)
+
+
+def resource_validators(*rows):
+    """(etag, last_modified) for a response serialized from `rows`.
+
+    None entries (e.g. a missing relation) are skipped.
+    """
+    rows = [row for row in rows if row is not None]
+    stamps = [row.updated_at or row.created_at for row in rows]
+    etag = make_etag(*[(row.__tablename__, row.id, stamp and stamp.isoformat())
+                       for row, stamp in zip(rows, stamps)])
+    known = [stamp for stamp in stamps if stamp is not None]
+    return etag, _http_date(max(known)) if known else None
+
+
+def data_version(*columns, extra=()):
+    """ETag for data aggregated from the tables of `columns`.
+
+    Each column is the table's last-changed timestamp (updated_at, or
+    created_at for append-only tables), or an integer counter bumped on
+    every change. Counters are summed, so they can be spread over several
+    rows that concurrent writers bump without waiting on each other.
+    `extra` is mixed in as-is, e.g. the date for reports relative to today.
+    """
+    selects = []
+    for column in columns:
+        latest = sa.func.sum if isinstance(column.type, sa.Integer) else sa.func.max
+        selects.append(sa.select(sa.func.count()).select_from(column.table).scalar_subquery())
+        selects.append(sa.select(latest(column)).scalar_subquery())
+    row = db.session.execute(sa.select(*selects)).one()
+    return make_etag(*row, *extra)
+
+
+def _not_modified(etag, last_modified):
+    if request.if_none_match:
+        return request.if_none_match.contains_weak(etag)
+    if request.if_modified_since and last_modified:
+        return last_modified <= request.if_modified_since
+    return False
+
+
+def conditional_response(etag, last_modified, build):
+    """304 if the request's validators match, else `build()` with validators."""
+    if _not_modified(etag, last_modified):
+        response = current_app.response_class(status=304)
+    else:
+        response = current_app.make_response(build())
+        if response.status_code != 200:
+            return response
+    response.set_etag(etag)
+    if last_modified:
+        response.last_modified = last_modified
+    response.headers['Cache-Control'] = CACHE_CONTROL
+    return response
+
+
+def versioned(*columns, extra=None):
+    """Decorator: conditional GET for a view aggregating `columns`' tables.
+
+    `extra` is an optional callable returning more version parts, for
+    views that also depend on the current time.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            etag = data_version(*columns, extra=extra() if extra else ())
+            return conditional_response(etag, None, lambda: view(*args, **kwargs))
+        return wrapper
+    return decorator
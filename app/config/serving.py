@@ -0,0 +1,63 @@
+"""
+Gunicorn serving profile
+========================
+Turns the GUNICORN_* settings on a Config class into gunicorn options.
+gunicorn.conf.py at the repository root applies the result.
+
+Auto sizing (when GUNICORN_WORKERS / GUNICORN_THREADS are 0):
+  sync    - 2 * CPUs + 1 workers, 1 thread each
+  gthread - CPUs + 1 workers, 4 threads each
+  gevent  - CPUs workers, GUNICORN_WORKER_CONNECTIONS greenlets each
+Workers are capped at GUNICORN_MAX_WORKERS to bound memory and database
+connections.
+"""
+
+import os
+
+WORKER_CLASSES = {
+    'sync': 'sync',
+    'gthread': 'gthread',
+    'gevent': 'gevent',
+}
+
+
+def cpu_count():
+    """CPUs this process may run on (respects container CPU affinity)."""
+    try:
+        return len(os.sched_getaffinity(0)) or 1
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def serving_profile(settings, cpus=None):
+    """Return the gunicorn options for a Config class."""
+    worker_class = settings.GUNICORN_WORKER_CLASS
+    if worker_class not in WORKER_CLASSES:
+        raise ValueError(
+            f'GUNICORN_WORKER_CLASS must be one of {", ".join(WORKER_CLASSES)}, got {worker_class!r}'
+        )
+    cpus = cpus or cpu_count()
+
+    if worker_class == 'sync':
+        workers, threads = 2 * cpus + 1, 1
+    elif worker_class == 'gthread':
+        workers, threads = cpus + 1, 4
+    else:
+        workers, threads = cpus, 1
+
+    workers = settings.GUNICORN_WORKERS or min(workers, settings.GUNICORN_MAX_WORKERS)
+    if worker_class == 'gthread':
+        threads = settings.GUNICORN_THREADS or threads
+
+    return {
+        'bind': f'0.0.0.0:{settings.PORT}',
+        'worker_class': WORKER_CLASSES[worker_class],
+        'workers': workers,
+        'threads': threads,
+        'worker_connections': settings.GUNICORN_WORKER_CONNECTIONS,
+        'preload_app': settings.GUNICORN_PRELOAD,
+        'max_requests': settings.GUNICORN_MAX_REQUESTS,
+        'max_requests_jitter': settings.GUNICORN_MAX_REQUESTS_JITTER if settings.GUNICORN_MAX_REQUESTS else 0,
+        'timeout': settings.GUNICORN_TIMEOUT,
+        'keepalive': settings.GUNICORN_KEEPALIVE,
+    }
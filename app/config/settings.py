@@ -4,6 +4,41 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def env_bool(name, default=False):
+    """Read a boolean flag from the environment ('1', 'true', 'yes', 'on')."""
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+def engine_options(uri, statement_timeout_ms=0):
+    """SQLAlchemy engine options for a database URI, tunable via DB_* env vars.
+
+    Pool sizing only applies to server databases; SQLite uses its own
+    pools (StaticPool for :memory:) which reject these arguments.
+    """
+    options = {
+        'pool_pre_ping': env_bool('DB_POOL_PRE_PING', True),
+        'pool_recycle': int(os.getenv('DB_POOL_RECYCLE', 1800)),
+    }
+    if uri.startswith('sqlite'):
+        return options
+
+    options.update({
+        'pool_size': int(os.getenv('DB_POOL_SIZE', 5)),
+        'max_overflow': int(os.getenv('DB_MAX_OVERFLOW', 10)),
+        'pool_timeout': int(os.getenv('DB_POOL_TIMEOUT', 30)),
+    })
+    statement_timeout_ms = int(os.getenv('DB_STATEMENT_TIMEOUT_MS', statement_timeout_ms))
+    if statement_timeout_ms and uri.startswith('postgresql'):
+        # Applied by the server to every statement on the connection
+        options['connect_args'] = {'options': f'-c statement_timeout={statement_timeout_ms}'}
+    return options
+
 
 class Config:
     """Base configuration."""
@@ -24,10 +59,85 @@ class Config:
     SQLALCHEMY_DATABASE_URI = _db_url or \
         f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # Pool: DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT (s), DB_POOL_RECYCLE (s),
+    # DB_POOL_PRE_PING; per-connection DB_STATEMENT_TIMEOUT_MS (0 = off)
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options(SQLALCHEMY_DATABASE_URI)
+
+    # Optional read replica; queries from these blueprints read from it
+    # (see app/session.py)
+    _replica_url = os.getenv('DATABASE_REPLICA_URL')
+    if _replica_url and _replica_url.startswith('postgres://'):
+        _replica_url = _replica_url.replace('postgres://', 'postgresql://', 1)
+    SQLALCHEMY_BINDS = {
+        'replica': {'url': _replica_url, **engine_options(_replica_url)}
+    } if _replica_url else {}
+    SQLALCHEMY_REPLICA_BLUEPRINTS = ('reports', 'admin_reports')
 
     # JWT
     JWT_SECRET_KEY = SECRET_KEY
-    JWT_ACCESS_TOKEN_EXPIRES = timedelta(days=7)
+    # Short-lived access tokens, renewed at /api/auth/refresh
+    JWT_ACCESS_TOKEN_EXPIRES = timedelta(minutes=int(os.getenv('JWT_EXPIRY_MINUTES', 15)))
+    JWT_REFRESH_TOKEN_EXPIRES = timedelta(days=int(os.getenv('JWT_REFRESH_EXPIRY_DAYS', 30)))
+    # How often each worker's background job pulls tokens revoked by other
+    # workers (0 = never, e.g. for a single worker)
+    TOKEN_DENYLIST_SYNC_SECONDS = int(os.getenv('TOKEN_DENYLIST_SYNC_SECONDS', 5))
+    # ... re-reading rows created this long before the previous sync, for
+    # revocations that commit late or come from a worker with a slow clock
+    TOKEN_DENYLIST_SYNC_OVERLAP_SECONDS = int(os.getenv('TOKEN_DENYLIST_SYNC_OVERLAP_SECONDS', 60))
+    # Tokens embed role + token_version. Each worker caches the resolved
+    # current user for this long, which also bounds revocation delay.
+    CURRENT_USER_CACHE_TTL = int(os.getenv('CURRENT_USER_CACHE_TTL', 60))
+    CURRENT_USER_CACHE_SIZE = int(os.getenv('CURRENT_USER_CACHE_SIZE', 10000))
+
+    # Password hashing (app/passwords.py): bcrypt cost for new hashes
+    # (older hashes are rehashed on login) and where bcrypt runs:
+    # 'inline', 'thread' or 'process' pool of BCRYPT_MAX_WORKERS
+    BCRYPT_ROUNDS = int(os.getenv('BCRYPT_ROUNDS', 12))
+    BCRYPT_EXECUTOR = os.getenv('BCRYPT_EXECUTOR', 'inline')
+    BCRYPT_MAX_WORKERS = int(os.getenv('BCRYPT_MAX_WORKERS', 2))
+    # Process pool for bulk user imports (0 = one process per CPU)
+    BCRYPT_BULK_WORKERS = int(os.getenv('BCRYPT_BULK_WORKERS', 0))
+
+    # Seconds a list total requested with ?count=cached is reused (per worker)
+    LIST_COUNT_CACHE_TTL = int(os.getenv('LIST_COUNT_CACHE_TTL', 30))
+
+    # Rows validated, hashed and inserted together by the admin user import
+    USER_IMPORT_BATCH_SIZE = int(os.getenv('USER_IMPORT_BATCH_SIZE', 500))
+    # Rows upserted and committed together by POST /api/members/bulk
+    MEMBER_BULK_CHUNK_SIZE = int(os.getenv('MEMBER_BULK_CHUNK_SIZE', 1000))
+
+    # Rate limits for login/register/password reset (app/middleware/rate_limit.py),
+    # "<count>/<seconds>" per client IP and per email, each per endpoint.
+    # Backend 'memory' (per worker) or 'sqlite' (a file shared by all workers)
+    RATE_LIMIT_ENABLED = env_bool('RATE_LIMIT_ENABLED', True)
+    RATE_LIMIT_BACKEND = os.getenv('RATE_LIMIT_BACKEND', 'memory')
+    RATE_LIMIT_SQLITE_PATH = os.getenv('RATE_LIMIT_SQLITE_PATH', os.path.join(BASE_DIR, 'rate_limits.sqlite3'))
+    RATE_LIMIT_MAX_KEYS = int(os.getenv('RATE_LIMIT_MAX_KEYS', 100000))
+    RATE_LIMIT_AUTH_IP = os.getenv('RATE_LIMIT_AUTH_IP', '30/60')
+    RATE_LIMIT_AUTH_EMAIL = os.getenv('RATE_LIMIT_AUTH_EMAIL', '10/300')
+    # Number of reverse proxies in front of the app whose X-Forwarded-For
+    # is trusted for the client IP (0 = use the socket address)
+    TRUSTED_PROXIES = int(os.getenv('TRUSTED_PROXIES', 0))
+
+    # Background deletion of expired reset tokens / revoked-token records
+    # (app/sweeper.py), per gunicorn worker; 0 = off (use `flask sweep-expired`)
+    SWEEPER_INTERVAL_SECONDS = int(os.getenv('SWEEPER_INTERVAL_SECONDS', 300))
+    SWEEPER_CHUNK_SIZE = int(os.getenv('SWEEPER_CHUNK_SIZE', 1000))
+
+    # Membership expiry job (app/memberships.py), per gunicorn worker; 0 = off
+    # (use `flask expire-memberships`). Each run also refreshes the cached
+    # list of memberships ending within MEMBERSHIP_EXPIRING_DAYS.
+    MEMBERSHIP_EXPIRY_INTERVAL_SECONDS = int(os.getenv('MEMBERSHIP_EXPIRY_INTERVAL_SECONDS', 300))
+    MEMBERSHIP_EXPIRY_CHUNK_SIZE = int(os.getenv('MEMBERSHIP_EXPIRY_CHUNK_SIZE', 500))
+    MEMBERSHIP_EXPIRING_DAYS = int(os.getenv('MEMBERSHIP_EXPIRING_DAYS', 31))
+
+    # Per-worker check-in caches (app/check_ins.py): how often the set of
+    # members checked in today is reloaded, and how long a refused member's
+    # status is reused before asking the database again
+    CHECK_IN_CACHE_SYNC_SECONDS = int(os.getenv('CHECK_IN_CACHE_SYNC_SECONDS', 60))
+    CHECK_IN_STATUS_CACHE_TTL = int(os.getenv('CHECK_IN_STATUS_CACHE_TTL', 60))
+    # Items accepted by POST /api/attendance/checkin/batch (one INSERT)
+    CHECK_IN_BATCH_MAX_ITEMS = int(os.getenv('CHECK_IN_BATCH_MAX_ITEMS', 1000))
 
     # Invite code for creating admin accounts via public registration
     # Set this in environment (ADMIN_INVITE_CODE) to a secret value.
@@ -36,6 +146,28 @@ class Config:
     # Server
     PORT = int(os.getenv('PORT', 5000))
 
+    # API docs: 'dynamic' (flasgger walks docstrings) or 'prebuilt'
+    # (serve the file written by `flask build-apispec`)
+    API_SPEC_MODE = os.getenv('API_SPEC_MODE', 'dynamic')
+    API_SPEC_PATH = os.getenv('API_SPEC_PATH', os.path.join(BASE_DIR, 'apispec.json'))
+
+    # Gunicorn serving profile (read by gunicorn.conf.py)
+    # Worker class: 'sync', 'gthread' or 'gevent' (needs requirements-gevent.txt)
+    GUNICORN_WORKER_CLASS = os.getenv('GUNICORN_WORKER_CLASS', 'gthread')
+    # 0 = size from the CPU count
+    GUNICORN_WORKERS = int(os.getenv('GUNICORN_WORKERS', 0))
+    GUNICORN_THREADS = int(os.getenv('GUNICORN_THREADS', 0))
+    GUNICORN_MAX_WORKERS = int(os.getenv('GUNICORN_MAX_WORKERS', 8))
+    GUNICORN_WORKER_CONNECTIONS = int(os.getenv('GUNICORN_WORKER_CONNECTIONS', 1000))
+    # Build the app once in the master and fork it into the workers
+    GUNICORN_PRELOAD = env_bool('GUNICORN_PRELOAD', True)
+    # Recycle workers after this many requests (0 = never), with jitter
+    # so they do not all restart at once
+    GUNICORN_MAX_REQUESTS = int(os.getenv('GUNICORN_MAX_REQUESTS', 2000))
+    GUNICORN_MAX_REQUESTS_JITTER = int(os.getenv('GUNICORN_MAX_REQUESTS_JITTER', 200))
+    GUNICORN_TIMEOUT = int(os.getenv('GUNICORN_TIMEOUT', 30))
+    GUNICORN_KEEPALIVE = int(os.getenv('GUNICORN_KEEPALIVE', 5))
+
 
 class DevelopmentConfig(Config):
     """Development configuration."""
@@ -45,6 +177,13 @@ class DevelopmentConfig(Config):
 class ProductionConfig(Config):
     """Production configuration."""
     DEBUG = False
+    API_SPEC_MODE = os.getenv('API_SPEC_MODE', 'prebuilt')
+    # Keep logins from blocking gthread/gevent workers
+    BCRYPT_EXECUTOR = os.getenv('BCRYPT_EXECUTOR', 'thread')
+    # Render terminates client connections at one proxy
+    TRUSTED_PROXIES = int(os.getenv('TRUSTED_PROXIES', 1))
+    # Cut off runaway queries in production (30 s unless overridden)
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options(Config.SQLALCHEMY_DATABASE_URI, statement_timeout_ms=30000)
 
 
 config = {
@@ -0,0 +1,166 @@
+"""
+Bulk Member Upsert
+==================
+Purpose: Create or update many members in one request, keyed by email
+(POST /api/members/bulk).
+
+Rows use the same keys as POST /api/members (name, email, phone,
+membershipType, ...) and are processed in chunks of MEMBER_BULK_CHUNK_SIZE:
+  1. every row is validated up front (email required, enum values,
+     membershipEndDate as an ISO date, column lengths; an email repeated in
+     the request fails after its first occurrence)
+  2. one SELECT finds which of the chunk's emails already exist; new
+     members must have a name
+  3. the chunk is written with `INSERT ... ON CONFLICT (email) DO UPDATE`
+     (app/sql.py) and committed
+
+On update only the fields present in the row change; omitted (or null /
+empty CSV) fields keep their current value. Rows with the same set of
+fields share one executemany, which SQLAlchemy sends as multi-row INSERTs,
+so a uniform roster is one statement per chunk.
+"""
+
+import uuid
+from datetime import datetime
+from itertools import groupby
+from app import db
+from app.models import Member
+from app.sql import dialect_insert
+
+# Request keys that can be set, in Member.API_FIELDS naming
+BULK_FIELDS = (
+    'name', 'email', 'phone', 'membershipType', 'membershipStatus', 'membershipEndDate',
+    'emergencyContactName', 'emergencyContactPhone', 'emergencyContactRelationship', 'notes',
+)
+DUPLICATE_EMAIL = 'Duplicate email in request'
+NAME_REQUIRED = 'Name is required for new members'
+
+
+def _convert(key, value):
+    """Request value -> column value. Raises ValueError with a message."""
+    column = Member.__table__.c[Member.API_FIELDS[key]]
+    if key == 'membershipEndDate':
+        try:
+            return datetime.fromisoformat(str(value))
+        except ValueError:
+            raise ValueError(f'{key} must be an ISO date') from None
+    value = str(value).strip()
+    enums = getattr(column.type, 'enums', None)
+    if enums and value not in enums:
+        raise ValueError(f'{key} must be one of {", ".join(enums)}')
+    length = getattr(column.type, 'length', None)
+    if length and len(value) > length:
+        raise ValueError(f'{key} must be at most {length} characters')
+    return value
+
+
+def clean_row(row):
+    """Validate one request row. Returns (column values, error message)."""
+    if not isinstance(row, dict):
+        return None, 'Row must be an object'
+    values = {}
+    for key in BULK_FIELDS:
+        value = row.get(key)
+        if value is None or value == '':
+            continue
+        try:
+            values[Member.API_FIELDS[key]] = _convert(key, value)
+        except ValueError as exc:
+            return None, str(exc)
+    if not values.get('email'):
+        return None, 'Email is required'
+    return values, None
+
+
+def _upsert(rows, now):
+    """Write rows (all with the same columns) in one statement. Returns {email: id}."""
+    provided = list(rows[0])
+    new_defaults = {
+        'membership_type': 'basic',
+        'membership_status': 'active',
+        'membership_start_date': now,
+    }
+    values = [{
+        'id': str(uuid.uuid4()),
+        **{column: default for column, default in new_defaults.items() if column not in row},
+        **row,
+        'created_at': now,
+        'updated_at': now,
+    } for row in rows]
+    table = Member.__table__
+    statement = dialect_insert(table)
+    # Existing members only get the columns the rows provided
+    update = {column: statement.excluded[column] for column in provided if column != 'email'}
+    update['updated_at'] = statement.excluded.updated_at
+    statement = statement.on_conflict_do_update(
+        index_elements=['email'], set_=update
+    ).returning(table.c.email, table.c.id)
+    # executemany: SQLAlchemy batches the rows into multi-row INSERTs
+    # ("insertmanyvalues") without recompiling the statement per chunk
+    return dict(db.session.execute(statement, values).all())
+
+
+def _columns(item):
+    return tuple(sorted(item[1]))
+
+
+def _upsert_chunk(chunk):
+    """Upsert one chunk of (row number, values) and commit. Returns results."""
+    emails = [values['email'] for _, values in chunk]
+    existing = set(db.session.execute(
+        db.select(Member.email).where(Member.email.in_(emails))
+    ).scalars())
+
+    results = {}
+    writable = []
+    for number, values in chunk:
+        if values['email'] not in existing and not values.get('name'):
+            results[number] = {'row': number, 'status': 'error', 'message': NAME_REQUIRED}
+        else:
+            writable.append((number, values))
+
+    now = datetime.utcnow()
+    ids = {}
+    for _, group in groupby(sorted(writable, key=_columns), key=_columns):
+        ids.update(_upsert([values for _, values in group], now))
+    db.session.commit()
+
+    for number, values in writable:
+        email = values['email']
+        results[number] = {
+            'row': number,
+            'status': 'updated' if email in existing else 'created',
+            'id': ids[email],
+        }
+    return [results[number] for number, _ in chunk]
+
+
+def upsert_members(rows, chunk_size):
+    """Validate and upsert request rows. Returns the response body."""
+    results = []
+    valid = []
+    seen = set()
+    for number, row in enumerate(rows, start=1):
+        values, error = clean_row(row)
+        if not error and values['email'] in seen:
+            error = DUPLICATE_EMAIL
+        if error:
+            results.append({'row': number, 'status': 'error', 'message': error})
+            continue
+        seen.add(values['email'])
+        valid.append((number, values))
+
+    for start in range(0, len(valid), chunk_size):
+        results.extend(_upsert_chunk(valid[start:start + chunk_size]))
+    results.sort(key=lambda result: result['row'])
+
+    counts = {'created': 0, 'updated': 0, 'error': 0}
+    for result in results:
+        counts[result['status']] += 1
+    return {
+        'processed': len(results),
+        'created': counts['created'],
+        'updated': counts['updated'],
+        'failed': counts['error'],
+        'results': results,
+    }
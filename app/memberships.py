@@ -0,0 +1,178 @@
+"""
+Membership Expiry
+=================
+Purpose: Move members whose membership_end_date has passed from 'active'
+to 'expired', record each change as a MembershipTransition, and keep a
+per-worker snapshot of the active memberships that expire soon.
+
+Expiry works in chunks of MEMBERSHIP_EXPIRY_CHUNK_SIZE, one transaction
+each:
+  1. SELECT the ids of overdue active members (index
+     ix_members_status_end_date), FOR UPDATE SKIP LOCKED on Postgres so
+     concurrent workers take different rows
+  2. UPDATE ... WHERE id IN (...) AND membership_status = 'active'
+     RETURNING id - re-checking the status means a member is expired (and
+     recorded) exactly once even if two workers picked the same ids
+  3. INSERT a transition per returned id, COMMIT
+
+The job runs in a daemon thread in every gunicorn worker every
+MEMBERSHIP_EXPIRY_INTERVAL_SECONDS (0 disables it; see app/sweeper.py),
+or on demand / from cron:
+
+  flask --app run expire-memberships
+
+Each run also refreshes `expiring_soon`, the active members whose
+membership ends within MEMBERSHIP_EXPIRING_DAYS. GET /api/members/expiring
+and the membership report read it instead of querying on every request.
+"""
+
+import threading
+import time
+from datetime import datetime, timedelta
+
+import click
+import sqlalchemy as sa
+from flask import current_app
+from flask.cli import with_appcontext
+from app import db
+from app.models import Member, MembershipTransition
+from app.sweeper import PeriodicJob
+
+DEFAULT_CHUNK_SIZE = 500
+EXPIRY_REASON = 'membership_end_date'
+
+
+def expire_memberships(now=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Expire overdue active memberships. Returns the number expired."""
+    now = now or datetime.utcnow()
+    members = Member.__table__
+    expired = 0
+    while True:
+        ids = db.session.execute(
+            sa.select(members.c.id)
+            .where(members.c.membership_status == 'active', members.c.membership_end_date < now)
+            .order_by(members.c.membership_end_date)
+            .limit(chunk_size)
+            .with_for_update(skip_locked=True)
+        ).scalars().all()
+        if not ids:
+            break
+        changed = db.session.execute(
+            sa.update(members)
+            .where(members.c.id.in_(ids), members.c.membership_status == 'active')
+            .values(membership_status='expired', updated_at=now)
+            .returning(members.c.id)
+        ).scalars().all()
+        if changed:
+            db.session.execute(sa.insert(MembershipTransition.__table__), [{
+                'member_id': member_id,
+                'from_status': 'active',
+                'to_status': 'expired',
+                'reason': EXPIRY_REASON,
+                'created_at': now,
+            } for member_id in changed])
+        db.session.commit()
+        expired += len(changed)
+        if len(ids) < chunk_size:
+            break
+    return expired
+
+
+class ExpiringSoon:
+    """Per-worker snapshot of active members whose membership ends soon."""
+
+    def __init__(self, clock=time.monotonic):
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._snapshot = None  # (loaded at, start, horizon, entries)
+        self.hits = 0
+        self.misses = 0
+
+    def refresh(self, now=None, days=None):
+        """Reload the snapshot covering `days` from `now`."""
+        now = now or datetime.utcnow()
+        days = days or current_app.config.get('MEMBERSHIP_EXPIRING_DAYS', 31)
+        horizon = now + timedelta(days=days)
+        rows = db.session.execute(
+            sa.select(Member.id, Member.name, Member.email, Member.membership_type,
+                      Member.membership_end_date)
+            .where(Member.membership_status == 'active',
+                   Member.membership_end_date >= now,
+                   Member.membership_end_date <= horizon)
+            .order_by(Member.membership_end_date)
+        ).all()
+        entries = [{
+            'id': row.id,
+            'name': row.name,
+            'email': row.email,
+            'membershipType': row.membership_type,
+            'membershipEndDate': row.membership_end_date,
+        } for row in rows]
+        with self._lock:
+            self._snapshot = (self._clock(), now, horizon, entries)
+        return entries
+
+    def get(self, until, now=None):
+        """Entries ending between now and `until`, reloading a stale snapshot.
+
+        The snapshot is reused while it is younger than
+        MEMBERSHIP_EXPIRY_INTERVAL_SECONDS and covers `until`.
+        """
+        now = now or datetime.utcnow()
+        max_age = current_app.config.get('MEMBERSHIP_EXPIRY_INTERVAL_SECONDS') or 300
+        with self._lock:
+            snapshot = self._snapshot
+        if snapshot and self._clock() - snapshot[0] < max_age and until <= snapshot[2]:
+            self.hits += 1
+            entries = snapshot[3]
+        else:
+            self.misses += 1
+            days = max(current_app.config.get('MEMBERSHIP_EXPIRING_DAYS', 31),
+                       (until - now).days + 1)
+            entries = self.refresh(now, days)
+        return [entry for entry in entries if now <= entry['membershipEndDate'] <= until]
+
+    def invalidate(self):
+        """Drop the snapshot after this worker changed a membership."""
+        with self._lock:
+            self._snapshot = None
+
+    def stats(self):
+        with self._lock:
+            snapshot = self._snapshot
+        return {
+            'size': len(snapshot[3]) if snapshot else 0,
+            'horizon': snapshot[2].isoformat() if snapshot else None,
+            'hits': self.hits,
+            'misses': self.misses,
+        }
+
+
+expiring_soon = ExpiringSoon()
+
+
+def run_membership_expiry():
+    """One scheduled run: expire overdue memberships, refresh the snapshot."""
+    chunk_size = current_app.config.get('MEMBERSHIP_EXPIRY_CHUNK_SIZE', DEFAULT_CHUNK_SIZE)
+    expired = expire_memberships(chunk_size=chunk_size)
+    expiring_soon.refresh()
+    return expired
+
+
+def start_membership_expiry(app):
+    """Start the expiry thread unless MEMBERSHIP_EXPIRY_INTERVAL_SECONDS is 0."""
+    interval = app.config.get('MEMBERSHIP_EXPIRY_INTERVAL_SECONDS', 0)
+    if not interval:
+        return None
+    job = PeriodicJob(app, interval, run_membership_expiry, name='membership-expiry')
+    job.start()
+    return job
+
+
+@click.command('expire-memberships')
+@click.option('--chunk-size', default=DEFAULT_CHUNK_SIZE, show_default=True,
+              help='Members expired per transaction.')
+@with_appcontext
+def expire_memberships_command(chunk_size):
+    """Expire active memberships whose end date has passed."""
+    click.echo(f'{expire_memberships(chunk_size=chunk_size)} memberships expired')
@@ -1,7 +1,211 @@
+"""
+Auth Middleware
+===============
+Purpose: Issue JWTs, resolve the current user and authorize requests.
+
+Access tokens carry the user's role and token_version, so role checks need
+no database lookup. The JWT identity is resolved once per request into a
+CurrentUser snapshot (flask_jwt_extended.current_user), served from a
+per-worker LRU cache with a TTL (CURRENT_USER_CACHE_TTL /
+CURRENT_USER_CACHE_SIZE). Updating or deleting a User invalidates its
+entry in the worker that made the change, once the change is committed;
+other workers pick the change up within the TTL.
+
+Revocation: bumping User.token_version (role change, password reset)
+makes every older token fail the lookup, and so does deleting the user.
+
+Tokens issued before the claims existed are still accepted; their role
+comes from the cached snapshot.
+
+Access tokens are short-lived (JWT_ACCESS_TOKEN_EXPIRES) and renewed with
+a refresh token (JWT_REFRESH_TOKEN_EXPIRES) at /api/auth/refresh. Logout
+and refresh-token rotation revoke individual tokens by jti: the jti is
+written to revoked_tokens (pruned by app/sweeper.py) and kept in a per-worker ExpiringSet until the
+token would have expired anyway. Every request checks that set in memory
+and never touches the database; a background job in each worker (started
+from gunicorn.conf.py) pulls rows revoked by other workers every
+TOKEN_DENYLIST_SYNC_SECONDS, re-reading the last
+TOKEN_DENYLIST_SYNC_OVERLAP_SECONDS so late commits are not missed.
+"""
+
+import time
+from collections import namedtuple
+from datetime import datetime, timedelta
 from functools import wraps
 from flask import jsonify
-from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
-from app.models import User
+from flask_jwt_extended import (
+    create_access_token, create_refresh_token, current_user, get_jwt, verify_jwt_in_request
+)
+from app import db, jwt
+from app.cache import ExpiringSet, TTLCache
+from app.models import RevokedToken, User
+from app.sql import dialect_insert
+
+ROLE_CLAIM = 'role'
+TOKEN_VERSION_CLAIM = 'tv'
+
+# Immutable, session-independent copy of the columns requests need, safe
+# to share between threads and requests
+CurrentUser = namedtuple('CurrentUser', 'id name email role phone token_version')
+
+# user_id -> CurrentUser (None for missing users)
+user_cache = TTLCache(maxsize=10000, ttl=60)
+
+
+class TokenDenylist:
+    """Revoked jtis of unexpired tokens, mirrored from revoked_tokens.
+
+    Each sync re-reads every row created since the previous sync started,
+    minus `overlap` seconds. An id high-water mark would miss a row whose
+    transaction commits after a row with a higher id was read (ids are
+    assigned at insert, not at commit); the overlap catches revocations
+    that commit up to `overlap` seconds after they were inserted, or from
+    a worker whose clock is behind. Re-read jtis are already in the set.
+    """
+
+    def __init__(self, overlap=60, clock=time.time):
+        self.overlap = overlap
+        self.tokens = ExpiringSet(bucket_seconds=300, clock=clock)
+        self._clock = clock
+        self._synced_from = None
+
+    def is_revoked(self, jti):
+        return jti in self.tokens
+
+    def sync(self):
+        """Pull tokens revoked (by any worker) since the last sync."""
+        started = datetime.utcfromtimestamp(self._clock())
+        query = db.session.query(RevokedToken.jti, RevokedToken.expires_at).filter(
+            RevokedToken.expires_at > started
+        )
+        if self._synced_from is not None:
+            query = query.filter(RevokedToken.created_at >= self._synced_from)
+        # From the primary: a revocation the replica has not replayed
+        # yet could fall outside the next sync's overlap
+        with db.session().using_primary():
+            rows = query.all()
+        for jti, expires_at in rows:
+            self.tokens.add(jti, _timestamp(expires_at))
+        self._synced_from = started - timedelta(seconds=self.overlap)
+        self.tokens.expire()
+
+    def reset(self):
+        self.tokens = ExpiringSet(self.tokens.bucket_seconds, self._clock)
+        self._synced_from = None
+
+
+denylist = TokenDenylist()
+
+
+def _timestamp(naive_utc):
+    return (naive_utc - datetime(1970, 1, 1)).total_seconds()
+
+
+def init_auth(app):
+    """Apply auth settings from the app config."""
+    user_cache.maxsize = app.config.get('CURRENT_USER_CACHE_SIZE', user_cache.maxsize)
+    user_cache.ttl = app.config.get('CURRENT_USER_CACHE_TTL', user_cache.ttl)
+    denylist.overlap = app.config.get('TOKEN_DENYLIST_SYNC_OVERLAP_SECONDS', denylist.overlap)
+
+
+def start_denylist_sync(app):
+    """Sync the denylist, then start the sync thread unless TOKEN_DENYLIST_SYNC_SECONDS is 0."""
+    from app.sweeper import PeriodicJob
+    interval = app.config.get('TOKEN_DENYLIST_SYNC_SECONDS', 0)
+    if not interval:
+        return None
+    job = PeriodicJob(app, interval, denylist.sync, name='token-denylist-sync')
+    # Before the worker serves requests, so it starts with the current set
+    job.run_once()
+    job.start()
+    return job
+
+
+def _user_claims(user):
+    return {
+        ROLE_CLAIM: user.role,
+        TOKEN_VERSION_CLAIM: user.token_version or 0,
+    }
+
+
+def create_user_token(user):
+    """Create an access token carrying the user's role and token version."""
+    return create_access_token(identity=user.id, additional_claims=_user_claims(user))
+
+
+def create_user_refresh_token(user):
+    """Create a refresh token; bumping token_version revokes it too."""
+    return create_refresh_token(identity=user.id, additional_claims=_user_claims(user))
+
+
+def revoke_token(jwt_payload):
+    """Revoke one decoded token until it expires. The caller commits.
+
+    Returns False if the token was already revoked, here or by another
+    worker whose revocation this one has not synced yet: the insert is one
+    INSERT ... ON CONFLICT (jti) DO NOTHING, so of two concurrent calls
+    exactly one gets True.
+    """
+    jti = jwt_payload['jti']
+    if jti in denylist.tokens:
+        return False
+    table = RevokedToken.__table__
+    inserted = db.session.execute(
+        dialect_insert(table).values(
+            jti=jti, expires_at=datetime.utcfromtimestamp(jwt_payload['exp'])
+        ).on_conflict_do_nothing(index_elements=[table.c.jti]).returning(table.c.id)
+    ).first()
+    denylist.tokens.add(jti, jwt_payload['exp'])
+    return inserted is not None
+
+
+def _load_user(user_id):
+    # From the primary even on replica blueprints: a lagging replica would
+    # cache the old role or token_version for the whole TTL
+    with db.session().using_primary():
+        row = db.session.query(
+            User.id, User.name, User.email, User.role, User.phone, User.token_version
+        ).filter(User.id == user_id).first()
+    return CurrentUser(*row) if row else None
+
+
+def resolve_user(user_id):
+    """CurrentUser snapshot for a user id, from the cache when possible."""
+    return user_cache.get_or_load(user_id, lambda: _load_user(user_id))
+
+
+def invalidate_user(user_id):
+    user_cache.invalidate(user_id)
+
+
+@jwt.user_lookup_loader
+def _lookup_current_user(jwt_header, jwt_payload):
+    user = resolve_user(jwt_payload['sub'])
+    if user is None:
+        return None
+    version = jwt_payload.get(TOKEN_VERSION_CLAIM)
+    if version is not None and version != user.token_version:
+        return None
+    return user
+
+
+@jwt.token_in_blocklist_loader
+def _token_revoked(jwt_header, jwt_payload):
+    return denylist.is_revoked(jwt_payload['jti'])
+
+
+@jwt.user_lookup_error_loader
+def _revoked_or_missing_user(jwt_header, jwt_payload):
+    return jsonify({'message': 'Token has been revoked'}), 401
+
+
+def current_role():
+    """Role of the authenticated user, from the token claims."""
+    return get_jwt().get(ROLE_CLAIM) or current_user.role
+
+
+def current_user_is_admin():
+    return current_role() == 'admin'
 
 
 def admin_required(fn):
@@ -9,10 +213,8 @@ def admin_required(fn):
     @wraps(fn)
     def wrapper(*args, **kwargs):
         verify_jwt_in_request()
-        user_id = get_jwt_identity()
-        user = User.query.get(user_id)
 
-        if not user or user.role != 'admin':
+        if not current_user_is_admin():
             return jsonify({'message': 'Admin access required'}), 403
 
         return fn(*args, **kwargs)
@@ -0,0 +1,216 @@
+"""
+Rate Limiting
+=============
+Purpose: Cap unauthenticated auth requests (login, register, password
+reset) per client IP and per email before they reach bcrypt or the
+database.
+
+Counters are approximate sliding windows: each key keeps the hit count of
+the current fixed window and of the previous one, and the previous count
+is weighted by how much of it still overlaps the sliding window. That is
+two integers per key, and rejected requests are not counted, so a blocked
+client gets back in as its old hits age out.
+
+Backends (RATE_LIMIT_BACKEND):
+  memory - per-worker LRU of at most RATE_LIMIT_MAX_KEYS keys (default).
+           With N workers a client can get up to N times the limit.
+  sqlite - one SQLite file (RATE_LIMIT_SQLITE_PATH) shared by every
+           worker on the host; each hit is one short write transaction.
+
+Limits are "<count>/<seconds>" strings: RATE_LIMIT_AUTH_IP per client IP
+and RATE_LIMIT_AUTH_EMAIL per email, counted separately for each endpoint.
+"""
+
+import math
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from flask import current_app, jsonify, request
+
+BACKENDS = ('memory', 'sqlite')
+
+
+def parse_limit(value):
+    """'10/60' -> (10, 60): at most 10 hits per 60 seconds."""
+    count, _, seconds = str(value).partition('/')
+    return int(count), int(seconds or 60)
+
+
+def sliding_window(state, now, limit, window):
+    """Evaluate one hit against a key's counters.
+
+    `state` is (window_start, current, previous) or None. Returns
+    (allowed, new_state, retry_after_seconds).
+    """
+    start = int(now // window * window)
+    current = previous = 0
+    if state is not None:
+        last_start, last_current, last_previous = state
+        if last_start == start:
+            current, previous = last_current, last_previous
+        elif last_start == start - window:
+            previous = last_current
+
+    weight = 1 - (now - start) / window
+    if previous * weight + current + 1 <= limit:
+        return True, (start, current + 1, previous), 0
+
+    if current + 1 > limit:
+        # Wait for the next window, then for this window's share to decay
+        retry_after = start + window - now + window * (1 - (limit - 1) / current)
+    else:
+        # Time until the previous window's share has decayed enough
+        free_at = window * (1 - (limit - current - 1) / previous)
+        retry_after = free_at - (now - start)
+    return False, (start, current, previous), max(1, math.ceil(retry_after))
+
+
+class MemoryBackend:
+    """Per-process counters in a bounded LRU."""
+
+    def __init__(self, max_keys=100000, clock=time.time):
+        self.max_keys = max_keys
+        self._clock = clock
+        self._counters = OrderedDict()
+        self._lock = threading.Lock()
+
+    def hit(self, key, limit, window):
+        with self._lock:
+            allowed, state, retry_after = sliding_window(
+                self._counters.get(key), self._clock(), limit, window
+            )
+            self._counters[key] = state
+            self._counters.move_to_end(key)
+            while len(self._counters) > self.max_keys:
+                self._counters.popitem(last=False)
+        return allowed, retry_after
+
+    def clear(self):
+        with self._lock:
+            self._counters.clear()
+
+    def __len__(self):
+        return len(self._counters)
+
+
+class SQLiteBackend:
+    """Counters in a SQLite file shared by all workers on the host."""
+
+    SCHEMA = (
+        'CREATE TABLE IF NOT EXISTS rate_limits ('
+        'key TEXT PRIMARY KEY, window_start INTEGER NOT NULL, '
+        'current INTEGER NOT NULL, previous INTEGER NOT NULL, '
+        'expires_at REAL NOT NULL)'
+    )
+    # Delete expired rows every this many hits per connection
+    PRUNE_EVERY = 1000
+
+    def __init__(self, path, clock=time.time):
+        self.path = path
+        self._clock = clock
+        self._local = threading.local()
+
+    def _connection(self):
+        # One connection per thread, opened after the gunicorn fork
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute(self.SCHEMA)
+            self._local.conn, self._local.pid, self._local.hits = conn, os.getpid(), 0
+        return conn
+
+    def hit(self, key, limit, window):
+        conn = self._connection()
+        now = self._clock()
+        # BEGIN IMMEDIATE takes the write lock up front, so the read and the
+        # update are atomic across workers
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            row = conn.execute(
+                'SELECT window_start, current, previous FROM rate_limits WHERE key = ?', (key,)
+            ).fetchone()
+            allowed, state, retry_after = sliding_window(row, now, limit, window)
+            if state != row:
+                conn.execute(
+                    'INSERT OR REPLACE INTO rate_limits VALUES (?, ?, ?, ?, ?)',
+                    (key, *state, state[0] + 2 * window)
+                )
+            self._local.hits += 1
+            if self._local.hits % self.PRUNE_EVERY == 0:
+                conn.execute('DELETE FROM rate_limits WHERE expires_at < ?', (now,))
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        return allowed, retry_after
+
+    def clear(self):
+        self._connection().execute('DELETE FROM rate_limits')
+
+
+class RateLimiter:
+    """Holds the configured backend; configured by init_rate_limit()."""
+
+    def __init__(self):
+        self.backend = MemoryBackend()
+
+    def configure(self, app):
+        kind = app.config.get('RATE_LIMIT_BACKEND', 'memory')
+        if kind not in BACKENDS:
+            raise ValueError(f'RATE_LIMIT_BACKEND must be one of {", ".join(BACKENDS)}, got {kind!r}')
+        if kind == 'sqlite':
+            self.backend = SQLiteBackend(app.config['RATE_LIMIT_SQLITE_PATH'])
+        else:
+            self.backend = MemoryBackend(app.config.get('RATE_LIMIT_MAX_KEYS', 100000))
+
+    def hit(self, key, limit):
+        count, window = parse_limit(limit)
+        return self.backend.hit(key, count, window)
+
+
+limiter = RateLimiter()
+
+
+def init_rate_limit(app):
+    """Select the rate limit backend from the app config."""
+    limiter.configure(app)
+
+
+def _request_email():
+    # get_json caches the parsed body, so the view does not parse it again
+    data = request.get_json(silent=True)
+    email = data.get('email') if isinstance(data, dict) else None
+    return email.strip().lower() if isinstance(email, str) and email.strip() else None
+
+
+def rate_limit(scope, by_email=True):
+    """Decorator: reject with 429 once the client IP or email is over its limit."""
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            config = current_app.config
+            if not config.get('RATE_LIMIT_ENABLED', True):
+                return fn(*args, **kwargs)
+
+            checks = [(f'{scope}:ip:{request.remote_addr}', config['RATE_LIMIT_AUTH_IP'])]
+            email = _request_email() if by_email else None
+            if email:
+                checks.append((f'{scope}:email:{email}', config['RATE_LIMIT_AUTH_EMAIL']))
+
+            for key, limit in checks:
+                allowed, retry_after = limiter.hit(key, limit)
+                if not allowed:
+                    response = jsonify({'message': 'Too many requests, please try again later'})
+                    response.status_code = 429
+                    response.headers['Retry-After'] = str(retry_after)
+                    return response
+
+            return fn(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -1,8 +1,12 @@
 from app.models.user import User
 from app.models.member import Member
 from app.models.attendance import Attendance
+from app.models.attendance_rollup import AttendanceDaily, AttendanceHourly, AttendanceRollupVersion
 from app.models.workout import Workout
 from app.models.admin_invite import AdminInvite
 from app.models.member_request import MemberRequest
+from app.models.revoked_token import RevokedToken
+from app.models.password_reset_token import PasswordResetToken
+from app.models.membership_transition import MembershipTransition
 
-__all__ = ['User', 'Member', 'Attendance', 'Workout', 'AdminInvite', 'MemberRequest']
\ No newline at end of file
+__all__ = ['User', 'Member', 'Attendance', 'AttendanceDaily', 'AttendanceHourly', 'AttendanceRollupVersion', 'Workout', 'AdminInvite', 'MemberRequest', 'RevokedToken', 'PasswordResetToken', 'MembershipTransition']
\ No newline at end of file
@@ -18,11 +18,17 @@ Database Columns:
   - member_id: Reference to the member who checked in
   - user_id: Reference to staff member who processed check-in (optional)
   - check_in_time: Timestamp of check-in
+  - check_in_date: UTC day of check_in_time; unique per member, so a
+    second check-in on the same day conflicts in the database
+  - client_event_id: Kiosk-generated id of a batch-synced check-in; unique,
+    so replaying a batch does not record it twice
   - created_at: Timestamp of record creation
 
 Key Methods:
   - to_dict(): Serialize to API response format with ISO timestamps
+  - check_in(): Record a check-in in one INSERT ... ON CONFLICT DO NOTHING
   - has_checked_in_today(): Prevent duplicate same-day check-ins
+  - get_member_stats(): Check-in counts and last check-in in one query
   - get_member_history(): Retrieve past check-in records
   - get_today_attendances(): Generate daily attendance reports
 
@@ -34,13 +40,34 @@ Future Enhancements:
 """
 
 import uuid
-from datetime import datetime, date
+from datetime import datetime, timedelta
+import sqlalchemy as sa
 from app import db
+from app.models.member import Member
+from app.sql import dialect_insert
+
+# Membership statuses allowed to check in
+CHECK_IN_STATUSES = ('active', 'premium', 'vip')
+
+
+def _check_in_date(context):
+    """Default for check_in_date: the day of the row's check_in_time."""
+    return context.get_current_parameters()['check_in_time'].date()
 
 
 class Attendance(db.Model):
     """Model for tracking gym member check-ins."""
     __tablename__ = 'attendances'
+    __table_args__ = (
+        # Member history, newest first (keyset pagination in routes/attendance.py)
+        db.Index('ix_attendances_member_time', 'member_id', 'check_in_time', 'id'),
+        # One check-in per member per day, enforced by the database
+        db.Index('uq_attendances_member_date', 'member_id', 'check_in_date', unique=True),
+        # Everyone checked in on a day (per-worker cache in app/check_ins.py)
+        db.Index('ix_attendances_check_in_date', 'check_in_date'),
+        # Idempotent kiosk replays (app/check_in_batch.py)
+        db.Index('uq_attendances_client_event_id', 'client_event_id', unique=True),
+    )
 
     # Unique identifier for each attendance record.
     id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
@@ -50,9 +77,27 @@ class Attendance(db.Model):
     user_id = db.Column(db.String(36), db.ForeignKey('users.id'))
     # Timestamp of when the member checked in.
     check_in_time = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    # Day of check_in_time, stored so the per-day check is an index lookup.
+    # Nullable only for rows that predate it (see bootstrap backfill).
+    check_in_date = db.Column(db.Date, default=_check_in_date)
+    # Id the kiosk gave a buffered check-in (batch sync only).
+    client_event_id = db.Column(db.String(64))
     # Timestamp of when this record was created.
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+    # Sparse fieldsets (app/fieldsets.py): to_dict() key -> column attribute
+    API_FIELDS = {
+        'id': 'id',
+        'memberId': 'member_id',
+        'userId': 'user_id',
+        'checkInTime': 'check_in_time',
+        'clientEventId': 'client_event_id',
+        'createdAt': 'created_at',
+    }
+    API_RELATIONS = {
+        'memberName': ('member', lambda attendance: attendance.member.name if attendance.member else None),
+    }
+
     def to_dict(self):
         """Convert to dictionary."""
         return {
@@ -63,23 +108,96 @@ class Attendance(db.Model):
             'checkInTime': self.check_in_time.isoformat() if self.check_in_time else None,
             # Retrieve the member's name from the related member object.
             'memberName': self.member.name if self.member else None,
+            'clientEventId': self.client_event_id,
             # Format the creation time as ISO format string if it exists coz it makes sure dates are consistent and not ambiguous.
             'createdAt': self.created_at.isoformat() if self.created_at else None
         }
 
+    @staticmethod
+    def check_in(member_id, user_id=None, now=None):
+        """Record today's check-in for an allowed member in one round trip.
+
+        INSERT ... SELECT from members (status filter) ON CONFLICT DO
+        NOTHING on (member_id, check_in_date). Returns (record, member
+        name) - the record is transient, not in the session - or None if
+        the member does not exist, may not check in, or already checked in
+        today. The caller commits.
+        """
+        now = now or datetime.utcnow()
+        attendances = Attendance.__table__
+        members = Member.__table__
+        attendance = Attendance(id=str(uuid.uuid4()), member_id=member_id, user_id=user_id,
+                                check_in_time=now, check_in_date=now.date(), created_at=now)
+        columns = ('id', 'member_id', 'user_id', 'check_in_time', 'check_in_date', 'created_at')
+        member_name = sa.select(members.c.name).where(members.c.id == member_id).scalar_subquery()
+        statement = dialect_insert(attendances).from_select(
+            columns,
+            sa.select(*[
+                sa.literal(getattr(attendance, name), attendances.c[name].type) for name in columns
+            ]).where(members.c.id == member_id, members.c.membership_status.in_(CHECK_IN_STATUSES))
+        ).on_conflict_do_nothing(
+            index_elements=['member_id', 'check_in_date']
+        ).returning(member_name)
+        row = db.session.execute(statement).first()
+        if row is None:
+            return None
+        return attendance, row[0]
+
     @staticmethod
     def has_checked_in_today(member_id):
         """Check if member has already checked in today."""
-        # Get today's date to compare against check-in records.
-        today = date.today()
-        # Query for any attendance record for this member from today.
+        # Get today's (UTC) date to compare against check-in records.
+        today = datetime.utcnow().date()
+        # One lookup on uq_attendances_member_date.
         existing = Attendance.query.filter(
             Attendance.member_id == member_id,
-            db.func.date(Attendance.check_in_time) == today
+            Attendance.check_in_date == today
         ).first()
         # Return True if the member has already checked in today.
         return existing is not None
 
+    @staticmethod
+    def get_member_stats(member_id, now=None):
+        """Check-in totals for a member in one aggregate query, or None if no such member.
+
+        Conditional COUNTs and MAX(check_in_time) over the member's rows,
+        read from ix_attendances_member_time alone (it holds every column
+        used), instead of loading each check-in.
+        """
+        now = now or datetime.utcnow()
+        month_start = datetime(now.year, now.month, 1)
+        next_month = datetime(now.year + now.month // 12, now.month % 12 + 1, 1)
+        # This week means the last 7 days
+        week_start = now - timedelta(days=7)
+        check_in_time = Attendance.check_in_time
+
+        def count_where(*conditions):
+            return sa.func.count(sa.case((sa.and_(*conditions), 1)))
+
+        row = db.session.execute(
+            sa.select(
+                Member.name,
+                sa.func.count(Attendance.id),
+                count_where(check_in_time >= month_start, check_in_time < next_month),
+                count_where(check_in_time >= week_start),
+                sa.func.max(check_in_time),
+            )
+            .select_from(Member)
+            .outerjoin(Attendance, Attendance.member_id == Member.id)
+            .where(Member.id == member_id)
+            .group_by(Member.id, Member.name)
+        ).first()
+        if row is None:
+            return None
+        name, total, month, week, last = row
+        return {
+            'memberName': name,
+            'totalCheckins': total,
+            'thisMonth': month,
+            'thisWeek': week,
+            'lastCheckIn': last,
+        }
+
     @staticmethod
     def get_member_history(member_id, limit=30):
         """Get member's attendance history."""
@@ -93,13 +211,13 @@ class Attendance(db.Model):
         ).limit(limit).all()
 
     @staticmethod
-    def get_today_attendances():
-        """Get all check-ins for today."""
-        # Get today's date to filter attendance records.
-        today = date.today()
-        # Queries all attendance records from today.
-        return Attendance.query.filter(
-            db.func.date(Attendance.check_in_time) == today
+    def get_today_attendances(query=None, today=None):
+        """Get all check-ins for today (optionally from a prepared query)."""
+        # Today's UTC date, as check_in_date and the one-per-day rule use.
+        today = today or datetime.utcnow().date()
+        # Queries all attendance records from today, on ix_attendances_check_in_date.
+        return (query or Attendance.query).filter(
+            Attendance.check_in_date == today
         # Sorts by most recent check-ins first.
         ).order_by(
             Attendance.check_in_time.desc()
@@ -0,0 +1,53 @@
+"""
+Attendance Rollup Models
+========================
+Purpose: Pre-aggregated check-in counts, so reports read one row per day
+(or hour) instead of every check-in.
+
+  attendance_daily  - check-ins per (UTC day, member)
+  attendance_hourly - check-ins per UTC hour, gym-wide
+  attendance_rollup_version - counter rows, one of which is bumped on
+                              every rollup change; their sum is the
+                              reports' ETag (app/conditional.py)
+
+All are maintained by database triggers on attendances in the same
+transaction as the check-in or delete, and can be rebuilt from scratch
+(app/rollups.py). Rows whose count drops to zero are removed.
+"""
+
+from app import db
+
+
+class AttendanceDaily(db.Model):
+    __tablename__ = 'attendance_daily'
+
+    day = db.Column(db.Date, primary_key=True)
+    member_id = db.Column(
+        db.String(36), db.ForeignKey('members.id', ondelete='CASCADE'), primary_key=True
+    )
+    checkins = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f'<AttendanceDaily {self.day} {self.member_id}: {self.checkins}>'
+
+
+class AttendanceHourly(db.Model):
+    __tablename__ = 'attendance_hourly'
+
+    # Start of the hour (UTC)
+    hour = db.Column(db.DateTime, primary_key=True)
+    checkins = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f'<AttendanceHourly {self.hour}: {self.checkins}>'
+
+
+class AttendanceRollupVersion(db.Model):
+    __tablename__ = 'attendance_rollup_version'
+
+    # Shard number: Postgres spreads concurrent bumps over several rows
+    id = db.Column(db.Integer, primary_key=True)
+    version = db.Column(db.BigInteger, nullable=False, default=0)
+
+    def __repr__(self):
+        return f'<AttendanceRollupVersion {self.version}>'
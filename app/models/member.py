@@ -29,6 +29,12 @@ from app import db
 
 class Member(db.Model):
     __tablename__ = 'members'
+    __table_args__ = (
+        # Keyset pagination order (routes/members.py)
+        db.Index('ix_members_created_at_id', 'created_at', 'id'),
+        # Expiry job and "expiring soon" list (app/memberships.py)
+        db.Index('ix_members_status_end_date', 'membership_status', 'membership_end_date'),
+    )
 
     id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     user_id = db.Column(db.String(36), db.ForeignKey('users.id'))
@@ -56,6 +62,25 @@ class Member(db.Model):
     attendances = db.relationship('Attendance', backref='member', lazy='dynamic')
     workouts = db.relationship('Workout', backref='member', lazy='dynamic')
 
+    # Sparse fieldsets (app/fieldsets.py): to_dict() key -> column attribute
+    API_FIELDS = {
+        'id': 'id',
+        'userId': 'user_id',
+        'name': 'name',
+        'email': 'email',
+        'phone': 'phone',
+        'membershipType': 'membership_type',
+        'membershipStatus': 'membership_status',
+        'membershipStartDate': 'membership_start_date',
+        'membershipEndDate': 'membership_end_date',
+        'emergencyContactName': 'emergency_contact_name',
+        'emergencyContactPhone': 'emergency_contact_phone',
+        'emergencyContactRelationship': 'emergency_contact_relationship',
+        'notes': 'notes',
+        'createdAt': 'created_at',
+        'updatedAt': 'updated_at',
+    }
+
     def to_dict(self):
         """Convert to dictionary."""
         return {
@@ -22,6 +22,19 @@ class MemberRequest(db.Model):
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     approved_by = db.Column(db.String(36), db.ForeignKey('users.id'))
 
+    # Sparse fieldsets (app/fieldsets.py): to_dict() key -> column attribute
+    API_FIELDS = {
+        'id': 'id',
+        'name': 'name',
+        'email': 'email',
+        'phone': 'phone',
+        'plan': 'plan',
+        'status': 'status',
+        'created_at': 'created_at',
+        'updated_at': 'updated_at',
+        'approved_by': 'approved_by',
+    }
+
     def to_dict(self):
         return {
             'id': self.id,
@@ -0,0 +1,37 @@
+"""
+Membership Transition Model
+===========================
+Purpose: Audit trail of membership status changes made by the system
+(currently the expiry job in app/memberships.py): which member moved from
+which status to which, why, and when.
+"""
+
+from datetime import datetime
+from app import db
+
+
+class MembershipTransition(db.Model):
+    __tablename__ = 'membership_transitions'
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    member_id = db.Column(
+        db.String(36), db.ForeignKey('members.id', ondelete='CASCADE'), nullable=False, index=True
+    )
+    from_status = db.Column(db.String(20), nullable=False)
+    to_status = db.Column(db.String(20), nullable=False)
+    # e.g. 'membership_end_date' for an automatic expiry
+    reason = db.Column(db.String(50), nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'memberId': self.member_id,
+            'fromStatus': self.from_status,
+            'toStatus': self.to_status,
+            'reason': self.reason,
+            'createdAt': self.created_at.isoformat() if self.created_at else None
+        }
+
+    def __repr__(self):
+        return f'<MembershipTransition {self.member_id} {self.from_status}->{self.to_status}>'
@@ -0,0 +1,65 @@
+"""
+Password Reset Token Model
+==========================
+Purpose: Single-use, expiring password reset tokens.
+
+Only the SHA-256 of a token is stored, under a unique index, so looking a
+token up is an index probe rather than a scan of users. Redemption is one
+conditional UPDATE that marks the row used only if it is unused and
+unexpired, so two concurrent confirms cannot both succeed. Expired and
+used rows are deleted in chunks by app/sweeper.py.
+"""
+
+import hashlib
+import secrets
+from datetime import datetime, timedelta
+from app import db
+
+
+def hash_reset_token(token):
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+class PasswordResetToken(db.Model):
+    __tablename__ = 'password_reset_tokens'
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    token_hash = db.Column(db.String(64), nullable=False, unique=True)
+    user_id = db.Column(db.String(36), db.ForeignKey('users.id', ondelete='CASCADE'),
+                        nullable=False, index=True)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+    used_at = db.Column(db.DateTime)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    @classmethod
+    def issue(cls, user_id, ttl=timedelta(minutes=10)):
+        """Store a new token for a user and return the raw token. The caller commits."""
+        token = secrets.token_hex(32)
+        db.session.add(cls(
+            token_hash=hash_reset_token(token),
+            user_id=user_id,
+            expires_at=datetime.utcnow() + ttl
+        ))
+        return token
+
+    @classmethod
+    def redeem(cls, token):
+        """Mark a valid token used and return its user id, or None.
+
+        Runs in the caller's transaction, so a rollback makes the token
+        usable again.
+        """
+        now = datetime.utcnow()
+        return db.session.execute(
+            db.update(cls)
+            .where(
+                cls.token_hash == hash_reset_token(token),
+                cls.used_at.is_(None),
+                cls.expires_at > now
+            )
+            .values(used_at=now)
+            .returning(cls.user_id)
+        ).scalar()
+
+    def __repr__(self):
+        return f'<PasswordResetToken user={self.user_id}>'
@@ -0,0 +1,26 @@
+"""
+Revoked Token Model
+===================
+Purpose: Durable record of JWTs revoked before they expire (logout,
+refresh-token rotation). Workers mirror the unexpired rows into an
+in-memory set (see middleware/auth.py) and re-read recent rows by
+created_at, so the per-request check never queries this table.
+"""
+
+from datetime import datetime
+from app import db
+
+
+class RevokedToken(db.Model):
+    __tablename__ = 'revoked_tokens'
+    __table_args__ = {'sqlite_autoincrement': True}
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    jti = db.Column(db.String(36), nullable=False, unique=True)
+    # The token's own expiry; the row is useless (and deleted) after it
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+    # Workers sync rows by this, with an overlap (middleware/auth.py)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+
+    def __repr__(self):
+        return f'<RevokedToken {self.jti}>'
@@ -4,24 +4,28 @@ User Model - Foundation for Authentication
 Purpose: Manages user credentials, roles, and password management.
 
 Implemented:
-  Bcrypt password hashing and verification
+  Bcrypt password hashing and verification (app/passwords.py: configurable
+  cost, optional thread/process pool, rehash when the cost changes)
   User role system (user/admin)
-  Password reset tokens with expiration
+  Password reset tokens with expiration (password_reset_token.py)
   Account metadata (email, phone, timestamps)
+  Token version for revoking issued JWTs (bumped on role change/reset)
   Relationships to User-created Workouts
 
 Logic Flow to Other Files:
   → auth.py: Uses set_password()/check_password() for login
-  → middleware/auth.py: JWT tokens use user.id
+  → middleware/auth.py: JWT tokens use user.id, role and token_version
   → workouts.py: User (coach) creates workouts
   → admin_reports.py: Admin role validation
   → All protected endpoints: User lookup by JWT identity
 """
 
 import uuid
-import bcrypt
 from datetime import datetime
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, object_session
 from app import db
+from app.passwords import hash_password, needs_rehash, verify_password
 
 
 class User(db.Model):
@@ -33,21 +37,37 @@ class User(db.Model):
     password = db.Column(db.String(255), nullable=False)
     role = db.Column(db.Enum('user', 'admin', name='user_role'), default='user')
     phone = db.Column(db.String(20))
-    reset_password_token = db.Column(db.String(255))
-    reset_password_expires = db.Column(db.DateTime)
+    # Embedded in JWTs; bumping it revokes every token issued before
+    token_version = db.Column(db.Integer, nullable=False, default=0, server_default='0')
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     # Relationships
     workouts = db.relationship('Workout', backref='user', lazy='dynamic')
 
+    @classmethod
+    def taken_emails(cls, emails):
+        """The subset of `emails` already registered (emails are unique)."""
+        emails = list(emails)
+        if not emails:
+            return set()
+        return {email for (email,) in db.session.query(cls.email).filter(cls.email.in_(emails))}
+
     def set_password(self, password):
         """Hash and set password."""
-        self.password = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+        self.password = hash_password(password)
 
     def check_password(self, password):
         """Check password against hash."""
-        return bcrypt.checkpw(password.encode('utf-8'), self.password.encode('utf-8'))
+        return verify_password(password, self.password)
+
+    def password_needs_rehash(self):
+        """True if the stored hash uses a different bcrypt cost than configured."""
+        return needs_rehash(self.password)
+
+    def revoke_tokens(self):
+        """Invalidate all JWTs issued to this user so far."""
+        self.token_version = (self.token_version or 0) + 1
 
     def to_dict(self):
         """Convert to dictionary (excludes sensitive fields)."""
@@ -63,3 +83,35 @@ class User(db.Model):
 
     def __repr__(self):
         return f'<User {self.email}>'
+
+
+@event.listens_for(User, 'before_update')
+def _revoke_tokens_on_role_change(mapper, connection, user):
+    """Tokens carry the role claim, so a role change must revoke them."""
+    state = inspect(user)
+    if state.attrs.role.history.has_changes() and not state.attrs.token_version.history.has_changes():
+        user.revoke_tokens()
+
+
+# Session.info key: ids of users changed in the session's transaction
+CHANGED_USERS = 'changed_user_ids'
+
+
+@event.listens_for(User, 'after_update')
+@event.listens_for(User, 'after_delete')
+def _remember_changed_user(mapper, connection, user):
+    # At flush time the change is not committed yet: a request evicting now
+    # could be followed by one re-caching the old row for the whole TTL
+    object_session(user).info.setdefault(CHANGED_USERS, set()).add(user.id)
+
+
+@event.listens_for(Session, 'after_commit')
+def _forget_cached_users(session):
+    from app.middleware.auth import invalidate_user
+    for user_id in session.info.pop(CHANGED_USERS, ()):
+        invalidate_user(user_id)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_changed_users(session):
+    session.info.pop(CHANGED_USERS, None)
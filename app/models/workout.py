@@ -5,6 +5,11 @@ from app import db
 
 class Workout(db.Model):
     __tablename__ = 'workouts'
+    __table_args__ = (
+        # Keyset pagination order per owner (routes/workouts.py)
+        db.Index('ix_workouts_user_date', 'user_id', 'date', 'id'),
+        db.Index('ix_workouts_member_date', 'member_id', 'date', 'id'),
+    )
 
     id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     user_id = db.Column(db.String(36), db.ForeignKey('users.id'), nullable=False)
@@ -30,6 +35,26 @@ class Workout(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    # Sparse fieldsets (app/fieldsets.py): to_dict() key -> column attribute
+    API_FIELDS = {
+        'id': 'id',
+        'userId': 'user_id',
+        'memberId': 'member_id',
+        'type': 'type',
+        'name': 'name',
+        'duration': 'duration',
+        'calories': 'calories',
+        'intensity': 'intensity',
+        'exercises': 'exercises',
+        'notes': 'notes',
+        'date': 'date',
+        'createdAt': 'created_at',
+        'updatedAt': 'updated_at',
+    }
+    API_RELATIONS = {
+        'member': ('member', lambda workout: workout.member.to_dict() if workout.member else None),
+    }
+
     def to_dict(self):
         """Convert to dictionary."""
         return {
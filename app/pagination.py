@@ -0,0 +1,196 @@
+"""
+Keyset Pagination
+=================
+Purpose: Page through list endpoints with opaque cursors instead of
+OFFSET.
+
+OFFSET pages get slower the deeper they go (the database still walks every
+skipped row), and page numbers shift when rows are inserted. A cursor
+encodes the sort key of the last row returned, e.g. (created_at, id), and
+the next page is `WHERE (created_at, id) < (:created_at, :id)` on an index
+with the same columns. Every page costs the same and nothing is skipped
+or repeated.
+
+Cursors are base64url-encoded JSON; clients pass them back unchanged.
+
+Totals: the COUNT(*) over a filtered list often costs more than the page
+itself. `?count=` picks how the total is produced, and the response's
+`totalKind` says which one was used:
+  exact     - COUNT(*) on every request (page/limit default)
+  cached    - COUNT(*) cached per worker for LIST_COUNT_CACHE_TTL seconds,
+              keyed by the endpoint and its normalized filters
+  estimated - the planner's estimate (Postgres: pg_class.reltuples for an
+              unfiltered list, EXPLAIN's row estimate otherwise); falls
+              back to cached on other databases
+  none      - no total (cursor default)
+"""
+
+import base64
+import json
+import math
+from datetime import date, datetime
+
+import sqlalchemy as sa
+from flask import current_app
+from app import db
+from app.cache import TTLCache
+
+MAX_LIMIT = 100
+TOTAL_KINDS = ('exact', 'cached', 'estimated', 'none')
+
+# (endpoint, normalized filters) -> exact count
+count_cache = TTLCache(maxsize=1024, ttl=30)
+
+
+class InvalidCursor(ValueError):
+    """The cursor was not produced by this sort order."""
+
+
+def _to_json(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def _from_json(column, value):
+    if value is None:
+        return None
+    python_type = column.type.python_type
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    if python_type is date:
+        return date.fromisoformat(value)
+    return python_type(value)
+
+
+def encode_cursor(values):
+    raw = json.dumps([_to_json(value) for value in values], separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor, columns):
+    """Cursor string -> sort key values typed like `columns`."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        values = json.loads(raw)
+        if not isinstance(values, list) or len(values) != len(columns):
+            raise ValueError
+        return [_from_json(column, value) for column, value in zip(columns, values)]
+    except (ValueError, TypeError, NotImplementedError) as exc:
+        raise InvalidCursor('Invalid cursor') from exc
+
+
+def parse_limit(value, default=20, maximum=MAX_LIMIT):
+    """Page size from a query string value, clamped to 1..maximum."""
+    try:
+        limit = int(value) if value not in (None, '') else default
+    except ValueError:
+        limit = default
+    return max(1, min(limit, maximum))
+
+
+def keyset_page(query, columns, limit, cursor=None):
+    """Fetch one page of `query` in descending `columns` order.
+
+    `columns` must end with a unique column (the primary key) so the order
+    is total. A nullable leading column (e.g. workouts.date) sorts NULLS
+    LAST: rows with a value are paged first, then rows without one by the
+    remaining columns, each part in index order. Returns (items,
+    next_cursor); next_cursor is None on the last page. Raises
+    InvalidCursor for a malformed cursor.
+    """
+    values = decode_cursor(cursor, columns) if cursor else None
+    lead, rest = columns[0], columns[1:]
+    nullable = bool(rest) and lead.nullable
+    rows = []
+    # `(lead, ...) < (...)` is never true for a NULL lead, so the first
+    # part never returns NULL rows
+    if not (nullable and values and values[0] is None):
+        page = query
+        if values:
+            page = page.filter(sa.tuple_(*columns) < sa.tuple_(*values))
+        elif nullable:
+            page = page.filter(lead.isnot(None))
+        rows = page.order_by(*[column.desc() for column in columns]).limit(limit + 1).all()
+    if nullable and len(rows) <= limit:
+        page = query.filter(lead.is_(None))
+        if values and values[0] is None:
+            page = page.filter(sa.tuple_(*rest) < sa.tuple_(*values[1:]))
+        rows += page.order_by(*[column.desc() for column in rest]).limit(limit + 1 - len(rows)).all()
+
+    items = rows[:limit]
+    next_cursor = None
+    if len(rows) > limit:
+        last = items[-1]
+        next_cursor = encode_cursor([getattr(last, column.key) for column in columns])
+    return items, next_cursor
+
+
+def filter_key(endpoint, **filters):
+    """Cache key for a list's filters: blank and 'all' values dropped, sorted."""
+    normalized = tuple(sorted(
+        (name, value.strip().lower() if isinstance(value, str) else value)
+        for name, value in filters.items()
+        if value not in (None, '', 'all')
+    ))
+    return endpoint, normalized
+
+
+def _estimate(query):
+    """Planner row estimate for a query, or None when unavailable."""
+    connection = db.session.connection()
+    if connection.dialect.name != 'postgresql':
+        return None
+    statement = query.order_by(None).statement
+    if statement.whereclause is None and len(statement.get_final_froms()) == 1:
+        table = statement.get_final_froms()[0]
+        reltuples = connection.execute(
+            sa.text('SELECT reltuples FROM pg_class WHERE oid = CAST(:name AS regclass)'),
+            {'name': table.name}
+        ).scalar()
+        # -1 (or 0) until the table has been vacuumed/analyzed
+        if reltuples and reltuples > 0:
+            return int(reltuples)
+    compiled = statement.compile(dialect=connection.dialect)
+    plan = connection.exec_driver_sql('EXPLAIN (FORMAT JSON) ' + str(compiled), compiled.params).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+def count_total(query, kind, cache_key):
+    """Total rows of `query` as (total, kind actually used)."""
+    if kind == 'none':
+        return None, 'none'
+    if kind == 'estimated':
+        estimate = _estimate(query)
+        if estimate is not None:
+            return estimate, 'estimated'
+        kind = 'cached'
+    if kind == 'cached':
+        count_cache.ttl = current_app.config.get('LIST_COUNT_CACHE_TTL', count_cache.ttl)
+        return count_cache.get_or_load(cache_key, lambda: query.order_by(None).count()), 'cached'
+    return query.order_by(None).count(), 'exact'
+
+
+def parse_total_kind(value, default):
+    """?count= value, or None if it is not one of TOTAL_KINDS."""
+    kind = value or default
+    return kind if kind in TOTAL_KINDS else None
+
+
+def offset_page(query, page, limit, kind, cache_key):
+    """page/limit paging with a total chosen by `kind`.
+
+    Returns (items, pagination dict) in the existing response shape plus
+    totalKind. `total` and `pages` are null when kind is 'none'.
+    """
+    items = query.limit(limit).offset(max(page - 1, 0) * limit).all()
+    total, kind = count_total(query, kind, cache_key)
+    return items, {
+        'page': page,
+        'limit': limit,
+        'total': total,
+        'pages': math.ceil(total / limit) if total is not None and limit else None,
+        'totalKind': kind,
+    }
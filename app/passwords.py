@@ -0,0 +1,133 @@
+"""
+Password Hashing
+================
+Purpose: bcrypt hashing/verification with a configurable cost and an
+optional bounded executor, so a burst of logins cannot monopolise a worker.
+
+Settings (app config):
+  BCRYPT_ROUNDS       - cost factor for new hashes; stored hashes with a
+                        different cost are rehashed on the next login
+  BCRYPT_EXECUTOR     - 'inline' (call bcrypt in the request thread),
+                        'thread' (bounded thread pool; bcrypt releases the
+                        GIL, and under gevent the pool uses real OS threads
+                        so the hub keeps serving) or 'process' (bounded
+                        process pool)
+  BCRYPT_MAX_WORKERS  - pool size; also caps concurrent hashes per worker
+  BCRYPT_BULK_WORKERS - process pool size for hash_many() (bulk imports);
+                        0 = one process per CPU
+"""
+
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import bcrypt
+from flask import current_app, has_app_context
+
+DEFAULT_ROUNDS = 12
+# bcrypt only reads this many bytes, and bcrypt 5 raises on longer input
+MAX_PASSWORD_BYTES = 72
+EXECUTORS = ('inline', 'thread', 'process')
+
+_executors = {}
+_executors_lock = threading.Lock()
+
+
+def _setting(name, default):
+    if has_app_context():
+        return current_app.config.get(name, default)
+    return default
+
+
+def _gevent_patched():
+    try:
+        from gevent import monkey
+    except ImportError:
+        return False
+    return monkey.is_module_patched('threading')
+
+
+def _make_executor(kind, max_workers):
+    if kind == 'thread':
+        if _gevent_patched():
+            # Monkey-patched threads are greenlets; bcrypt needs real ones
+            from gevent.threadpool import ThreadPoolExecutor as GeventThreadPoolExecutor
+            return GeventThreadPoolExecutor(max_workers=max_workers)
+        return ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='bcrypt')
+    # forkserver: never fork a (possibly multi-threaded) gunicorn worker
+    context = multiprocessing.get_context('forkserver')
+    return ProcessPoolExecutor(max_workers=max_workers, mp_context=context)
+
+
+def get_executor():
+    """The configured bcrypt executor, or None when hashing inline."""
+    kind = _setting('BCRYPT_EXECUTOR', 'inline')
+    if kind not in EXECUTORS:
+        raise ValueError(f'BCRYPT_EXECUTOR must be one of {", ".join(EXECUTORS)}, got {kind!r}')
+    if kind == 'inline':
+        return None
+    return _executor(kind, _setting('BCRYPT_MAX_WORKERS', 2))
+
+
+def _executor(kind, max_workers):
+    key = (kind, max_workers)
+    executor = _executors.get(key)
+    if executor is None:
+        with _executors_lock:
+            executor = _executors.get(key)
+            if executor is None:
+                executor = _executors[key] = _make_executor(*key)
+    return executor
+
+
+def _run(fn, *args):
+    executor = get_executor()
+    if executor is None:
+        return fn(*args)
+    return executor.submit(fn, *args).result()
+
+
+def configured_rounds():
+    return _setting('BCRYPT_ROUNDS', DEFAULT_ROUNDS)
+
+
+def hash_password(password, rounds=None):
+    """Hash a password with bcrypt at the configured cost."""
+    salt = bcrypt.gensalt(rounds or configured_rounds())
+    return _run(bcrypt.hashpw, password.encode('utf-8'), salt).decode('utf-8')
+
+
+def hash_many(passwords, rounds=None):
+    """Hash many passwords in parallel on a process pool; keeps the order."""
+    passwords = list(passwords)
+    if not passwords:
+        return []
+    rounds = rounds or configured_rounds()
+    workers = _setting('BCRYPT_BULK_WORKERS', 0) or os.cpu_count() or 1
+    args = [(password.encode('utf-8'), bcrypt.gensalt(rounds)) for password in passwords]
+    executor = _executor('process', workers)
+    chunksize = max(1, len(args) // (workers * 4))
+    hashes = executor.map(bcrypt.hashpw, *zip(*args), chunksize=chunksize)
+    return [hashed.decode('utf-8') for hashed in hashes]
+
+
+def verify_password(password, hashed):
+    """Check a password against a bcrypt hash."""
+    if len(password.encode('utf-8')) > MAX_PASSWORD_BYTES:
+        # Never accepted when setting one, so it cannot match
+        return False
+    return _run(bcrypt.checkpw, password.encode('utf-8'), hashed.encode('utf-8'))
+
+
+def hash_cost(hashed):
+    """Cost factor stored in a bcrypt hash ('$2b$12$...' -> 12)."""
+    try:
+        return int(hashed.split('$')[2])
+    except (AttributeError, IndexError, ValueError):
+        return None
+
+
+def needs_rehash(hashed, rounds=None):
+    """True when a stored hash was made with a different cost than configured."""
+    return hash_cost(hashed) != (rounds or configured_rounds())
@@ -0,0 +1,216 @@
+"""
+Attendance Rollups
+==================
+Purpose: Keep attendance_daily (check-ins per UTC day and member) and
+attendance_hourly (check-ins per UTC hour) in step with attendances, so
+the attendance reports read a row per day or hour instead of aggregating
+every check-in on each request.
+
+Triggers on attendances do the bookkeeping in the same transaction as the
+write, so every path is covered (single and batch check-in, deletes,
+direct inserts) with no extra round trip:
+
+  insert - upsert +1 into the row's day/member and hour
+  delete - -1 from both; rows that reach zero are deleted
+  update - of check_in_time or member_id: delete the old, insert the new
+
+Each write also bumps a counter in attendance_rollup_version; the reports
+use the sum of its rows as their ETag instead of scanning attendances.
+
+  postgresql - PL/pgSQL row trigger attendance_rollups, and statement
+               trigger attendance_rollups_version bumping one of
+               VERSION_SHARDS counter rows (picked by transaction id) once
+               per statement
+  sqlite     - attendance_rollups_ai / _ad / _au triggers (one counter
+               row; SQLite has one writer at a time anyway)
+
+The triggers are installed by every create_all() (DDL event below), so
+`flask bootstrap-db` adds them to existing databases. When they are first
+installed on a database that already has check-ins, the rollups are
+filled from attendances. Rebuild them at any time (e.g. after loading
+data with triggers disabled) with:
+
+  flask --app run rebuild-attendance-rollups
+
+Every check-in in the same hour updates the same attendance_hourly row,
+so on Postgres concurrent check-ins queue on that row lock until the
+writer commits. The version counter is sharded so that it does not make
+every check-in queue behind every other one (a single row would,
+whatever the hour). Batch check-ins insert their rows sorted by hour and
+member, so concurrent batches take the rollup row locks in the same order
+instead of deadlocking.
+"""
+
+import click
+import sqlalchemy as sa
+from flask.cli import with_appcontext
+from app import db
+from app.models import Attendance, AttendanceDaily, AttendanceHourly
+
+TRIGGER = 'attendance_rollups'
+
+VERSION_SHARDS = 16
+
+
+def _bump_version(shard):
+    return (
+        f"INSERT INTO attendance_rollup_version (id, version) VALUES ({shard}, 1) "
+        f"ON CONFLICT (id) DO UPDATE SET version = attendance_rollup_version.version + 1;"
+    )
+
+
+BUMP_VERSION = _bump_version(0)
+
+SQLITE_DAY = 'date({row}.check_in_time)'
+SQLITE_HOUR = "strftime('%Y-%m-%d %H:00:00.000000', {row}.check_in_time)"
+
+
+def _sqlite_add(row):
+    day, hour = SQLITE_DAY.format(row=row), SQLITE_HOUR.format(row=row)
+    return (
+        f"INSERT INTO attendance_daily (day, member_id, checkins) VALUES ({day}, {row}.member_id, 1) "
+        f"ON CONFLICT (day, member_id) DO UPDATE SET checkins = checkins + 1; "
+        f"INSERT INTO attendance_hourly (hour, checkins) VALUES ({hour}, 1) "
+        f"ON CONFLICT (hour) DO UPDATE SET checkins = checkins + 1;"
+    )
+
+
+def _sqlite_remove(row):
+    day, hour = SQLITE_DAY.format(row=row), SQLITE_HOUR.format(row=row)
+    daily = f"day = {day} AND member_id = {row}.member_id"
+    hourly = f"hour = {hour}"
+    return (
+        f"UPDATE attendance_daily SET checkins = checkins - 1 WHERE {daily}; "
+        f"DELETE FROM attendance_daily WHERE {daily} AND checkins <= 0; "
+        f"UPDATE attendance_hourly SET checkins = checkins - 1 WHERE {hourly}; "
+        f"DELETE FROM attendance_hourly WHERE {hourly} AND checkins <= 0;"
+    )
+
+
+SQLITE_DDL = (
+    f"CREATE TRIGGER IF NOT EXISTS {TRIGGER}_ai AFTER INSERT ON attendances BEGIN "
+    f"{_sqlite_add('new')} {BUMP_VERSION} END",
+    f"CREATE TRIGGER IF NOT EXISTS {TRIGGER}_ad AFTER DELETE ON attendances BEGIN "
+    f"{_sqlite_remove('old')} {BUMP_VERSION} END",
+    f"CREATE TRIGGER IF NOT EXISTS {TRIGGER}_au AFTER UPDATE OF check_in_time, member_id "
+    f"ON attendances BEGIN {_sqlite_remove('old')} {_sqlite_add('new')} {BUMP_VERSION} END",
+)
+
+POSTGRES_DDL = (
+    f"""
+    CREATE OR REPLACE FUNCTION {TRIGGER}() RETURNS trigger LANGUAGE plpgsql AS $$
+    BEGIN
+        IF TG_OP IN ('DELETE', 'UPDATE') THEN
+            UPDATE attendance_daily SET checkins = checkins - 1
+                WHERE day = OLD.check_in_time::date AND member_id = OLD.member_id;
+            DELETE FROM attendance_daily
+                WHERE day = OLD.check_in_time::date AND member_id = OLD.member_id AND checkins <= 0;
+            UPDATE attendance_hourly SET checkins = checkins - 1
+                WHERE hour = date_trunc('hour', OLD.check_in_time);
+            DELETE FROM attendance_hourly
+                WHERE hour = date_trunc('hour', OLD.check_in_time) AND checkins <= 0;
+        END IF;
+        IF TG_OP IN ('INSERT', 'UPDATE') THEN
+            INSERT INTO attendance_daily (day, member_id, checkins)
+                VALUES (NEW.check_in_time::date, NEW.member_id, 1)
+                ON CONFLICT (day, member_id) DO UPDATE SET checkins = attendance_daily.checkins + 1;
+            INSERT INTO attendance_hourly (hour, checkins)
+                VALUES (date_trunc('hour', NEW.check_in_time), 1)
+                ON CONFLICT (hour) DO UPDATE SET checkins = attendance_hourly.checkins + 1;
+        END IF;
+        RETURN NULL;
+    END $$
+    """,
+    # Transactions started around the same time get consecutive ids, so
+    # concurrent check-ins bump (and lock) different rows
+    f"""
+    CREATE OR REPLACE FUNCTION {TRIGGER}_version() RETURNS trigger LANGUAGE plpgsql AS $$
+    BEGIN
+        {_bump_version(f'txid_current() % {VERSION_SHARDS}')}
+        RETURN NULL;
+    END $$
+    """,
+    f"DROP TRIGGER IF EXISTS {TRIGGER} ON attendances",
+    f"CREATE TRIGGER {TRIGGER} AFTER INSERT OR DELETE OR UPDATE OF check_in_time, member_id "
+    f"ON attendances FOR EACH ROW EXECUTE FUNCTION {TRIGGER}()",
+    f"DROP TRIGGER IF EXISTS {TRIGGER}_version ON attendances",
+    f"CREATE TRIGGER {TRIGGER}_version AFTER INSERT OR DELETE OR UPDATE OF check_in_time, member_id "
+    f"ON attendances FOR EACH STATEMENT EXECUTE FUNCTION {TRIGGER}_version()",
+)
+
+TABLES = ('attendances', 'attendance_daily', 'attendance_hourly', 'attendance_rollup_version')
+
+
+def _installed(connection):
+    if connection.dialect.name == 'sqlite':
+        query = "SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = :name"
+        name = f'{TRIGGER}_ai'
+    else:
+        query = 'SELECT 1 FROM pg_trigger WHERE tgname = :name AND NOT tgisinternal'
+        # The version trigger is created last
+        name = f'{TRIGGER}_version'
+    return connection.execute(sa.text(query), {'name': name}).first() is not None
+
+
+def install_rollup_triggers(connection, rebuild=False):
+    """Create the rollup triggers if missing. Returns True if created.
+
+    Newly installed rollups are filled from the check-ins already in
+    attendances; rebuild=True recreates the triggers and refills them.
+    """
+    dialect = connection.dialect.name
+    if dialect not in ('sqlite', 'postgresql'):
+        return False
+    inspector = sa.inspect(connection)
+    if not all(inspector.has_table(table) for table in TABLES):
+        return False
+    created = not _installed(connection)
+    if created or rebuild:
+        for statement in SQLITE_DDL if dialect == 'sqlite' else POSTGRES_DDL:
+            connection.exec_driver_sql(statement)
+        rebuild_rollups(connection)
+    return created
+
+
+def _day_and_hour(dialect, column):
+    if dialect == 'sqlite':
+        return sa.func.date(column), sa.func.strftime('%Y-%m-%d %H:00:00.000000', column)
+    return sa.cast(column, sa.Date), sa.func.date_trunc('hour', column)
+
+
+def rebuild_rollups(connection):
+    """Recompute both rollups from attendances. Returns the rows written."""
+    if connection.dialect.name == 'postgresql':
+        # Hold off check-ins so none is counted twice or missed
+        connection.exec_driver_sql('LOCK TABLE attendances IN SHARE MODE')
+    attendances = Attendance.__table__
+    daily = AttendanceDaily.__table__
+    hourly = AttendanceHourly.__table__
+    day, hour = _day_and_hour(connection.dialect.name, attendances.c.check_in_time)
+
+    connection.execute(sa.delete(daily))
+    connection.execute(sa.delete(hourly))
+    days = connection.execute(sa.insert(daily).from_select(
+        ['day', 'member_id', 'checkins'],
+        sa.select(day, attendances.c.member_id, sa.func.count()).group_by(day, attendances.c.member_id)
+    )).rowcount
+    hours = connection.execute(sa.insert(hourly).from_select(
+        ['hour', 'checkins'],
+        sa.select(hour, sa.func.count()).group_by(hour)
+    )).rowcount
+    connection.exec_driver_sql(BUMP_VERSION)
+    return days + hours
+
+
+@sa.event.listens_for(db.metadata, 'after_create')
+def _create_rollup_triggers(metadata, connection, **kw):
+    install_rollup_triggers(connection)
+
+
+@click.command('rebuild-attendance-rollups')
+@with_appcontext
+def rebuild_attendance_rollups_command():
+    """Recompute attendance_daily and attendance_hourly from attendances."""
+    with db.engine.begin() as connection:
+        install_rollup_triggers(connection, rebuild=True)
+    click.echo('Attendance rollups rebuilt')
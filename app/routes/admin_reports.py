@@ -1,19 +1,16 @@
 from datetime import datetime, timedelta, timezone
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask_jwt_extended import jwt_required
 from sqlalchemy import func
 from app import db
-from app.models import Attendance, Workout, Member, User
+from app.models import Attendance, AttendanceDaily, Workout, Member
+from app.middleware.auth import current_user_is_admin
 
 admin_reports_bp = Blueprint('admin_reports', __name__)
 
 
 def _require_admin():
-    user_id = get_jwt_identity()
-    user = db.session.get(User, user_id)
-    if not user or user.role != 'admin':
-        return None
-    return user
+    return current_user_is_admin()
 
 
 @admin_reports_bp.route('/attendance-frequency', methods=['GET'])
@@ -50,15 +47,20 @@ def attendance_frequency():
     top = int(request.args.get('top', 10))
     since = datetime.now(timezone.utc) - timedelta(days=days)
 
+    # Read from the daily rollup (app/rollups.py): whole UTC days, from the
+    # day `since` falls on
+    since_day = since.date()
+
     # total checkins in range
-    total_checkins = db.session.query(func.count(Attendance.id)).filter(Attendance.check_in_time >= since).scalar() or 0
+    total_checkins = db.session.query(func.sum(AttendanceDaily.checkins)).filter(AttendanceDaily.day >= since_day).scalar() or 0
 
     # per-member counts (paginated)
+    checkins = func.sum(AttendanceDaily.checkins)
     members_query = db.session.query(
       Member.id.label('memberId'),
       Member.name.label('memberName'),
-      func.count(Attendance.id).label('checkins')
-    ).join(Attendance, Member.id == Attendance.member_id).filter(Attendance.check_in_time >= since).group_by(Member.id).order_by(func.count(Attendance.id).desc())
+      checkins.label('checkins')
+    ).join(AttendanceDaily, Member.id == AttendanceDaily.member_id).filter(AttendanceDaily.day >= since_day).group_by(Member.id).order_by(checkins.desc())
 
     total_members_with_activity = members_query.count()
     page = int(request.args.get('page', 1))
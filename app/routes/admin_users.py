@@ -0,0 +1,203 @@
+"""
+Admin User Import
+=================
+Purpose: Onboard a whole gym's users in one request.
+
+Rows are read from the request body as they arrive (CSV with a header row,
+or NDJSON with one object per line) and processed in batches of
+USER_IMPORT_BATCH_SIZE:
+  1. rows are validated with the same rules as /api/auth/register
+     (required fields, unique email; emails repeated in the file fail too)
+  2. the batch's passwords are hashed in parallel on a process pool
+     (passwords.hash_many)
+  3. the valid rows are inserted with one multi-row INSERT and committed
+
+The response is NDJSON, streamed as the import runs:
+  {"type": "error", "row": 7, "email": "...", "message": "..."}  per bad row
+  {"type": "progress", "processed": 500, "created": 498, "failed": 2}  per batch
+  {"type": "done", "processed": ..., "created": ..., "failed": ...}
+
+Endpoints:
+  POST /api/admin/users/import - Import users from CSV or NDJSON (admin)
+"""
+
+import codecs
+import csv
+import json
+import uuid
+from datetime import datetime
+from itertools import islice
+from flask import Blueprint, Response, current_app, jsonify, request, stream_with_context
+from sqlalchemy.exc import IntegrityError
+from app import db
+from app.models import User
+from app.middleware.auth import admin_required
+from app.passwords import hash_many
+from app.routes.auth import EMAIL_TAKEN, registration_error
+
+admin_users_bp = Blueprint('admin_users', __name__)
+
+ROLES = ('user', 'admin')
+CSV_TYPES = ('text/csv', 'application/csv')
+NDJSON_TYPES = ('application/x-ndjson', 'application/ndjson', 'application/jsonl')
+
+
+def _lines(stream):
+    """Decoded lines of the request body, read incrementally."""
+    decoder = codecs.getincrementaldecoder('utf-8-sig')()
+    buffer = ''
+    for chunk in iter(lambda: stream.read(65536), b''):
+        buffer += decoder.decode(chunk)
+        *lines, buffer = buffer.split('\n')
+        yield from lines
+    buffer += decoder.decode(b'', final=True)
+    if buffer:
+        yield buffer
+
+
+def _ndjson_rows(lines):
+    for line in lines:
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            row = None
+        yield row if isinstance(row, dict) else {'_error': 'Invalid JSON object'}
+
+
+def _csv_rows(lines):
+    for row in csv.DictReader(lines):
+        yield {key.strip(): (value or '').strip() for key, value in row.items() if key}
+
+
+def _row_error(row, seen):
+    if '_error' in row:
+        return row['_error']
+    error = registration_error(row)
+    if error:
+        return error
+    if (row.get('role') or 'user') not in ROLES:
+        return f'Role must be one of {", ".join(ROLES)}'
+    if row['email'] in seen:
+        return 'Duplicate email in import'
+    return None
+
+
+def _insert(rows):
+    """One multi-row INSERT for a batch of prepared user rows."""
+    if rows:
+        db.session.execute(db.insert(User).values(rows))
+    db.session.commit()
+
+
+def _import_batch(batch, seen):
+    """Validate, hash and insert one batch. Returns (created, errors)."""
+    errors = []
+    valid = []
+    for number, row in batch:
+        error = _row_error(row, seen)
+        if error:
+            errors.append((number, row, error))
+        else:
+            seen.add(row['email'])
+            valid.append((number, row))
+
+    taken = User.taken_emails(row['email'] for _, row in valid)
+    for number, row in valid:
+        if row['email'] in taken:
+            errors.append((number, row, EMAIL_TAKEN))
+    valid = [(number, row) for number, row in valid if row['email'] not in taken]
+
+    now = datetime.utcnow()
+    hashes = hash_many(row['password'] for _, row in valid)
+    rows = [{
+        'id': str(uuid.uuid4()),
+        'name': row['name'],
+        'email': row['email'],
+        'password': hashed,
+        'role': row.get('role') or 'user',
+        'phone': row.get('phone') or None,
+        'created_at': now,
+        'updated_at': now,
+    } for (_, row), hashed in zip(valid, hashes)]
+
+    try:
+        _insert(rows)
+    except IntegrityError:
+        # Someone registered one of these emails since the check above
+        db.session.rollback()
+        taken = User.taken_emails(row['email'] for row in rows)
+        errors.extend((number, row, EMAIL_TAKEN) for number, row in valid if row['email'] in taken)
+        rows = [row for row in rows if row['email'] not in taken]
+        _insert(rows)
+
+    errors.sort(key=lambda error: error[0])
+    return len(rows), errors
+
+
+def _event(**fields):
+    return json.dumps(fields) + '\n'
+
+
+@admin_users_bp.route('/import', methods=['POST'])
+@admin_required
+def import_users():
+    """
+    Bulk import users from CSV or NDJSON (Admin only)
+    ---
+    tags:
+      - Admin
+    security:
+      - Bearer: []
+    consumes:
+      - text/csv
+      - application/x-ndjson
+    produces:
+      - application/x-ndjson
+    description: CSV needs a header row with name, email and password
+      (optional phone, role). NDJSON takes one object per line with the same
+      keys. Rows are validated like /api/auth/register.
+    parameters:
+      - in: body
+        name: body
+        required: true
+        schema:
+          type: string
+          example: "name,email,password\\nJane Doe,jane@example.com,password123"
+    responses:
+      200:
+        description: NDJSON stream of per-row errors, per-batch progress and a final summary
+      403:
+        description: Admin access required
+      415:
+        description: Body must be CSV or NDJSON
+    """
+    mimetype = request.mimetype
+    if mimetype in CSV_TYPES:
+        parse = _csv_rows
+    elif mimetype in NDJSON_TYPES:
+        parse = _ndjson_rows
+    else:
+        return jsonify({'message': 'Send text/csv or application/x-ndjson'}), 415
+
+    batch_size = current_app.config.get('USER_IMPORT_BATCH_SIZE', 500)
+    rows = enumerate(parse(_lines(request.stream)), start=1)
+
+    def generate():
+        seen = set()
+        processed = created = failed = 0
+        while True:
+            batch = list(islice(rows, batch_size))
+            if not batch:
+                break
+            batch_created, errors = _import_batch(batch, seen)
+            for number, row, message in errors:
+                yield _event(type='error', row=number, email=row.get('email'), message=message)
+            processed += len(batch)
+            created += batch_created
+            failed += len(errors)
+            yield _event(type='progress', processed=processed, created=created, failed=failed)
+        yield _event(type='done', processed=processed, created=created, failed=failed)
+
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
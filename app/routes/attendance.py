@@ -1,13 +1,32 @@
-from datetime import datetime, date
-from flask import Blueprint, request, jsonify
+from datetime import datetime
+from flask import Blueprint, current_app, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from flasgger import swag_from
 from app import db
 from app.models import Attendance, Member, User
+from app.models.attendance import CHECK_IN_STATUSES
+from app.check_in_batch import DEFAULT_MAX_ITEMS, check_in_batch
+from app.check_ins import cached_refusal, checked_in_today, member_statuses
 from app.middleware.auth import admin_required
+from app.fieldsets import InvalidFields, apply_fields, dump, parse_fields
+from app.pagination import InvalidCursor, keyset_page, parse_limit
 
 attendance_bp = Blueprint('attendance', __name__)
 
+# Keyset order for history pages (index ix_attendances_member_time)
+HISTORY_ORDER = (Attendance.check_in_time, Attendance.id)
+# History used to be uncapped; keep large pages working
+HISTORY_MAX_LIMIT = 1000
+# cached_refusal() default: distinguishes 'not cached' from a cached None
+_NOT_CACHED = object()
+
+
+def _history_page(member_id, fields=None):
+    """One page of a member's check-ins, newest first, and the next cursor."""
+    limit = parse_limit(request.args.get('limit'), default=30, maximum=HISTORY_MAX_LIMIT)
+    query = Attendance.query.filter(Attendance.member_id == member_id)
+    query = apply_fields(query, Attendance, fields, extra=HISTORY_ORDER)
+    return keyset_page(query, HISTORY_ORDER, limit, request.args.get('cursor'))
+
 
 @attendance_bp.route('/checkin', methods=['POST'])
 @jwt_required()
@@ -54,34 +73,101 @@ def check_in():
     if not member_id:
         return jsonify({'message': 'member_id is required'}), 400
 
-    # Check if member exists
+    # Repeated taps and inactive members are refused from this worker's
+    # caches (app/check_ins.py) without a database round trip
+    if member_id in checked_in_today:
+        return _already_checked_in()
+    status = cached_refusal(member_id, _NOT_CACHED)
+    if status is not _NOT_CACHED:
+        return _refusal(status)
+
+    # One INSERT ... ON CONFLICT DO NOTHING; the unique (member_id,
+    # check_in_date) index makes concurrent taps safe
+    checked_in = Attendance.check_in(member_id, user_id)
+    if checked_in is None:
+        db.session.rollback()
+        return _check_in_refused(member_id)
+    db.session.commit()
+
+    attendance, member_name = checked_in
+    checked_in_today.add(member_id, attendance.check_in_date)
+    return jsonify({
+        'message': 'Check-in successful! 🎉',
+        'data': {**attendance.to_dict(), 'memberName': member_name}
+    }), 200
+
+
+def _check_in_refused(member_id):
+    """Why Attendance.check_in() inserted nothing (only on the failure path)."""
     member = Member.query.get(member_id)
-    if not member:
+    if member is None or member.membership_status not in CHECK_IN_STATUSES:
+        status = member.membership_status if member else None
+        member_statuses.set(member_id, status)
+        return _refusal(status)
+
+    checked_in_today.add(member_id, datetime.utcnow().date())
+    return _already_checked_in()
+
+
+def _refusal(status):
+    if status is None:
         return jsonify({'message': 'Member not found'}), 404
+    return jsonify({'message': f'Cannot check in. Membership status: {status}'}), 400
 
-    # Check if member has active membership
-    if member.membership_status not in ['active', 'premium', 'vip']:
-        return jsonify({
-            'message': f'Cannot check in. Membership status: {member.membership_status}'
-        }), 400
 
-    # Check for duplicate check-in today
-    if Attendance.has_checked_in_today(member_id):
-        return jsonify({'message': 'Already checked in today'}), 400
+def _already_checked_in():
+    return jsonify({'message': 'Already checked in today'}), 400
 
-    # Create attendance record
-    attendance = Attendance(
-        member_id=member_id,
-        user_id=user_id
-    )
 
-    db.session.add(attendance)
-    db.session.commit()
+@attendance_bp.route('/checkin/batch', methods=['POST'])
+@jwt_required()
+def batch_check_in():
+    """
+    Record check-ins buffered by an offline kiosk
+    ---
+    tags:
+      - Attendance
+    security:
+      - Bearer: []
+    parameters:
+      - in: body
+        name: body
+        required: true
+        schema:
+          type: array
+          items:
+            type: object
+            required:
+              - member_id
+              - check_in_time
+              - client_event_id
+            properties:
+              member_id:
+                type: string
+              check_in_time:
+                type: string
+                example: "2024-05-01T06:58:12Z"
+              client_event_id:
+                type: string
+                description: Generated by the kiosk once per tap and resent on retries
+    responses:
+      200:
+        description: One result per item (created, replayed, already_checked_in or error) plus counts
+      400:
+        description: Body is not a JSON array or has too many items
+    """
+    items = request.get_json(silent=True)
+    if not isinstance(items, list):
+        return jsonify({'message': 'Body must be a JSON array of check-ins'}), 400
+    max_items = current_app.config.get('CHECK_IN_BATCH_MAX_ITEMS', DEFAULT_MAX_ITEMS)
+    if len(items) > max_items:
+        return jsonify({'message': f'At most {max_items} check-ins per batch'}), 400
 
-    return jsonify({
-        'message': 'Check-in successful! 🎉',
-        'data': attendance.to_dict()
-    }), 200
+    result, created = check_in_batch(items, get_jwt_identity())
+    db.session.commit()
+    for member_id, day in created:
+        checked_in_today.add(member_id, day)
+    return jsonify(result)
 
 
 @attendance_bp.route('/history/<member_id>', methods=['GET'])
@@ -105,9 +191,17 @@ def get_attendance_history(member_id):
         type: integer
         default: 30
         description: Maximum number of records to return
+      - in: query
+        name: cursor
+        type: string
+        description: nextCursor from the previous page
+      - in: query
+        name: fields
+        type: string
+        description: Comma-separated fields to return (e.g. id,checkInTime)
     responses:
       200:
-        description: Attendance history retrieved successfully
+        description: Attendance history retrieved successfully (nextCursor is null on the last page)
         schema:
           type: object
           properties:
@@ -126,14 +220,20 @@ def get_attendance_history(member_id):
     if not member:
         return jsonify({'message': 'Member not found'}), 404
 
-    limit = request.args.get('limit', 30, type=int)
-    records = Attendance.get_member_history(member_id, limit)
+    try:
+        fields = parse_fields(request.args.get('fields'), Attendance)
+        records, next_cursor = _history_page(member_id, fields)
+    except InvalidCursor:
+        return jsonify({'message': 'Invalid cursor'}), 400
+    except InvalidFields as exc:
+        return jsonify({'message': str(exc)}), 400
 
     return jsonify({
         'memberId': member_id,
         'memberName': member.name,
         'totalCheckins': len(records),
-        'history': [record.to_dict() for record in records]
+        'history': [dump(record, fields) for record in records],
+        'nextCursor': next_cursor
     })
 
 
@@ -153,9 +253,17 @@ def get_my_attendance():
         type: integer
         default: 30
         description: Maximum number of records to return
+      - in: query
+        name: cursor
+        type: string
+        description: nextCursor from the previous page
+      - in: query
+        name: fields
+        type: string
+        description: Comma-separated fields to return (e.g. id,checkInTime)
     responses:
       200:
-        description: User's attendance history
+        description: User's attendance history (nextCursor is null on the last page)
       404:
         description: No member profile found for this user
     """
@@ -166,14 +274,20 @@ def get_my_attendance():
     if not member:
         return jsonify({'message': 'No member profile found'}), 404
 
-    limit = request.args.get('limit', 30, type=int)
-    records = Attendance.get_member_history(member.id, limit)
+    try:
+        fields = parse_fields(request.args.get('fields'), Attendance)
+        records, next_cursor = _history_page(member.id, fields)
+    except InvalidCursor:
+        return jsonify({'message': 'Invalid cursor'}), 400
+    except InvalidFields as exc:
+        return jsonify({'message': str(exc)}), 400
 
     return jsonify({
         'memberId': member.id,
         'memberName': member.name,
         'totalCheckins': len(records),
-        'history': [record.to_dict() for record in records]
+        'history': [dump(record, fields) for record in records],
+        'nextCursor': next_cursor
     })
 
 
@@ -187,6 +301,11 @@ def get_today_attendance():
       - Attendance
     security:
       - Bearer: []
+    parameters:
+      - in: query
+        name: fields
+        type: string
+        description: Comma-separated fields to return (e.g. id,checkInTime)
     responses:
       200:
         description: Today's attendance list
@@ -204,12 +323,18 @@ def get_today_attendance():
       403:
         description: Admin access required
     """
-    attendances = Attendance.get_today_attendances()
+    try:
+        fields = parse_fields(request.args.get('fields'), Attendance)
+    except InvalidFields as exc:
+        return jsonify({'message': str(exc)}), 400
+
+    today = datetime.utcnow().date()
+    attendances = Attendance.get_today_attendances(apply_fields(Attendance.query, Attendance, fields), today)
     
     return jsonify({
-        'date': date.today().isoformat(),
+        'date': today.isoformat(),
         'totalCheckins': len(attendances),
-        'attendances': [attendance.to_dict() for attendance in attendances]
+        'attendances': [dump(attendance, fields) for attendance in attendances]
     })
 
 
@@ -247,40 +372,16 @@ def get_attendance_stats(member_id):
       404:
         description: Member not found
     """
-    member = Member.query.get(member_id)
-    if not member:
+    # One aggregate query (conditional COUNTs + MAX) on the member's index range
+    stats = Attendance.get_member_stats(member_id)
+    if stats is None:
         return jsonify({'message': 'Member not found'}), 404
 
-    # Get all attendance records
-    all_records = Attendance.query.filter_by(member_id=member_id).all()
-    
-    # Calculate stats
-    now = datetime.utcnow()
-    this_month = now.month
-    this_year = now.year
-    
-    month_count = sum(
-        1 for r in all_records 
-        if r.check_in_time.month == this_month and r.check_in_time.year == this_year
-    )
-    
-    # This week (last 7 days)
-    from datetime import timedelta
-    one_week_ago = now - timedelta(days=7)
-    week_count = sum(1 for r in all_records if r.check_in_time >= one_week_ago)
-    
-    # Last check-in
-    last_record = Attendance.query.filter_by(
-        member_id=member_id
-    ).order_by(Attendance.check_in_time.desc()).first()
-    
+    last_check_in = stats['lastCheckIn']
     return jsonify({
         'memberId': member_id,
-        'memberName': member.name,
-        'totalCheckins': len(all_records),
-        'thisMonth': month_count,
-        'thisWeek': week_count,
-        'lastCheckIn': last_record.check_in_time.isoformat() if last_record else None
+        **stats,
+        'lastCheckIn': last_check_in.isoformat() if last_check_in else None
     })
 
 
@@ -311,7 +412,9 @@ def delete_attendance(attendance_id):
     if not attendance:
         return jsonify({'message': 'Attendance record not found'}), 404
 
+    member_id, day = attendance.member_id, attendance.check_in_date
     db.session.delete(attendance)
     db.session.commit()
+    checked_in_today.discard(member_id, day)
 
     return jsonify({'message': 'Attendance record deleted successfully'})
\ No newline at end of file
@@ -12,34 +12,53 @@ Implemented:
   Password reset confirmation (with token validation)
   Password hashing and verification
   JWT token-based authorization
+  Per-IP and per-email rate limits on the unauthenticated endpoints
+  Refresh tokens (rotated on use) and logout
 
 Endpoints:
   POST /api/auth/register - Register new user
   POST /api/auth/login - Login user and get JWT token
+  POST /api/auth/refresh - Exchange a refresh token for new tokens
+  POST /api/auth/logout - Revoke the current token (and a refresh token)
   GET /api/auth/me - Get current authenticated user (requires JWT)
   POST /api/auth/reset-password - Request password reset
   POST /api/auth/reset-password/confirm - Confirm password reset with token
 
 Future Considerations:
   - Email verification on registration
-  - Token refresh mechanism
-  - Rate limiting on login attempts
   - Email notifications for password resets
 """
 
-import hashlib
-import secrets
-from datetime import datetime, timedelta
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
-from flasgger import swag_from
+from flask_jwt_extended import jwt_required, current_user, decode_token, get_jwt
+from flask_jwt_extended.exceptions import JWTExtendedException
+from jwt.exceptions import PyJWTError
 from app import db
-from app.models import User
+from app.models import PasswordResetToken, User
+from app.middleware.auth import create_user_refresh_token, create_user_token, revoke_token
+from app.middleware.rate_limit import rate_limit
+from app.passwords import MAX_PASSWORD_BYTES
 
 auth_bp = Blueprint('auth', __name__)
 
+EMAIL_TAKEN = 'Email already exists'
+PASSWORD_TOO_LONG = f'Password must be at most {MAX_PASSWORD_BYTES} bytes'
+
+
+def registration_error(data):
+    """Why `data` cannot register a user, or None. Shared with the bulk import."""
+    if not data.get('name') or not data.get('email') or not data.get('password'):
+        return 'Name, email, and password are required'
+    # JSON bodies and NDJSON rows can carry any type; bcrypt takes strings
+    if not all(isinstance(data[field], str) for field in ('name', 'email', 'password')):
+        return 'Name, email, and password must be strings'
+    if len(data['password'].encode('utf-8')) > MAX_PASSWORD_BYTES:
+        return PASSWORD_TOO_LONG
+    return None
+
 
 @auth_bp.route('/register', methods=['POST'])
+@rate_limit('register')
 def register():
     """
     Register a new user
@@ -74,6 +93,8 @@ def register():
         description: User registered successfully
       400:
         description: Email already registered
+      429:
+        description: Too many requests
     """
     data = request.get_json()
 
@@ -82,13 +103,13 @@ def register():
     email = data.get('email')
     password = data.get('password')
 
-    if not name or not email or not password:
-        return jsonify({'message': 'Name, email, and password are required'}), 400
+    error = registration_error(data)
+    if error:
+        return jsonify({'message': error}), 400
 
     # Check if user exists
-    existing_user = User.query.filter_by(email=email).first()
-    if existing_user:
-        return jsonify({'message': 'Email already exists'}), 400
+    if User.taken_emails([email]):
+        return jsonify({'message': EMAIL_TAKEN}), 400
 
     # Create new user
     user = User(
@@ -102,11 +123,12 @@ def register():
     db.session.commit()
 
     # Generate token
-    token = create_access_token(identity=user.id)
+    token = create_user_token(user)
 
     return jsonify({
         'message': 'User registered successfully',
         'access_token': token,  # Changed from 'token'
+        'refresh_token': create_user_refresh_token(user),
         'user': {
             'id': user.id,
             'name': user.name,
@@ -117,6 +139,7 @@ def register():
 
 
 @auth_bp.route('/login', methods=['POST'])
+@rate_limit('login')
 def login():
     """
     Login user
@@ -146,6 +169,8 @@ def login():
         description: Email and password are required
       401:
         description: Invalid email or password
+      429:
+        description: Too many requests
     """
     data = request.get_json()
 
@@ -160,10 +185,16 @@ def login():
     if not user or not user.check_password(password):
         return jsonify({'message': 'Invalid email or password'}), 401
 
-    token = create_access_token(identity=user.id)
+    # Upgrade (or downgrade) the stored hash when BCRYPT_ROUNDS changed
+    if user.password_needs_rehash():
+        user.set_password(password)
+        db.session.commit()
+
+    token = create_user_token(user)
 
     return jsonify({
         'access_token': token,  # Changed from 'token'
+        'refresh_token': create_user_refresh_token(user),
         'user': {
             'id': user.id,
             'name': user.name,
@@ -173,6 +204,79 @@ def login():
     })
 
 
+@auth_bp.route('/refresh', methods=['POST'])
+@jwt_required(refresh=True)
+def refresh():
+    """
+    Exchange a refresh token for a new access token and refresh token
+    ---
+    tags:
+      - Authentication
+    security:
+      - Bearer: []
+    description: Send the refresh token as the Bearer token. It is revoked
+      and replaced, so each refresh token works once.
+    responses:
+      200:
+        description: New access and refresh tokens
+      401:
+        description: Missing, expired, revoked or already used refresh token
+    """
+    # Only the request that revokes the token gets new ones; a replay, or
+    # a concurrent refresh with the same token, is refused
+    if not revoke_token(get_jwt()):
+        db.session.rollback()
+        return jsonify({'message': 'Token has been revoked'}), 401
+    db.session.commit()
+
+    return jsonify({
+        'access_token': create_user_token(current_user),
+        'refresh_token': create_user_refresh_token(current_user)
+    })
+
+
+@auth_bp.route('/logout', methods=['POST'])
+@jwt_required(verify_type=False)
+def logout():
+    """
+    Log out by revoking the current token
+    ---
+    tags:
+      - Authentication
+    security:
+      - Bearer: []
+    parameters:
+      - in: body
+        name: body
+        required: false
+        schema:
+          type: object
+          properties:
+            refresh_token:
+              type: string
+              description: Also revoke this refresh token
+    responses:
+      200:
+        description: Logged out
+      401:
+        description: Missing, expired or revoked token
+    """
+    revoke_token(get_jwt())
+
+    data = request.get_json(silent=True) or {}
+    if data.get('refresh_token'):
+        try:
+            refresh_payload = decode_token(data['refresh_token'])
+        except (JWTExtendedException, PyJWTError):
+            refresh_payload = None
+        # Only the caller's own refresh tokens
+        if refresh_payload and refresh_payload.get('sub') == current_user.id:
+            revoke_token(refresh_payload)
+
+    db.session.commit()
+    return jsonify({'message': 'Logged out'})
+
+
 @auth_bp.route('/me', methods=['GET'])
 @jwt_required()
 def get_current_user():
@@ -189,8 +293,7 @@ def get_current_user():
       401:
         description: Unauthorized
     """
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
+    user = current_user
 
     if not user:
         return jsonify({'message': 'User not found'}), 404
@@ -204,6 +307,7 @@ def get_current_user():
 
 
 @auth_bp.route('/reset-password', methods=['POST'])
+@rate_limit('reset-password')
 def request_password_reset():
     """
     Request password reset
@@ -227,6 +331,8 @@ def request_password_reset():
         description: Password reset instructions sent
       404:
         description: User not found
+      429:
+        description: Too many requests
     """
     data = request.get_json()
     email = data.get('email')
@@ -240,9 +346,7 @@ def request_password_reset():
         }), 200
 
     # Generate reset token
-    reset_token = secrets.token_hex(32)
-    user.reset_password_token = hashlib.sha256(reset_token.encode()).hexdigest()
-    user.reset_password_expires = datetime.utcnow() + timedelta(minutes=10)
+    reset_token = PasswordResetToken.issue(user.id)
     db.session.commit()
 
     # In production, send email with reset link
@@ -253,6 +357,7 @@ def request_password_reset():
 
 
 @auth_bp.route('/reset-password/confirm', methods=['POST'])
+@rate_limit('reset-password-confirm', by_email=False)
 def confirm_password_reset():
     """
     Confirm password reset
@@ -279,6 +384,8 @@ def confirm_password_reset():
         description: Password reset successful
       400:
         description: Invalid or expired reset token
+      429:
+        description: Too many requests
     """
     data = request.get_json()
     token = data.get('token')
@@ -287,16 +394,22 @@ def confirm_password_reset():
 
     if not token or not password:
         return jsonify({'message': 'Token and password are required'}), 400
+    if not isinstance(password, str):
+        return jsonify({'message': 'Password must be a string'}), 400
+    if len(password.encode('utf-8')) > MAX_PASSWORD_BYTES:
+        return jsonify({'message': PASSWORD_TOO_LONG}), 400
 
-    hashed_token = hashlib.sha256(token.encode()).hexdigest()
-    user = User.query.filter_by(reset_password_token=hashed_token).first()
+    # Marks the token used in the same transaction as the password change
+    user_id = PasswordResetToken.redeem(token)
+    user = db.session.get(User, user_id) if user_id else None
 
-    if not user or user.reset_password_expires < datetime.utcnow():
+    if not user:
+        db.session.rollback()
         return jsonify({'message': 'Invalid or expired reset token'}), 400
 
     user.set_password(password)
-    user.reset_password_token = None
-    user.reset_password_expires = None
+    # Log out every session that used the old password
+    user.revoke_tokens()
     db.session.commit()
 
     return jsonify({'message': 'Password reset successful'})
\ No newline at end of file
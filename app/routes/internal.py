@@ -0,0 +1,85 @@
+"""
+Internal Routes - Per-Worker Diagnostics
+========================================
+Purpose: Expose process-local state that is otherwise invisible behind the
+load balancer. Each response describes only the worker (pid) that served it.
+
+Endpoints:
+  GET /api/internal/db-pool     - Connection pool usage per database engine
+  GET /api/internal/cache-stats - Hit/miss counters of the process-local caches
+"""
+
+import os
+from flask import Blueprint, jsonify
+from app import db
+from app.middleware import admin_required
+from app.middleware.auth import denylist, user_cache
+from app.check_ins import checked_in_today, member_statuses
+from app.memberships import expiring_soon
+from app.pagination import count_cache
+
+internal_bp = Blueprint('internal', __name__)
+
+
+def _pool_stats(engine):
+    pool = engine.pool
+    stats = {
+        'pool': type(pool).__name__,
+        'status': pool.status(),
+    }
+    # Only QueuePool-style pools track sizes; SQLite's StaticPool does not
+    for key, attr in (('size', 'size'), ('checkedOut', 'checkedout'),
+                      ('idle', 'checkedin'), ('overflow', 'overflow')):
+        if hasattr(pool, attr):
+            stats[key] = getattr(pool, attr)()
+    return stats
+
+
+@internal_bp.route('/db-pool', methods=['GET'])
+@admin_required
+def db_pool():
+    """
+    Connection pool usage for the worker that serves the request
+    ---
+    tags:
+      - Internal
+    security:
+      - Bearer: []
+    responses:
+      200:
+        description: Checked-out vs idle connections per engine
+      403:
+        description: Admin access required
+    """
+    return jsonify({
+        'pid': os.getpid(),
+        'engines': {
+            bind_key or 'default': _pool_stats(engine)
+            for bind_key, engine in db.engines.items()
+        }
+    })
+
+
+@internal_bp.route('/cache-stats', methods=['GET'])
+@admin_required
+def cache_stats():
+    """
+    Hit/miss counters of the process-local caches for this worker
+    ---
+    tags:
+      - Internal
+    security:
+      - Bearer: []
+    responses:
+      200:
+        description: Size, hits and misses per cache; every hit is a database round trip saved
+      403:
+        description: Admin access required
+    """
+    caches = {'currentUser': user_cache, 'revokedTokens': denylist.tokens, 'listCounts': count_cache,
+              'expiringMemberships': expiring_soon, 'checkedInToday': checked_in_today,
+              'checkInRefusals': member_statuses}
+    return jsonify({
+        'pid': os.getpid(),
+        'caches': {name: cache.stats() for name, cache in caches.items()}
+    })
@@ -3,6 +3,7 @@ from flask_jwt_extended import jwt_required, get_jwt_identity
 from app import db
 from app.models import MemberRequest, Member, User
 from app.middleware.auth import admin_required
+from app.fieldsets import InvalidFields, apply_fields, dump, parse_fields
 from datetime import datetime
 
 member_requests_bp = Blueprint('member_requests', __name__)
@@ -54,15 +55,21 @@ def get_member_requests():
     """
     Get all member signup requests (admin only)
     Can filter by status: pending, approved, rejected
+    `fields` (comma-separated) limits the loaded and returned fields
     """
     status = request.args.get('status', 'pending')
-    
+    try:
+        fields = parse_fields(request.args.get('fields'), MemberRequest)
+    except InvalidFields as exc:
+        return jsonify({'message': str(exc)}), 400
+
+    query = apply_fields(MemberRequest.query, MemberRequest, fields)
     if status == 'all':
-        requests = MemberRequest.query.order_by(MemberRequest.created_at.desc()).all()
+        requests = query.order_by(MemberRequest.created_at.desc()).all()
     else:
-        requests = MemberRequest.query.filter_by(status=status).order_by(MemberRequest.created_at.desc()).all()
+        requests = query.filter_by(status=status).order_by(MemberRequest.created_at.desc()).all()
 
-    return jsonify([r.to_dict() for r in requests]), 200
+    return jsonify([dump(r, fields) for r in requests]), 200
 
 
 @member_requests_bp.route('/<request_id>', methods=['GET'])
@@ -7,6 +7,8 @@ Implemented:
   [✓] List members (admin only) with search/filter/pagination
   [✓] Get member by ID with attendance/workout history
   [✓] Create, Update, Delete member
+  [✓] Bulk create/update (upsert on email) from JSON or CSV
+  [✓] Memberships expiring in the next N days (cached, app/memberships.py)
   [✓] Filter by status, membership type, search
   [✓] Member statistics aggregation
 
@@ -24,15 +26,30 @@ Dependency Chain:
   - admin_reports.py (member statistics)
 """
 
-from flask import Blueprint, request, jsonify
+import csv
+import io
+from datetime import datetime, timedelta
+from flask import Blueprint, current_app, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from sqlalchemy import or_
 from app import db
 from app.models import Member, Attendance, Workout
 from app.middleware import admin_required
+from app.conditional import conditional_response, resource_validators
+from app.fieldsets import InvalidFields, apply_fields, dump, parse_fields
+from app.member_import import upsert_members
+from app.memberships import expiring_soon
+from app.check_ins import forget_member, member_statuses
+from app.pagination import (
+    TOTAL_KINDS, InvalidCursor, count_total, filter_key, keyset_page, offset_page,
+    parse_limit, parse_total_kind
+)
+from app.search import search_members
 
 members_bp = Blueprint('members', __name__)
 
+# Keyset order for cursor pagination (index ix_members_created_at_id)
+MEMBER_ORDER = (Member.created_at, Member.id)
+
 
 @members_bp.route('', methods=['GET'])
 @admin_required
@@ -48,7 +65,7 @@ def get_members():
       - name: search
         in: query
         type: string
-        description: Search by name or email
+        description: Search by name or email (substring, best matches first)
       - name: status
         in: query
         type: string
@@ -57,6 +74,19 @@ def get_members():
         in: query
         type: string
         enum: [all, basic, premium, vip]
+      - name: cursor
+        in: query
+        type: string
+        description: Keyset pagination; pass an empty value for the first page, then pagination.nextCursor. Without it, page/limit paging is used.
+      - name: fields
+        in: query
+        type: string
+        description: Comma-separated fields to return (e.g. id,name,email); only those columns are loaded
+      - name: count
+        in: query
+        type: string
+        enum: [exact, cached, estimated, none]
+        description: How pagination.total is computed (default exact; none in cursor mode). pagination.totalKind reports the kind used.
       - name: page
         in: query
         type: integer
@@ -68,6 +98,8 @@ def get_members():
     responses:
       200:
         description: List of members with pagination
+      400:
+        description: Invalid cursor
       401:
         description: Unauthorized
       403:
@@ -76,18 +108,21 @@ def get_members():
     search = request.args.get('search')
     status = request.args.get('status')
     membership_type = request.args.get('membershipType')
+    cursor = request.args.get('cursor')
     page = int(request.args.get('page', 1))
     limit = int(request.args.get('limit', 20))
 
+    try:
+        fields = parse_fields(request.args.get('fields'), Member)
+    except InvalidFields as exc:
+        return jsonify({'message': str(exc)}), 400
+
     query = Member.query
 
     if search:
-        query = query.filter(
-            or_(
-                Member.name.ilike(f'%{search}%'),
-                Member.email.ilike(f'%{search}%')
-            )
-        )
+        # Indexed and ranked: best matches first, then newest (app/search.py).
+        # Cursor pages are ordered by MEMBER_ORDER alone.
+        query = search_members(query, search, ranked=cursor is None)
 
     if status and status != 'all':
         query = query.filter(Member.membership_status == status)
@@ -95,18 +130,72 @@ def get_members():
     if membership_type and membership_type != 'all':
         query = query.filter(Member.membership_type == membership_type)
 
+    count = parse_total_kind(request.args.get('count'), 'none' if cursor is not None else 'exact')
+    if count is None:
+        return jsonify({'message': f'count must be one of {", ".join(TOTAL_KINDS)}'}), 400
+    count_key = filter_key('members', search=search, status=status, membershipType=membership_type)
+    query = apply_fields(query, Member, fields, extra=MEMBER_ORDER)
+
+    if cursor is not None:
+        limit = parse_limit(request.args.get('limit'))
+        try:
+            members, next_cursor = keyset_page(query, MEMBER_ORDER, limit, cursor)
+        except InvalidCursor:
+            return jsonify({'message': 'Invalid cursor'}), 400
+        total, total_kind = count_total(query, count, count_key)
+        return jsonify({
+            'members': [dump(m, fields) for m in members],
+            'pagination': {'limit': limit, 'nextCursor': next_cursor,
+                           'total': total, 'totalKind': total_kind}
+        })
+
     query = query.order_by(Member.created_at.desc())
 
-    pagination = query.paginate(page=page, per_page=limit, error_out=False)
+    members, pagination = offset_page(query, page, limit, count, count_key)
 
     return jsonify({
-        'members': [m.to_dict() for m in pagination.items],
-        'pagination': {
-            'page': page,
-            'limit': limit,
-            'total': pagination.total,
-            'pages': pagination.pages
-        }
+        'members': [dump(m, fields) for m in members],
+        'pagination': pagination
+    })
+
+
+@members_bp.route('/expiring', methods=['GET'])
+@admin_required
+def get_expiring_members():
+    """
+    Active memberships ending in the next N days, soonest first
+    ---
+    tags:
+      - Members
+    security:
+      - Bearer: []
+    parameters:
+      - name: days
+        in: query
+        type: integer
+        default: 7
+        description: Window in days (served from a per-worker list while it fits MEMBERSHIP_EXPIRING_DAYS)
+    responses:
+      200:
+        description: Members whose membership ends within the window
+      400:
+        description: days must be a positive integer
+      403:
+        description: Admin access required
+    """
+    try:
+        days = int(request.args.get('days', 7))
+    except ValueError:
+        days = 0
+    if days < 1:
+        return jsonify({'message': 'days must be a positive integer'}), 400
+
+    now = datetime.utcnow()
+    members = expiring_soon.get(now + timedelta(days=days), now=now)
+    return jsonify({
+        'days': days,
+        'total': len(members),
+        'members': [{**m, 'membershipEndDate': m['membershipEndDate'].isoformat()} for m in members]
     })
 
 
@@ -127,7 +216,9 @@ def get_member(member_id):
         required: true
     responses:
       200:
-        description: Member details
+        description: Member details (with ETag and Last-Modified)
+      304:
+        description: Not modified since the If-None-Match / If-Modified-Since validators
       404:
         description: Member not found
     """
@@ -136,7 +227,8 @@ def get_member(member_id):
     if not member:
         return jsonify({'message': 'Member not found'}), 404
 
-    return jsonify(member.to_dict())
+    etag, last_modified = resource_validators(member)
+    return conditional_response(etag, last_modified, lambda: jsonify(member.to_dict()))
 
 
 @members_bp.route('/<member_id>/stats', methods=['GET'])
@@ -160,13 +252,25 @@ def get_member_stats(member_id):
       401:
         description: Unauthorized
     """
-    attendance_count = Attendance.query.filter_by(member_id=member_id).count()
-    workout_count = Workout.query.filter_by(member_id=member_id).count()
-
-    recent_attendance = Attendance.query.filter_by(member_id=member_id)\
+    # The member and both totals in one round trip
+    attendance_count = db.select(db.func.count(Attendance.id))\
+        .where(Attendance.member_id == member_id).scalar_subquery()
+    workout_count = db.select(db.func.count(Workout.id))\
+        .where(Workout.member_id == member_id).scalar_subquery()
+    row = db.session.execute(
+        db.select(Member, attendance_count, workout_count).where(Member.id == member_id)
+    ).first()
+    if row is None:
+        return jsonify({'totalAttendance': 0, 'totalWorkouts': 0,
+                        'recentAttendance': [], 'recentWorkouts': []})
+    member, attendance_count, workout_count = row
+
+    # Both lists share one member, which is now in the session's identity
+    # map: to_dict()'s `.member` resolves from it without another query.
+    recent_attendance = Attendance.query.filter_by(member_id=member.id)\
         .order_by(Attendance.check_in_time.desc()).limit(5).all()
 
-    recent_workouts = Workout.query.filter_by(member_id=member_id)\
+    recent_workouts = Workout.query.filter_by(member_id=member.id)\
         .order_by(Workout.date.desc()).limit(5).all()
 
     return jsonify({
@@ -240,10 +344,75 @@ def create_member():
 
     db.session.add(member)
     db.session.commit()
+    expiring_soon.invalidate()
 
     return jsonify(member.to_dict()), 201
 
 
+@members_bp.route('/bulk', methods=['POST'])
+@admin_required
+def bulk_upsert_members():
+    """
+    Create or update members in bulk, matched by email
+    ---
+    tags:
+      - Members
+    security:
+      - Bearer: []
+    consumes:
+      - application/json
+      - text/csv
+    description: A JSON array of member objects, or CSV with a header row,
+      using the same keys as POST /api/members. Members whose email exists
+      are updated (only the fields given); others are created and need a
+      name. Rows are written in chunks of MEMBER_BULK_CHUNK_SIZE, each
+      committed on its own.
+    parameters:
+      - in: body
+        name: body
+        required: true
+        schema:
+          type: array
+          items:
+            type: object
+            properties:
+              name:
+                type: string
+              email:
+                type: string
+              membershipType:
+                type: string
+                enum: [basic, premium, vip]
+    responses:
+      200:
+        description: Counts and one result per row ({row, status, id} or {row, status, message})
+      400:
+        description: Body is not a JSON array
+      403:
+        description: Admin access required
+      415:
+        description: Body must be JSON or CSV
+    """
+    if request.mimetype == 'text/csv':
+        text = request.get_data().decode('utf-8-sig')
+        rows = [
+            {key.strip(): (value or '').strip() for key, value in row.items() if key}
+            for row in csv.DictReader(io.StringIO(text))
+        ]
+    elif request.is_json:
+        rows = request.get_json(silent=True)
+        if not isinstance(rows, list):
+            return jsonify({'message': 'Body must be a JSON array of members'}), 400
+    else:
+        return jsonify({'message': 'Send application/json or text/csv'}), 415
+
+    chunk_size = current_app.config.get('MEMBER_BULK_CHUNK_SIZE', 1000)
+    result = upsert_members(rows, chunk_size)
+    expiring_soon.invalidate()
+    member_statuses.clear()
+    return jsonify(result)
+
+
 @members_bp.route('/<member_id>', methods=['PUT'])
 @admin_required
 def update_member(member_id):
@@ -309,6 +478,8 @@ def update_member(member_id):
         member.notes = data['notes']
 
     db.session.commit()
+    expiring_soon.invalidate()
+    forget_member(member_id)
 
     return jsonify(member.to_dict())
 
@@ -341,5 +512,7 @@ def delete_member(member_id):
 
     db.session.delete(member)
     db.session.commit()
+    expiring_soon.invalidate()
+    forget_member(member_id)
 
     return jsonify({'message': 'Member deleted successfully'})
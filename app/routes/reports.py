@@ -1,11 +1,16 @@
 import csv
 import io
-from datetime import datetime, timedelta, timezone
+from datetime import datetime, time, timedelta, timezone
 from flask import Blueprint, request, jsonify, Response
 from sqlalchemy import func, extract
+from sqlalchemy.orm import joinedload
 from app import db
-from app.models import Member, Attendance, Workout, User
+from app.models import (
+    Member, Attendance, AttendanceDaily, AttendanceHourly, AttendanceRollupVersion, Workout, User
+)
 from app.middleware import admin_required
+from app.memberships import expiring_soon
+from app.conditional import conditional_response, data_version, versioned
 
 reports_bp = Blueprint('reports', __name__)
 
@@ -15,9 +20,34 @@ MEMBERSHIP_PRICES = {
     'vip': 99.99
 }
 
+# Last-changed column of each table a report reads (ETag, app/conditional.py)
+MEMBERS_VERSION = Member.updated_at
+ATTENDANCE_VERSION = Attendance.created_at
+# Bumped by the rollup triggers (app/rollups.py): a one-row read, not a scan
+ROLLUPS_VERSION = AttendanceRollupVersion.version
+WORKOUTS_VERSION = Workout.updated_at
+EXPORT_VERSIONS = {
+    'members': (MEMBERS_VERSION,),
+    'attendance': (ATTENDANCE_VERSION, MEMBERS_VERSION),
+    'workouts': (WORKOUTS_VERSION, User.updated_at),
+}
+
+
+def _this_minute():
+    # Reports relative to "now" are re-versioned every minute
+    return (datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M'),)
+
+
+def _utc(value):
+    """Naive UTC datetime, as stored, for a parsed request timestamp."""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
 
 @reports_bp.route('/summary', methods=['GET'])
 @admin_required
+@versioned(MEMBERS_VERSION, ROLLUPS_VERSION, WORKOUTS_VERSION)
 def get_summary():
     """
     Get summary report with key metrics
@@ -40,6 +70,8 @@ def get_summary():
         description: Summary report data
       401:
         description: Unauthorized
+      304:
+        description: Data unchanged since If-None-Match (ETag)
       403:
         description: Admin access required
     """
@@ -49,7 +81,8 @@ def get_summary():
     total_members = Member.query.count()
     active_members = Member.query.filter_by(membership_status='active').count()
 
-    attendance_query = Attendance.query
+    # Check-ins come from the hourly rollup (app/rollups.py), to the hour
+    attendance_query = db.session.query(func.coalesce(func.sum(AttendanceHourly.checkins), 0))
     workout_query = Workout.query
     member_query = Member.query
 
@@ -59,20 +92,21 @@ def get_summary():
 
     if start_date:
         start_dt = datetime.fromisoformat(start_date.replace('Z', '+00:00'))
-        attendance_query = attendance_query.filter(Attendance.check_in_time >= start_dt)
+        attendance_query = attendance_query.filter(
+            AttendanceHourly.hour >= _utc(start_dt).replace(minute=0, second=0, microsecond=0))
         workout_query = workout_query.filter(Workout.date >= start_dt)
         member_query = member_query.filter(Member.created_at >= start_dt)
 
     if end_date:
         end_dt = datetime.fromisoformat(end_date.replace('Z', '+00:00'))
-        attendance_query = attendance_query.filter(Attendance.check_in_time <= end_dt)
+        attendance_query = attendance_query.filter(AttendanceHourly.hour <= _utc(end_dt))
         workout_query = workout_query.filter(Workout.date <= end_dt)
         member_query = member_query.filter(Member.created_at <= end_dt)
 
     if start_dt and end_dt:
         days_diff = (end_dt - start_dt).days or 1
 
-    total_attendance = attendance_query.count()
+    total_attendance = attendance_query.scalar()
     total_workouts = workout_query.count()
     new_members = member_query.count()
 
@@ -104,6 +138,7 @@ def get_summary():
 
 @reports_bp.route('/attendance', methods=['GET'])
 @admin_required
+@versioned(ROLLUPS_VERSION)
 def get_attendance_report():
     """
     Get attendance report grouped by time period
@@ -128,9 +163,11 @@ def get_attendance_report():
         default: day
     responses:
       200:
-        description: Attendance report data
+        description: Per day (UTC) check-ins, unique members and peakHour, the busiest hour
       401:
         description: Unauthorized
+      304:
+        description: Data unchanged since If-None-Match (ETag)
       403:
         description: Admin access required
     """
@@ -138,31 +175,43 @@ def get_attendance_report():
     end_date = request.args.get('endDate')
     group_by = request.args.get('groupBy', 'day')
 
-    query = db.session.query(Attendance)
+    # One row per day from the rollups (app/rollups.py), not per check-in
+    days = db.session.query(
+        AttendanceDaily.day,
+        func.sum(AttendanceDaily.checkins).label('checkins'),
+        func.count(AttendanceDaily.member_id).label('uniqueMembers')
+    )
+    hours = db.session.query(AttendanceHourly.hour, AttendanceHourly.checkins)
 
     if start_date:
-        query = query.filter(Attendance.check_in_time >= datetime.fromisoformat(start_date.replace('Z', '+00:00')))
+        start_day = _utc(datetime.fromisoformat(start_date.replace('Z', '+00:00'))).date()
+        days = days.filter(AttendanceDaily.day >= start_day)
+        hours = hours.filter(AttendanceHourly.hour >= datetime.combine(start_day, time.min))
 
     if end_date:
-        query = query.filter(Attendance.check_in_time <= datetime.fromisoformat(end_date.replace('Z', '+00:00')))
+        end_day = _utc(datetime.fromisoformat(end_date.replace('Z', '+00:00'))).date()
+        days = days.filter(AttendanceDaily.day <= end_day)
+        hours = hours.filter(AttendanceHourly.hour < datetime.combine(end_day + timedelta(days=1), time.min))
 
-    # Group by day
-    date_expr = func.to_char(Attendance.check_in_time, 'YYYY-MM-DD')
+    # Busiest hour (UTC) of each day; the earliest one on a tie
+    peak_hours = {}
+    for hour, checkins in hours.order_by(AttendanceHourly.hour):
+        peak = peak_hours.get(hour.date())
+        if peak is None or checkins > peak[1]:
+            peak_hours[hour.date()] = (hour.hour, checkins)
 
-    data = db.session.query(
-        date_expr.label('date'),
-        func.count(Attendance.id).label('checkins'),
-        func.count(func.distinct(Attendance.member_id)).label('uniqueMembers')
-    ).group_by(date_expr).order_by(date_expr).all()
+    data = days.group_by(AttendanceDaily.day).order_by(AttendanceDaily.day).all()
 
     return jsonify([
-        {'date': d.date, 'checkins': d.checkins, 'uniqueMembers': d.uniqueMembers, 'peakHour': None}
+        {'date': d.day.isoformat(), 'checkins': int(d.checkins), 'uniqueMembers': d.uniqueMembers,
+         'peakHour': peak_hours[d.day][0] if d.day in peak_hours else None}
         for d in data
     ])
 
 
 @reports_bp.route('/membership', methods=['GET'])
 @admin_required
+@versioned(MEMBERS_VERSION, extra=_this_minute)
 def get_membership_report():
     """
     Get membership report with trends and expiring memberships
@@ -176,6 +225,8 @@ def get_membership_report():
         description: Membership report data
       401:
         description: Unauthorized
+      304:
+        description: Data unchanged since If-None-Match (ETag)
       403:
         description: Admin access required
     """
@@ -185,11 +236,9 @@ def get_membership_report():
     # Expiring this month
     now = datetime.now(timezone.utc)
     end_of_month = now.replace(day=1, month=now.month+1) if now.month < 12 else now.replace(day=1, month=1, year=now.year+1)
-    expiring_this_month = Member.query.filter(
-        Member.membership_end_date <= end_of_month,
-        Member.membership_end_date >= now,
-        Member.membership_status == 'active'
-    ).count()
+    # From the per-worker list kept by the expiry job (app/memberships.py)
+    expiring_this_month = len(expiring_soon.get(end_of_month.replace(tzinfo=None),
+                                                now=now.replace(tzinfo=None)))
 
     # Renewal rate - for simplicity, assume 80% or calculate if possible
     renewal_rate = 85  # placeholder
@@ -204,6 +253,7 @@ def get_membership_report():
 
 @reports_bp.route('/revenue', methods=['GET'])
 @admin_required
+@versioned(MEMBERS_VERSION)
 def get_revenue_report():
     """
     Get estimated revenue report
@@ -217,6 +267,8 @@ def get_revenue_report():
         description: Revenue report data
       401:
         description: Unauthorized
+      304:
+        description: Data unchanged since If-None-Match (ETag)
       403:
         description: Admin access required
     """
@@ -265,21 +317,30 @@ def export_data(export_type):
         default: json
     responses:
       200:
-        description: Exported data
+        description: Exported data (with an ETag)
+      304:
+        description: Data unchanged since If-None-Match
       400:
         description: Invalid export type
       404:
         description: No data to export
     """
+    columns = EXPORT_VERSIONS.get(export_type)
+    if columns is None:
+        return jsonify({'message': 'Invalid export type'}), 400
     export_format = request.args.get('format', 'json')
+    return conditional_response(data_version(*columns), None, lambda: _export(export_type, export_format))
+
 
+def _export(export_type, export_format):
     if export_type == 'members':
         data = Member.query.all()
         records = [m.to_dict() for m in data]
     elif export_type == 'attendance':
-        data = Attendance.query.all()
-        records = [a.to_dict_with_member() for a in data]
-    elif export_type == 'workouts':
+        # to_dict() carries memberName; load the members in the same query
+        data = Attendance.query.options(joinedload(Attendance.member)).all()
+        records = [a.to_dict() for a in data]
+    else:
         data = Workout.query.all()
         records = []
         for w in data:
@@ -287,8 +348,6 @@ def export_data(export_type):
             if w.user:
                 workout_dict['user'] = {'name': w.user.name, 'email': w.user.email}
             records.append(workout_dict)
-    else:
-        return jsonify({'message': 'Invalid export type'}), 400
 
     if export_format == 'csv':
         if not records:
@@ -2,10 +2,21 @@ from datetime import datetime, timezone
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app import db
-from app.models import Workout, User, Member
+from app.models import Workout, Member
+from app.middleware.auth import current_user_is_admin
+from app.conditional import conditional_response, resource_validators, static_etag
+from app.fieldsets import InvalidFields, apply_fields, dump, parse_fields
+from app.pagination import (
+    TOTAL_KINDS, InvalidCursor, count_total, filter_key, keyset_page, offset_page,
+    parse_limit, parse_total_kind
+)
 
 workouts_bp = Blueprint('workouts', __name__)
 
+# Keyset order for cursor pagination (indexes ix_workouts_user_date,
+# ix_workouts_member_date); date is nullable, so undated workouts come last
+WORKOUT_ORDER = (Workout.date, Workout.id)
+
 
 WORKOUT_TYPES = [
     {'name': 'Strength Training', 'icon': 'dumbbell'},
@@ -17,6 +28,7 @@ WORKOUT_TYPES = [
     {'name': 'CrossFit', 'icon': 'fitness'},
     {'name': 'Other', 'icon': 'more'},
 ]
+WORKOUT_TYPES_ETAG = static_etag(WORKOUT_TYPES)
 
 
 @workouts_bp.route('/types', methods=['GET'])
@@ -31,11 +43,13 @@ def get_workout_types():
       - Bearer: []
     responses:
       200:
-        description: List of workout types
+        description: List of workout types (with an ETag)
+      304:
+        description: Catalog unchanged since If-None-Match
       401:
         description: Unauthorized
     """
-    return jsonify(WORKOUT_TYPES)
+    return conditional_response(WORKOUT_TYPES_ETAG, None, lambda: jsonify(WORKOUT_TYPES))
 
 
 @workouts_bp.route('', methods=['GET'])
@@ -61,6 +75,19 @@ def get_workouts():
         in: query
         type: string
         format: date-time
+      - name: cursor
+        in: query
+        type: string
+        description: Keyset pagination; pass an empty value for the first page, then pagination.nextCursor. Without it, page/limit paging is used.
+      - name: fields
+        in: query
+        type: string
+        description: Comma-separated fields to return (e.g. id,name,date); only those columns are loaded
+      - name: count
+        in: query
+        type: string
+        enum: [exact, cached, estimated, none]
+        description: How pagination.total is computed (default exact; none in cursor mode). pagination.totalKind reports the kind used.
       - name: page
         in: query
         type: integer
@@ -72,12 +99,13 @@ def get_workouts():
     responses:
       200:
         description: List of workouts with pagination
+      400:
+        description: Invalid cursor
       401:
         description: Unauthorized
     """
     user_id = get_jwt_identity()
-    current_user = db.session.get(User, user_id)
-    is_admin = current_user and current_user.role == 'admin'
+    is_admin = current_user_is_admin()
 
     workout_type = request.args.get('type')
     start_date = request.args.get('startDate')
@@ -85,6 +113,10 @@ def get_workouts():
     page = int(request.args.get('page', 1))
     limit = int(request.args.get('limit', 20))
     member_id = request.args.get('memberId')
+    try:
+        fields = parse_fields(request.args.get('fields'), Workout)
+    except InvalidFields as exc:
+        return jsonify({'message': str(exc)}), 400
 
     # Admins may specify `memberId` to view workouts for a member, otherwise regular users only see their own workouts
     if is_admin and member_id:
@@ -101,18 +133,39 @@ def get_workouts():
     if end_date:
         query = query.filter(Workout.date <= datetime.fromisoformat(end_date.replace('Z', '+00:00')))
 
+    cursor = request.args.get('cursor')
+    count = parse_total_kind(request.args.get('count'), 'none' if cursor is not None else 'exact')
+    if count is None:
+        return jsonify({'message': f'count must be one of {", ".join(TOTAL_KINDS)}'}), 400
+    # Scoped to whose workouts are listed
+    count_key = filter_key(
+        'workouts',
+        memberId=member_id if is_admin and member_id else None,
+        userId=None if is_admin and member_id else user_id,
+        type=workout_type, startDate=start_date, endDate=end_date
+    )
+    query = apply_fields(query, Workout, fields, extra=WORKOUT_ORDER)
+
+    if cursor is not None:
+        limit = parse_limit(request.args.get('limit'))
+        try:
+            workouts, next_cursor = keyset_page(query, WORKOUT_ORDER, limit, cursor)
+        except InvalidCursor:
+            return jsonify({'message': 'Invalid cursor'}), 400
+        total, total_kind = count_total(query, count, count_key)
+        return jsonify({
+            'workouts': [dump(w, fields) for w in workouts],
+            'pagination': {'limit': limit, 'nextCursor': next_cursor,
+                           'total': total, 'totalKind': total_kind}
+        })
+
     query = query.order_by(Workout.date.desc())
 
-    pagination = query.paginate(page=page, per_page=limit, error_out=False)
+    workouts, pagination = offset_page(query, page, limit, count, count_key)
 
     return jsonify({
-        'workouts': [w.to_dict() for w in pagination.items],
-        'pagination': {
-            'page': page,
-            'limit': limit,
-            'total': pagination.total,
-            'pages': pagination.pages
-        }
+        'workouts': [dump(w, fields) for w in workouts],
+        'pagination': pagination
     })
 
 
@@ -133,13 +186,14 @@ def get_workout(workout_id):
         required: true
     responses:
       200:
-        description: Workout details
+        description: Workout details (with ETag and Last-Modified)
+      304:
+        description: Not modified since the If-None-Match / If-Modified-Since validators
       404:
         description: Workout not found
     """
     user_id = get_jwt_identity()
-    current_user = db.session.get(User, user_id)
-    is_admin = current_user and current_user.role == 'admin'
+    is_admin = current_user_is_admin()
 
     if is_admin:
       workout = Workout.query.filter_by(id=workout_id).first()
@@ -149,7 +203,9 @@ def get_workout(workout_id):
     if not workout:
       return jsonify({'message': 'Workout not found'}), 404
 
-    return jsonify(workout.to_dict())
+    # to_dict() embeds the member, so its changes must change the ETag too
+    etag, last_modified = resource_validators(workout, workout.member)
+    return conditional_response(etag, last_modified, lambda: jsonify(workout.to_dict()))
 
 
 @workouts_bp.route('', methods=['POST'])
@@ -199,8 +255,7 @@ def create_workout():
         description: Validation error
     """
     user_id = get_jwt_identity()
-    current_user = db.session.get(User, user_id)
-    is_admin = current_user and current_user.role == 'admin'
+    is_admin = current_user_is_admin()
 
     data = request.get_json() or {}
 
@@ -306,8 +361,7 @@ def update_workout(workout_id):
         description: Workout not found
     """
     user_id = get_jwt_identity()
-    current_user = db.session.get(User, user_id)
-    is_admin = current_user and current_user.role == 'admin'
+    is_admin = current_user_is_admin()
 
     if is_admin:
       workout = Workout.query.filter_by(id=workout_id).first()
@@ -0,0 +1,139 @@
+"""
+Member Search
+=============
+Purpose: Indexed, ranked substring search over member names and emails.
+
+`Member.name ILIKE '%x%'` cannot use a B-tree index, so every search was a
+sequential scan of members. Each dialect gets a trigram index instead:
+
+  postgresql - pg_trgm GIN indexes on members.name and members.email.
+               ILIKE '%x%' is answered from the indexes; results are ranked
+               by word_similarity() against the better of the two columns.
+  sqlite     - members_fts, an FTS5 table with the trigram tokenizer that
+               indexes members' name and email (external content, kept in
+               sync by triggers). Matches are ranked by bm25().
+
+Searches shorter than three characters (too short for a trigram) and other
+dialects fall back to the original ILIKE filter.
+
+The index is created with the members table (DDL events below) and by
+`flask bootstrap-db` for existing databases. SQLite's FTS table is keyed by
+members.rowid, which VACUUM may renumber; rebuild it afterwards with
+`flask --app run rebuild-search-index`.
+"""
+
+import click
+import sqlalchemy as sa
+from flask.cli import with_appcontext
+from app import db
+from app.models import Member
+
+MIN_TRIGRAM_LENGTH = 3
+FTS_TABLE = 'members_fts'
+
+SQLITE_DDL = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+    f"name, email, content='members', content_rowid='rowid', tokenize='trigram')",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON members BEGIN "
+    f"INSERT INTO {FTS_TABLE}(rowid, name, email) VALUES (new.rowid, new.name, new.email); END",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON members BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, email) "
+    f"VALUES ('delete', old.rowid, old.name, old.email); END",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF name, email ON members BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, email) "
+    f"VALUES ('delete', old.rowid, old.name, old.email); "
+    f"INSERT INTO {FTS_TABLE}(rowid, name, email) VALUES (new.rowid, new.name, new.email); END",
+)
+
+POSTGRES_DDL = (
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS ix_members_name_trgm ON members USING gin (name gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS ix_members_email_trgm ON members USING gin (email gin_trgm_ops)",
+)
+
+
+def install_search_index(connection, rebuild=False):
+    """Create the dialect's search index if missing. Returns True if created.
+
+    A new (or, with rebuild=True, an existing) SQLite FTS table is filled
+    from the members already in the table.
+    """
+    dialect = connection.dialect.name
+    if dialect == 'sqlite':
+        created = not sa.inspect(connection).has_table(FTS_TABLE)
+        for statement in SQLITE_DDL:
+            connection.exec_driver_sql(statement)
+        if created or rebuild:
+            connection.exec_driver_sql(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+        return created
+    if dialect == 'postgresql':
+        indexes = {index['name'] for index in sa.inspect(connection).get_indexes('members')}
+        for statement in POSTGRES_DDL:
+            connection.exec_driver_sql(statement)
+        if rebuild:
+            connection.exec_driver_sql('REINDEX INDEX ix_members_name_trgm')
+            connection.exec_driver_sql('REINDEX INDEX ix_members_email_trgm')
+        return 'ix_members_name_trgm' not in indexes
+    return False
+
+
+@sa.event.listens_for(Member.__table__, 'after_create')
+def _create_search_index(table, connection, **kw):
+    install_search_index(connection)
+
+
+@sa.event.listens_for(Member.__table__, 'before_drop')
+def _drop_search_index(table, connection, **kw):
+    if connection.dialect.name == 'sqlite':
+        connection.exec_driver_sql(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+
+
+def _ilike(query, search):
+    return query.filter(sa.or_(
+        Member.name.ilike(f'%{search}%'),
+        Member.email.ilike(f'%{search}%')
+    ))
+
+
+def search_members(query, search, ranked=True):
+    """Filter a Member query to matches for `search`, best matches first.
+
+    The caller's own ORDER BY (if any) applies after the rank. With
+    ranked=False only the filter is applied (for keyset pagination, which
+    needs its own total order).
+    """
+    search = search.strip()
+    if not search:
+        return query
+    if len(search) < MIN_TRIGRAM_LENGTH:
+        return _ilike(query, search)
+
+    dialect = db.session.get_bind().dialect.name
+    if dialect == 'sqlite':
+        # A quoted FTS5 string is matched as a substring by the trigram tokenizer
+        pattern = '"' + search.replace('"', '""') + '"'
+        matches = sa.select(
+            sa.literal_column('rowid').label('rowid'),
+            sa.literal_column('rank').label('rank')
+        ).select_from(sa.table(FTS_TABLE)).where(
+            sa.text(f'{FTS_TABLE} MATCH :pattern').bindparams(pattern=pattern)
+        ).subquery()
+        query = query.join(matches, matches.c.rowid == sa.literal_column('members.rowid'))
+        return query.order_by(matches.c.rank) if ranked else query
+    if dialect == 'postgresql':
+        rank = sa.func.greatest(
+            sa.func.word_similarity(search, Member.name),
+            sa.func.word_similarity(search, Member.email)
+        )
+        query = _ilike(query, search)
+        return query.order_by(rank.desc()) if ranked else query
+    return _ilike(query, search)
+
+
+@click.command('rebuild-search-index')
+@with_appcontext
+def rebuild_search_index_command():
+    """Create or rebuild the member search index."""
+    with db.engine.begin() as connection:
+        install_search_index(connection, rebuild=True)
+    click.echo('Member search index rebuilt')
@@ -0,0 +1,60 @@
+"""
+Read-Replica Session Routing
+============================
+Purpose: Send the queries of read-only blueprints to a replica database.
+
+When SQLALCHEMY_BINDS has a 'replica' entry (DATABASE_REPLICA_URL), every
+query issued while serving a blueprint listed in
+SQLALCHEMY_REPLICA_BLUEPRINTS reads from the replica. Everything else
+stays on the primary:
+  - other blueprints, CLI commands and background jobs
+  - INSERT/UPDATE/DELETE statements and ORM flushes
+  - any read after the session has written (read-your-own-writes), for the
+    rest of that session
+  - reads inside `db.session().using_primary()`, for lookups that must not
+    lag (e.g. the cached current user, app/middleware/auth.py)
+"""
+
+from contextlib import contextmanager
+import sqlalchemy as sa
+from flask import current_app, has_request_context, request
+from flask_sqlalchemy.session import Session
+
+REPLICA_BIND = 'replica'
+PRIMARY_PINNED = 'primary_pinned'
+
+
+class RoutingSession(Session):
+    """Flask-SQLAlchemy session that prefers the replica for read-only blueprints."""
+
+    def __init__(self, db, **kwargs):
+        super().__init__(db, **kwargs)
+        self._primary_reads = 0
+        sa.event.listen(self, 'after_flush', _pin_to_primary)
+
+    @contextmanager
+    def using_primary(self):
+        """Read from the primary inside the block, on any blueprint."""
+        self._primary_reads += 1
+        try:
+            yield self
+        finally:
+            self._primary_reads -= 1
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and self._reads_from_replica(clause):
+            return self._db.engines[REPLICA_BIND]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+    def _reads_from_replica(self, clause):
+        if self._flushing or self._primary_reads or self.info.get(PRIMARY_PINNED):
+            return False
+        if isinstance(clause, sa.UpdateBase):
+            return False
+        if not has_request_context() or REPLICA_BIND not in self._db.engines:
+            return False
+        return request.blueprint in current_app.config.get('SQLALCHEMY_REPLICA_BLUEPRINTS', ())
+
+
+def _pin_to_primary(session, flush_context):
+    session.info[PRIMARY_PINNED] = True
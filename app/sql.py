@@ -0,0 +1,30 @@
+"""
+Dialect-specific SQL
+====================
+Purpose: Statements whose syntax differs between the databases we run on.
+
+Postgres and SQLite both support `INSERT ... ON CONFLICT (...) DO UPDATE`
+/ `DO NOTHING` (and RETURNING), but SQLAlchemy only exposes them on each
+dialect's own insert() construct. dialect_insert() picks the right one for
+the session's bind so callers can write one upsert for both.
+"""
+
+from sqlalchemy.dialects import postgresql, sqlite
+from app import db
+
+_INSERTS = {
+    'postgresql': postgresql.insert,
+    'sqlite': sqlite.insert,
+}
+
+
+def dialect_insert(table):
+    """insert(table) with .on_conflict_do_update()/.on_conflict_do_nothing().
+
+    Raises NotImplementedError on databases without ON CONFLICT support.
+    """
+    dialect = db.session.get_bind().dialect.name
+    try:
+        return _INSERTS[dialect](table)
+    except KeyError:
+        raise NotImplementedError(f'INSERT ... ON CONFLICT is not supported on {dialect}') from None
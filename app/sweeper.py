@@ -0,0 +1,112 @@
+"""
+Expired Row Sweeper
+===================
+Purpose: Delete rows that can no longer be used (expired or redeemed
+password reset tokens, revoked JWTs past their expiry) in small chunks, so
+no single DELETE holds locks on a large range.
+
+Runs in a daemon thread in every gunicorn worker (started from
+gunicorn.conf.py, every SWEEPER_INTERVAL_SECONDS with jitter; 0 disables
+it). Sweeps are idempotent, so workers sweeping at the same time only
+repeat each other's work. It can also be run on demand or from cron:
+
+  flask --app run sweep-expired
+"""
+
+import random
+import threading
+from datetime import datetime
+
+import click
+from flask.cli import with_appcontext
+from app import db
+
+DEFAULT_CHUNK_SIZE = 1000
+
+
+def _sweeps(now):
+    """(model, condition) pairs selecting rows that are safe to delete."""
+    from app.models import PasswordResetToken, RevokedToken
+
+    return (
+        (PasswordResetToken, db.or_(
+            PasswordResetToken.expires_at < now,
+            PasswordResetToken.used_at.isnot(None)
+        )),
+        (RevokedToken, RevokedToken.expires_at < now),
+    )
+
+
+def sweep(model, condition, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Delete matching rows chunk by chunk, one transaction per chunk."""
+    deleted = 0
+    while True:
+        ids = [row_id for (row_id,) in
+               db.session.query(model.id).filter(condition).limit(chunk_size)]
+        if not ids:
+            break
+        db.session.query(model).filter(model.id.in_(ids)).delete(synchronize_session=False)
+        db.session.commit()
+        deleted += len(ids)
+        if len(ids) < chunk_size:
+            break
+    return deleted
+
+
+def sweep_expired(chunk_size=DEFAULT_CHUNK_SIZE):
+    """Run every sweep. Returns {table name: rows deleted}."""
+    now = datetime.utcnow()
+    return {
+        model.__tablename__: sweep(model, condition, chunk_size)
+        for model, condition in _sweeps(now)
+    }
+
+
+class PeriodicJob(threading.Thread):
+    """Daemon thread calling job() in an app context every `interval` seconds."""
+
+    def __init__(self, app, interval, job, name):
+        super().__init__(name=name, daemon=True)
+        self.app = app
+        self.interval = interval
+        self.job = job
+        self.stopped = threading.Event()
+
+    def run(self):
+        # Jitter keeps workers started together from running in lockstep
+        while not self.stopped.wait(self.interval * random.uniform(0.5, 1.5)):
+            self.run_once()
+
+    def run_once(self):
+        with self.app.app_context():
+            try:
+                self.job()
+            except Exception:
+                db.session.rollback()
+                self.app.logger.exception('Periodic job %s failed', self.name)
+            finally:
+                db.session.remove()
+
+    def stop(self):
+        self.stopped.set()
+
+
+def start_sweeper(app):
+    """Start the sweeper thread unless SWEEPER_INTERVAL_SECONDS is 0."""
+    interval = app.config.get('SWEEPER_INTERVAL_SECONDS', 0)
+    if not interval:
+        return None
+    chunk_size = app.config.get('SWEEPER_CHUNK_SIZE', DEFAULT_CHUNK_SIZE)
+    sweeper = PeriodicJob(app, interval, lambda: sweep_expired(chunk_size), name='sweeper')
+    sweeper.start()
+    return sweeper
+
+
+@click.command('sweep-expired')
+@click.option('--chunk-size', default=DEFAULT_CHUNK_SIZE, show_default=True,
+              help='Rows deleted per transaction.')
+@with_appcontext
+def sweep_expired_command(chunk_size):
+    """Delete expired reset tokens and revoked-token records."""
+    for table, deleted in sweep_expired(chunk_size).items():
+        click.echo(f'{table}: {deleted} rows deleted')
@@ -0,0 +1,199 @@
+#!/usr/bin/env python
+"""Compare the attendance reports: aggregating check-ins vs reading the rollups.
+
+--members members check in on every other day for each of --days days
+(default 500 x 90 / 365 / 1095, about 22k / 91k / 274k check-ins), at one
+of 14 daytime hours. The figures compared:
+
+  summary   - check-ins over the whole range (GET /api/reports/summary)
+  report    - per day check-ins, unique members and peak hour over the
+              last 90 days (GET /api/reports/attendance)
+  frequency - total and top 10 members over the last 30 days
+              (GET /api/admin/reports/attendance-frequency)
+
+Timed, median of --runs:
+
+  rows          - the three reports' queries as GROUP BY / COUNT over attendances
+  rollups       - the same figures from attendance_daily / attendance_hourly
+  etag scan     - the old ETag: COUNT(*) and MAX(created_at) over attendances
+  etag version  - the ETag from attendance_rollup_version
+  GET summary / GET attendance - the whole request path via the test client
+                  (JWT, ETag, query, JSON), 200 and 304 with If-None-Match
+
+Usage:
+  python benchmarks/attendance_reports.py [--members 500] [--days 90 365 1095] [--runs 20]
+      [--database-url sqlite:////tmp/attendance_reports.db]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def populate(db, members, days):
+    from app.models import Attendance, Member
+    today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    member_ids = []
+    for number in range(members):
+        member = Member(name=f'Regular {number}', email=f'regular-{number}@example.com')
+        db.session.add(member)
+        db.session.flush()
+        member_ids.append(member.id)
+    db.session.commit()
+    # Inserted through the triggers, as check-ins are
+    for day in range(days):
+        values = []
+        for number, member_id in enumerate(member_ids):
+            if (number + day) % 2:
+                continue
+            when = today - timedelta(days=day) + timedelta(hours=6 + (number * 7 + day) % 14, minutes=number % 60)
+            values.append({'id': str(uuid.uuid4()), 'member_id': member_id, 'check_in_time': when,
+                           'check_in_date': when.date(), 'created_at': when})
+        db.session.execute(Attendance.__table__.insert(), values)
+    db.session.commit()
+    return today
+
+
+def _peaks(hours):
+    peaks = {}
+    for hour, checkins in hours:
+        peak = peaks.get(hour.date())
+        if peak is None or checkins > peak[1]:
+            peaks[hour.date()] = (hour.hour, checkins)
+    return {day: hour for day, (hour, _) in peaks.items()}
+
+
+def rows(db, start, today):
+    from sqlalchemy import func
+    from app.models import Attendance, Member
+    end = today + timedelta(days=1)
+    summary = db.session.query(func.count(Attendance.id)).filter(
+        Attendance.check_in_time >= start, Attendance.check_in_time < end).scalar()
+
+    since = today - timedelta(days=90)
+    day = func.date(Attendance.check_in_time)
+    hour = func.strftime('%Y-%m-%d %H:00:00', Attendance.check_in_time)
+    report = db.session.query(day, func.count(Attendance.id), func.count(func.distinct(Attendance.member_id))) \
+        .filter(Attendance.check_in_time >= since).group_by(day).order_by(day).all()
+    hours = db.session.query(hour, func.count(Attendance.id)).filter(Attendance.check_in_time >= since) \
+        .group_by(hour).order_by(hour).all()
+    peaks = _peaks((datetime.fromisoformat(h), c) for h, c in hours)
+    report = [(d, c, u, peaks.get(datetime.fromisoformat(d).date())) for d, c, u in report]
+
+    since = today - timedelta(days=30)
+    total = db.session.query(func.count(Attendance.id)).filter(Attendance.check_in_time >= since).scalar()
+    top = db.session.query(Member.id, func.count(Attendance.id)) \
+        .join(Attendance, Member.id == Attendance.member_id).filter(Attendance.check_in_time >= since) \
+        .group_by(Member.id).order_by(func.count(Attendance.id).desc(), Member.id).limit(10).all()
+    return summary, report, total, [tuple(r) for r in top]
+
+
+def rollups(db, start, today):
+    from sqlalchemy import func
+    from app.models import AttendanceDaily, AttendanceHourly, Member
+    end = today + timedelta(days=1)
+    summary = db.session.query(func.coalesce(func.sum(AttendanceHourly.checkins), 0)).filter(
+        AttendanceHourly.hour >= start, AttendanceHourly.hour < end).scalar()
+
+    since = today - timedelta(days=90)
+    report = db.session.query(AttendanceDaily.day, func.sum(AttendanceDaily.checkins),
+                              func.count(AttendanceDaily.member_id)) \
+        .filter(AttendanceDaily.day >= since.date()).group_by(AttendanceDaily.day) \
+        .order_by(AttendanceDaily.day).all()
+    hours = db.session.query(AttendanceHourly.hour, AttendanceHourly.checkins) \
+        .filter(AttendanceHourly.hour >= since).order_by(AttendanceHourly.hour).all()
+    peaks = _peaks(hours)
+    report = [(d.isoformat(), c, u, peaks.get(d)) for d, c, u in report]
+
+    since = today - timedelta(days=30)
+    total = db.session.query(func.sum(AttendanceDaily.checkins)).filter(AttendanceDaily.day >= since.date()).scalar()
+    checkins = func.sum(AttendanceDaily.checkins)
+    top = db.session.query(Member.id, checkins) \
+        .join(AttendanceDaily, Member.id == AttendanceDaily.member_id) \
+        .filter(AttendanceDaily.day >= since.date()) \
+        .group_by(Member.id).order_by(checkins.desc(), Member.id).limit(10).all()
+    return summary, report, total, [tuple(r) for r in top]
+
+
+def timed(db, fn, runs):
+    samples = []
+    for _ in range(runs):
+        # A fresh session per request, as in the app
+        db.session.remove()
+        t0 = time.perf_counter()
+        result = fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(samples), result
+
+
+def get(client, url, headers, status):
+    response = client.get(url, headers=headers)
+    assert response.status_code == status, response.status_code
+    return response
+
+
+def run(app, db, members, days, runs):
+    from app.conditional import data_version
+    from app.middleware.auth import create_user_token
+    from app.models import Attendance, User
+    from app.routes.reports import ROLLUPS_VERSION
+
+    db.drop_all()
+    db.create_all()
+    today = populate(db, members, days)
+    start = today - timedelta(days=days)
+    admin = User(name='Admin', email='admin@example.com', role='admin', password='x')
+    db.session.add(admin)
+    db.session.commit()
+    headers = {'Authorization': f'Bearer {create_user_token(admin)}'}
+    client = app.test_client()
+
+    timings = {}
+    timings['rows'], expected = timed(db, lambda: rows(db, start, today), runs)
+    timings['rollups'], actual = timed(db, lambda: rollups(db, start, today), runs)
+    assert actual == expected
+    timings['etag scan'], _ = timed(db, lambda: data_version(Attendance.created_at), runs)
+    timings['etag version'], _ = timed(db, lambda: data_version(ROLLUPS_VERSION), runs)
+    for name, url in (('summary', f'/api/reports/summary?startDate={start.isoformat()}Z'),
+                      ('attendance', f'/api/reports/attendance?startDate={(today - timedelta(days=90)).isoformat()}Z')):
+        timings[f'GET {name} 200'], response = timed(db, lambda: get(client, url, headers, 200), runs)
+        etag = {**headers, 'If-None-Match': response.headers['ETag']}
+        timings[f'GET {name} 304'], _ = timed(db, lambda: get(client, url, etag, 304), runs)
+    db.session.remove()
+    db.drop_all()
+    return expected[0], timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--members', type=int, default=500)
+    parser.add_argument('--days', type=int, nargs='+', default=[90, 365, 1095])
+    parser.add_argument('--runs', type=int, default=20)
+    parser.add_argument('--database-url', help='empty database to use (default: a temporary SQLite file)')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = args.database_url or f"sqlite:///{os.path.join(tmp, 'attendance_reports.db')}"
+        os.environ['SQLALCHEMY_DATABASE_URI'] = url
+        os.environ.pop('DATABASE_URL', None)
+        from app import create_app, db
+        app = create_app('production')
+        app.config['SQLALCHEMY_DATABASE_URI'] = url
+        with app.app_context():
+            results = [run(app, db, args.members, days, args.runs) for days in args.days]
+            print(f'{db.engine.dialect.name}, {args.members} members, median of {args.runs}, ms')
+            print(f"{'check-ins':<18}" + ''.join(f'{checkins:>10,}' for checkins, _ in results))
+            for name in results[0][1]:
+                print(f'{name:<18}' + ''.join(f'{timings[name]:>10.2f}' for _, timings in results))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python
+"""Compare GET /api/attendance/stats/<id>: loading every row vs one aggregate.
+
+Each member has --rows check-ins (default 5000, one a day going
+back). The time covers the database side of the endpoint, in-process:
+
+  rows      - load the member, load every check-in as an ORM object, count
+              this month / this week in Python, query the last check-in
+  aggregate - Attendance.get_member_stats(): conditional COUNTs and
+              MAX(check_in_time) in one query on ix_attendances_member_time
+
+Usage:
+  python benchmarks/attendance_stats.py [--members 20] [--rows 5000] [--runs 20]
+      [--database-url sqlite:////tmp/attendance_stats.db]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def populate(db, members, rows):
+    from app.models import Attendance, Member
+    now = datetime.utcnow()
+    ids = []
+    for number in range(members):
+        member = Member(name=f'Regular {number}', email=f'regular-{number}@example.com')
+        db.session.add(member)
+        db.session.commit()
+        values = []
+        for i in range(rows):
+            when = now - timedelta(days=i, hours=1)
+            values.append({'id': str(uuid.uuid4()), 'member_id': member.id, 'check_in_time': when,
+                           'created_at': when})
+        db.session.execute(Attendance.__table__.insert(), values)
+        db.session.commit()
+        ids.append(member.id)
+    return ids
+
+
+def stats_from_rows(db, member_id):
+    from app.models import Attendance, Member
+    member = Member.query.get(member_id)
+    all_records = Attendance.query.filter_by(member_id=member_id).all()
+    now = datetime.utcnow()
+    month = sum(1 for r in all_records
+                if r.check_in_time.month == now.month and r.check_in_time.year == now.year)
+    week = sum(1 for r in all_records if r.check_in_time >= now - timedelta(days=7))
+    last = Attendance.query.filter_by(member_id=member_id).order_by(Attendance.check_in_time.desc()).first()
+    return member.name, len(all_records), month, week, last.check_in_time
+
+
+def stats_aggregate(db, member_id):
+    from app.models import Attendance
+    stats = Attendance.get_member_stats(member_id)
+    return (stats['memberName'], stats['totalCheckins'], stats['thisMonth'], stats['thisWeek'],
+            stats['lastCheckIn'])
+
+
+def timed(db, fn, member_ids, runs):
+    samples = []
+    results = []
+    for run in range(runs):
+        member_id = member_ids[run % len(member_ids)]
+        # A fresh session per request, as in the app
+        db.session.remove()
+        t0 = time.perf_counter()
+        results.append(fn(db, member_id))
+        samples.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(samples), results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--members', type=int, default=20)
+    parser.add_argument('--rows', type=int, default=5000)
+    parser.add_argument('--runs', type=int, default=20)
+    parser.add_argument('--database-url', help='empty database to use (default: a temporary SQLite file)')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = args.database_url or f"sqlite:///{os.path.join(tmp, 'attendance_stats.db')}"
+        os.environ['SQLALCHEMY_DATABASE_URI'] = url
+        os.environ.pop('DATABASE_URL', None)
+        from app import create_app, db
+        app = create_app('production')
+        app.config['SQLALCHEMY_DATABASE_URI'] = url
+        with app.app_context():
+            db.drop_all()
+            db.create_all()
+            member_ids = populate(db, args.members, args.rows)
+            rows_ms, expected = timed(db, stats_from_rows, member_ids, args.runs)
+            aggregate_ms, actual = timed(db, stats_aggregate, member_ids, args.runs)
+            assert actual == expected
+            print(f'{db.engine.dialect.name}, {args.members} members x {args.rows} check-ins, '
+                  f'median of {args.runs}')
+            print(f'rows:      {rows_ms:8.2f} ms')
+            print(f'aggregate: {aggregate_ms:8.2f} ms')
+            db.session.remove()
+            db.drop_all()
+
+
+if __name__ == '__main__':
+    main()
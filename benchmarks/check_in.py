@@ -0,0 +1,146 @@
+#!/usr/bin/env python
+"""Compare check-in latency: the old check-then-insert vs Attendance.check_in().
+
+For each history size, a member with that many past check-ins (one per
+day going back) checks in; the time covers the whole database side of
+POST /api/attendance/checkin, commit included, in-process and without HTTP:
+
+  old - load the member, func.date(check_in_time) = today over the
+        member's history, INSERT, COMMIT
+  new - one INSERT ... SELECT ... ON CONFLICT DO NOTHING on
+        (member_id, check_in_date), COMMIT
+
+Today's row is deleted between runs.
+
+A second table times refusing a repeated tap from the same member:
+
+  db     - the INSERT conflicts, ROLLBACK, load the member to pick the error
+  cached - app.check_ins.checked_in_today, in memory
+
+Usage:
+  python benchmarks/check_in.py [--history 0 1000 10000 100000] [--runs 20]
+      [--database-url sqlite:////tmp/check_in.db]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from datetime import date, datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def populate(db, member_id, count, batch=20000):
+    from app.models import Attendance
+    table = Attendance.__table__
+    now = datetime.utcnow()
+    for offset in range(0, count, batch):
+        rows = []
+        for i in range(offset, min(offset + batch, count)):
+            when = now - timedelta(days=i + 1)
+            rows.append({
+                'id': str(uuid.uuid4()),
+                'member_id': member_id,
+                'check_in_time': when,
+                'check_in_date': when.date(),
+                'created_at': when,
+            })
+        db.session.execute(table.insert(), rows)
+        db.session.commit()
+
+
+def old_check_in(db, member_id):
+    from app.models import Attendance, Member
+    member = db.session.get(Member, member_id)
+    assert member.membership_status == 'active'
+    assert Attendance.query.filter(
+        Attendance.member_id == member_id,
+        db.func.date(Attendance.check_in_time) == date.today()
+    ).first() is None
+    db.session.add(Attendance(member_id=member_id))
+    db.session.commit()
+
+
+def new_check_in(db, member_id):
+    from app.models import Attendance
+    assert Attendance.check_in(member_id) is not None
+    db.session.commit()
+
+
+def timed(db, fn, member_id, runs):
+    from app.models import Attendance
+    samples = []
+    for _ in range(runs):
+        db.session.expire_all()
+        t0 = time.perf_counter()
+        fn(db, member_id)
+        samples.append((time.perf_counter() - t0) * 1000)
+        Attendance.query.filter(
+            Attendance.member_id == member_id,
+            Attendance.check_in_time >= datetime.utcnow() - timedelta(hours=1)
+        ).delete()
+        db.session.commit()
+    return statistics.median(samples)
+
+
+def repeat_taps(db, member_id, runs):
+    from app.check_ins import checked_in_today
+    from app.models import Attendance, Member
+    assert Attendance.check_in(member_id) is not None
+    db.session.commit()
+    samples = {'db': [], 'cached': []}
+    for _ in range(runs):
+        db.session.expire_all()
+        t0 = time.perf_counter()
+        assert Attendance.check_in(member_id) is None
+        db.session.rollback()
+        db.session.get(Member, member_id)
+        samples['db'].append((time.perf_counter() - t0) * 1000)
+        t0 = time.perf_counter()
+        assert member_id in checked_in_today
+        samples['cached'].append((time.perf_counter() - t0) * 1000)
+    return statistics.median(samples['db']), statistics.median(samples['cached'])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--history', type=int, nargs='+', default=[0, 1000, 10000, 100000])
+    parser.add_argument('--runs', type=int, default=20)
+    parser.add_argument('--database-url', help='empty database to use (default: a temporary SQLite file)')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = args.database_url or f"sqlite:///{os.path.join(tmp, 'check_in.db')}"
+        os.environ['SQLALCHEMY_DATABASE_URI'] = url
+        os.environ.pop('DATABASE_URL', None)
+        from app import create_app, db
+        from app.models import Member
+        app = create_app('production')
+        app.config['SQLALCHEMY_DATABASE_URI'] = url
+        with app.app_context():
+            db.drop_all()
+            db.create_all()
+            print(f'{db.engine.dialect.name}, median of {args.runs} check-ins')
+            print(f"{'history':>8} {'old ms':>8} {'new ms':>8}")
+            for count in args.history:
+                member = Member(name=f'History {count}', email=f'history-{count}@example.com')
+                db.session.add(member)
+                db.session.commit()
+                member_id = member.id
+                populate(db, member_id, count)
+                old_ms = timed(db, old_check_in, member_id, args.runs)
+                new_ms = timed(db, new_check_in, member_id, args.runs)
+                print(f'{count:>8} {old_ms:>8.2f} {new_ms:>8.2f}')
+            db_ms, cached_ms = repeat_taps(db, member_id, args.runs)
+            print(f'repeated tap: db {db_ms:.3f} ms, cached {cached_ms:.4f} ms')
+            db.session.remove()
+            db.drop_all()
+
+
+if __name__ == '__main__':
+    main()
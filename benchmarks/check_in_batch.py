@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+"""Replay buffered kiosk taps: one POST /checkin each vs one POST /checkin/batch.
+
+N members each have one buffered tap. Both paths go through the Flask
+test client (routing, JWT, JSON, commit) in-process, without a network:
+
+  single - N x POST /api/attendance/checkin
+  batch  - POST /api/attendance/checkin/batch with N items, then the same
+           batch again (a replay: nothing new is written)
+
+Usage:
+  python benchmarks/check_in_batch.py [--taps 100 500 1000]
+      [--database-url sqlite:////tmp/check_in_batch.db]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def add_members(db, count):
+    from app.models import Member
+    ids = [str(uuid.uuid4()) for _ in range(count)]
+    db.session.execute(Member.__table__.insert(), [
+        {'id': member_id, 'name': f'Kiosk {member_id[:8]}', 'email': f'{member_id}@example.com',
+         'membership_type': 'basic', 'membership_status': 'active'}
+        for member_id in ids
+    ])
+    db.session.commit()
+    return ids
+
+
+def timed(fn):
+    t0 = time.perf_counter()
+    fn()
+    return (time.perf_counter() - t0) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--taps', type=int, nargs='+', default=[100, 500, 1000])
+    parser.add_argument('--database-url', help='empty database to use (default: a temporary SQLite file)')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = args.database_url or f"sqlite:///{os.path.join(tmp, 'check_in_batch.db')}"
+        os.environ['SQLALCHEMY_DATABASE_URI'] = url
+        os.environ.pop('DATABASE_URL', None)
+        from app import create_app, db
+        from app.middleware.auth import create_user_token
+        from app.models import User
+        app = create_app('production')
+        app.config['SQLALCHEMY_DATABASE_URI'] = url
+        with app.app_context():
+            db.drop_all()
+            db.create_all()
+            user = User(name='Kiosk', email='kiosk@example.com', role='user', password='-')
+            db.session.add(user)
+            db.session.commit()
+            headers = {'Authorization': f'Bearer {create_user_token(user)}'}
+            client = app.test_client()
+
+            print(f'{db.engine.dialect.name}, whole request path via the test client')
+            print(f"{'taps':>6} {'single ms':>10} {'batch ms':>9} {'replay ms':>10}")
+            for count in args.taps:
+                single_ids = add_members(db, count)
+                batch_ids = add_members(db, count)
+                now = datetime.utcnow().isoformat()
+                items = [{'member_id': member_id, 'check_in_time': now, 'client_event_id': str(uuid.uuid4())}
+                         for member_id in batch_ids]
+
+                def single():
+                    for member_id in single_ids:
+                        response = client.post('/api/attendance/checkin', json={'member_id': member_id},
+                                               headers=headers)
+                        assert response.status_code == 200
+
+                def batch(expected):
+                    data = client.post('/api/attendance/checkin/batch', json=items, headers=headers).get_json()
+                    assert data[expected] == count, data
+
+                single_ms = timed(single)
+                batch_ms = timed(lambda: batch('created'))
+                replay_ms = timed(lambda: batch('replayed'))
+                print(f'{count:>6} {single_ms:>10.0f} {batch_ms:>9.0f} {replay_ms:>10.0f}')
+            db.session.remove()
+            db.drop_all()
+
+
+if __name__ == '__main__':
+    main()
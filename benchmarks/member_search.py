@@ -0,0 +1,120 @@
+#!/usr/bin/env python
+"""Compare member search: the old ILIKE scan vs the trigram index (app/search.py).
+
+Builds a database with N generated members and times the first page of
+/api/members?search=<term> (the page query plus its COUNT) both ways,
+in-process and without HTTP overhead, for a common, a rare and a
+non-matching term.
+
+Usage:
+  python benchmarks/member_search.py [--members 100000 1000000] [--runs 5]
+      [--database-url sqlite:////tmp/members.db]
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+FIRST = ['James', 'Mary', 'John', 'Patricia', 'Robert', 'Jennifer', 'Michael', 'Linda',
+         'William', 'Elizabeth', 'David', 'Barbara', 'Richard', 'Susan', 'Joseph', 'Jessica']
+LAST = ['Smith', 'Johnson', 'Williams', 'Brown', 'Jones', 'Garcia', 'Miller', 'Davis',
+        'Rodriguez', 'Martinez', 'Hernandez', 'Lopez', 'Wilson', 'Anderson', 'Thomas', 'Moore']
+TERMS = {
+    'common': 'son',        # Johnson, Anderson, Wilson, Jessica...
+    'rare': 'member-777',   # a handful of emails
+    'none': 'zzqx',
+}
+
+
+def populate(db, count, batch=20000):
+    from app.models import Member
+    rng = random.Random(42)
+    start = datetime(2020, 1, 1)
+    table = Member.__table__
+    for offset in range(0, count, batch):
+        rows = []
+        for i in range(offset, min(offset + batch, count)):
+            first, last = rng.choice(FIRST), rng.choice(LAST)
+            rows.append({
+                'id': str(uuid.uuid4()),
+                'name': f'{first} {last}',
+                'email': f'{first.lower()}.{last.lower()}.member-{i}@example.com',
+                'membership_type': 'basic',
+                'membership_status': 'active',
+                'created_at': start + timedelta(minutes=i),
+                'updated_at': start + timedelta(minutes=i),
+            })
+        db.session.execute(table.insert(), rows)
+        db.session.commit()
+
+
+def first_page(query):
+    from app.models import Member
+    return query.order_by(Member.created_at.desc()).paginate(page=1, per_page=20, error_out=False)
+
+
+def old_search(term):
+    from sqlalchemy import or_
+    from app.models import Member
+    return first_page(Member.query.filter(or_(
+        Member.name.ilike(f'%{term}%'), Member.email.ilike(f'%{term}%')
+    )))
+
+
+def new_search(term):
+    from app.models import Member
+    from app.search import search_members
+    return first_page(search_members(Member.query, term))
+
+
+def timed(fn, term, runs):
+    samples = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        page = fn(term)
+        samples.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(samples), page.total
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--members', type=int, nargs='+', default=[100000, 1000000])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--database-url', help='empty database to use (default: a temporary SQLite file)')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for count in args.members:
+            url = args.database_url or f"sqlite:///{os.path.join(tmp, f'members-{count}.db')}"
+            os.environ['SQLALCHEMY_DATABASE_URI'] = url
+            os.environ.pop('DATABASE_URL', None)
+            from app import create_app, db
+            app = create_app('production')
+            app.config['SQLALCHEMY_DATABASE_URI'] = url
+            with app.app_context():
+                db.drop_all()
+                db.create_all()
+                t0 = time.perf_counter()
+                populate(db, count)
+                print(f'\n{count} members ({db.engine.dialect.name}), loaded in {time.perf_counter() - t0:.0f}s')
+                print(f"{'term':<8} {'matches':>8} {'ILIKE ms':>10} {'indexed ms':>11} {'speedup':>8}")
+                for label, term in TERMS.items():
+                    old_ms, old_total = timed(old_search, term, args.runs)
+                    new_ms, new_total = timed(new_search, term, args.runs)
+                    assert old_total == new_total, (label, old_total, new_total)
+                    print(f'{label:<8} {new_total:>8} {old_ms:>10.1f} {new_ms:>11.1f} {old_ms / new_ms:>7.1f}x')
+                db.session.remove()
+                db.drop_all()
+
+
+if __name__ == '__main__':
+    main()
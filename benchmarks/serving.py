@@ -0,0 +1,134 @@
+#!/usr/bin/env python
+"""Throughput of the gunicorn serving profile per worker class.
+
+Starts `gunicorn run:app` (with gunicorn.conf.py) against a throwaway
+SQLite database, logs in once, then hammers an endpoint from a pool of
+client threads and reports requests/second and latency percentiles.
+
+Usage:
+  python benchmarks/serving.py [--modes sync,gthread,gevent]
+                               [--path /api/auth/me] [--concurrency 16]
+                               [--seconds 10]
+"""
+
+import argparse
+import http.client
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PORT = 5077
+
+
+def request(conn, method, path, body=None, headers=None):
+    conn.request(method, path, body=body, headers=headers or {})
+    response = conn.getresponse()
+    data = response.read()
+    return response.status, data
+
+
+def wait_until_up(timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            conn = http.client.HTTPConnection('127.0.0.1', PORT, timeout=2)
+            if request(conn, 'GET', '/api/health')[0] == 200:
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError('gunicorn did not start')
+
+
+def load(path, headers, concurrency, seconds):
+    latencies, errors = [], []
+    lock = threading.Lock()
+    stop_at = time.perf_counter() + seconds
+
+    def client():
+        conn = http.client.HTTPConnection('127.0.0.1', PORT, timeout=30)
+        local = []
+        while time.perf_counter() < stop_at:
+            started = time.perf_counter()
+            try:
+                status, _ = request(conn, 'GET', path, headers=headers)
+            except http.client.RemoteDisconnected:
+                # Keep-alive connection closed by a recycled worker
+                # (max_requests); reconnect and retry like a real client.
+                conn.close()
+                conn = http.client.HTTPConnection('127.0.0.1', PORT, timeout=30)
+                continue
+            except (OSError, http.client.HTTPException):
+                conn.close()
+                conn = http.client.HTTPConnection('127.0.0.1', PORT, timeout=30)
+                status = None
+            if status != 200:
+                errors.append(status)
+                continue
+            local.append(time.perf_counter() - started)
+        with lock:
+            latencies.extend(local)
+
+    threads = [threading.Thread(target=client) for _ in range(concurrency)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return latencies, errors
+
+
+def run_mode(mode, args, db_uri):
+    env = dict(os.environ, FLASK_ENV='production', SQLALCHEMY_DATABASE_URI=db_uri,
+               GUNICORN_WORKER_CLASS=mode, PORT=str(PORT))
+    env.pop('DATABASE_URL', None)
+    server = subprocess.Popen([sys.executable, '-m', 'gunicorn', 'run:app'], cwd=ROOT, env=env,
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        wait_until_up()
+        conn = http.client.HTTPConnection('127.0.0.1', PORT, timeout=30)
+        _, body = request(conn, 'POST', '/api/auth/login',
+                          body=json.dumps({'email': 'admin@example.com', 'password': 'password123'}),
+                          headers={'Content-Type': 'application/json'})
+        headers = {'Authorization': f"Bearer {json.loads(body)['access_token']}"}
+
+        load(args.path, headers, args.concurrency, 1)  # warm up
+        latencies, errors = load(args.path, headers, args.concurrency, args.seconds)
+    finally:
+        server.terminate()
+        server.wait()
+
+    latencies.sort()
+    p50 = statistics.median(latencies) * 1000
+    p99 = latencies[int(len(latencies) * 0.99) - 1] * 1000
+    print(f'{mode:8} {len(latencies) / args.seconds:8.0f} req/s   '
+          f'p50 {p50:6.1f} ms   p99 {p99:6.1f} ms   errors {len(errors)}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--modes', default='sync,gthread,gevent')
+    parser.add_argument('--path', default='/api/auth/me')
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--seconds', type=int, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_uri = f"sqlite:///{os.path.join(tmp, 'serving.db')}"
+        env = dict(os.environ, FLASK_ENV='production', SQLALCHEMY_DATABASE_URI=db_uri)
+        env.pop('DATABASE_URL', None)
+        subprocess.run([sys.executable, '-m', 'flask', '--app', 'run', 'bootstrap-db'],
+                       cwd=ROOT, env=env, check=True, stdout=subprocess.DEVNULL)
+
+        print(f'GET {args.path}, {args.concurrency} clients, {args.seconds}s, '
+              f'{os.cpu_count()} CPU(s)')
+        for mode in args.modes.split(','):
+            run_mode(mode, args, db_uri)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+"""Measure worker boot time (import + create_app) in fresh interpreters.
+
+Each sample runs in its own subprocess so import caches do not hide the
+cost a gunicorn worker pays on start. `--with-bootstrap` also runs the
+schema/seed bootstrap inside the timed section, which is what every
+worker used to do before it moved to `flask bootstrap-db`.
+
+Usage:
+  python benchmarks/startup.py [--runs 5] [--with-bootstrap] [--cold]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SAMPLE = r'''
+import sys, time
+sys.path.insert(0, {root!r})
+t0 = time.perf_counter()
+from app import create_app
+t1 = time.perf_counter()
+app = create_app('production')
+if {with_bootstrap!r}:
+    from app.bootstrap import bootstrap
+    with app.app_context():
+        bootstrap()
+t2 = time.perf_counter()
+print(f"{{(t1 - t0) * 1000:.1f}} {{(t2 - t1) * 1000:.1f}}")
+'''
+
+
+def sample(db_path, with_bootstrap):
+    env = dict(os.environ, SQLALCHEMY_DATABASE_URI=f'sqlite:///{db_path}')
+    env.pop('DATABASE_URL', None)
+    code = SAMPLE.format(root=ROOT, with_bootstrap=with_bootstrap)
+    out = subprocess.run([sys.executable, '-c', code], env=env, check=True,
+                         capture_output=True, text=True).stdout
+    import_ms, create_ms = out.strip().splitlines()[-1].split()
+    return float(import_ms), float(create_ms)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--with-bootstrap', action='store_true',
+                        help='include schema creation and seeding (pre-bootstrap behaviour)')
+    parser.add_argument('--cold', action='store_true',
+                        help='use an empty database for every run (first deploy)')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'startup.db')
+        if args.with_bootstrap and not args.cold:
+            sample(db_path, True)  # warm the schema and seed rows once
+
+        imports, creates = [], []
+        for _ in range(args.runs):
+            if args.cold and os.path.exists(db_path):
+                os.remove(db_path)
+            import_ms, create_ms = sample(db_path, args.with_bootstrap)
+            imports.append(import_ms)
+            creates.append(create_ms)
+
+    label = 'with bootstrap' if args.with_bootstrap else 'app only'
+    if args.cold:
+        label += ', empty db'
+    print(f'{label}: import {statistics.median(imports):.0f} ms, '
+          f'create_app {statistics.median(creates):.0f} ms '
+          f'(median of {args.runs})')
+
+
+if __name__ == '__main__':
+    main()
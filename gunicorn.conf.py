@@ -0,0 +1,66 @@
+"""
+Gunicorn configuration, loaded automatically by `gunicorn run:app`.
+
+All knobs live in app/config/settings.py (GUNICORN_* settings, overridable
+through the environment); app/config/serving.py sizes workers and threads
+from the CPU count.
+"""
+
+import importlib.util
+import os
+
+# gevent has to patch the stdlib before anything imports ssl/threading,
+# i.e. before the app package (and its settings) is imported below.
+if os.getenv('GUNICORN_WORKER_CLASS') == 'gevent':
+    # Optional dependencies: requirements-gevent.txt
+    _missing = [name for name in ('gevent', 'psycogreen') if importlib.util.find_spec(name) is None]
+    if _missing:
+        raise RuntimeError(f"GUNICORN_WORKER_CLASS=gevent needs {' and '.join(_missing)}: "
+                           'pip install -r requirements-gevent.txt')
+
+    from gevent import monkey
+    monkey.patch_all()
+
+    # Make psycopg2 yield to the gevent hub instead of blocking the worker.
+    from psycogreen.gevent import patch_psycopg
+    patch_psycopg()
+
+from app.config import config as _app_config  # noqa: E402
+from app.config.serving import serving_profile as _serving_profile  # noqa: E402
+
+# Module-level names are read as gunicorn settings, hence the underscores.
+# Same fallback as create_app(): unknown environments get the default config
+_settings = _app_config.get(os.getenv('FLASK_ENV'), _app_config['default'])
+_profile = _serving_profile(_settings)
+
+if _profile['worker_class'] == 'gevent' and os.getenv('GUNICORN_WORKER_CLASS') != 'gevent':
+    raise RuntimeError('Select the gevent worker through the GUNICORN_WORKER_CLASS environment variable '
+                       'so the stdlib is patched before the app is imported')
+
+globals().update(_profile)
+
+accesslog = os.getenv('GUNICORN_ACCESS_LOG')
+
+
+def post_fork(server, worker):
+    """Give each forked worker its own database connections."""
+    if not server.cfg.preload_app:
+        return
+    from run import app
+    from app import db
+    with app.app_context():
+        for engine in db.engines.values():
+            # close=False: leave the parent's connections alone and just
+            # forget them in the child.
+            engine.dispose(close=False)
+
+
+def post_worker_init(worker):
+    """Start the per-worker background jobs once the app is loaded."""
+    from run import app
+    from app.memberships import start_membership_expiry
+    from app.middleware.auth import start_denylist_sync
+    from app.sweeper import start_sweeper
+    start_denylist_sync(app)
+    start_sweeper(app)
+    start_membership_expiry(app)
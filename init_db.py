@@ -6,7 +6,8 @@ import os
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 try:
-    from app import create_app, db
+    from app import create_app
+    from app.bootstrap import bootstrap
     
     print("🔧 Initializing database...")
     
@@ -14,8 +15,10 @@ try:
     
     with app.app_context():
         print("📋 Creating all tables...")
-        db.create_all()
+        created = bootstrap()
         print("✅ Database tables created successfully!")
+        for email in created:
+            print(f"✅ Default user created: {email}")
         
         # List tables created
         from app.models import User, Member, Attendance, Workout
@@ -6,7 +6,7 @@ import os
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from app import create_app, db
-from app.models.user import User
+from app.bootstrap import create_schema, seed_default_users, DEFAULT_PASSWORD
 from app.models.member import Member
 
 def seed_database():
@@ -17,24 +17,14 @@ def seed_database():
 
     with app.app_context():
         # Create tables if they don't exist
-        db.create_all()
-
-        # Check if admin already exists
-        admin = User.query.filter_by(email='admin@example.com').first()
-
-        if not admin:
-            print("Creating admin user...")
-            admin = User(
-                name='Admin User',
-                email='admin@example.com',
-                role='admin'
-            )
-            admin.set_password('password123')
-            db.session.add(admin)
-            db.session.commit()
-            print("Admin user created: admin@example.com / password123")
-        else:
-            print("Admin user already exists")
+        create_schema()
+
+        # Create admin/test users if they don't exist
+        created = seed_default_users()
+        for email in created:
+            print(f"User created: {email} / {DEFAULT_PASSWORD}")
+        if not created:
+            print("Default users already exist")
 
         # Create a sample member if none exist
         member_count = Member.query.count()
@@ -4,6 +4,10 @@ from app import create_app, db
 from app.models import User, Member
 
 
+def pytest_configure(config):
+    config.addinivalue_line('markers', 'postgres: needs a Postgres database at TEST_POSTGRES_URL')
+
+
 @pytest.fixture(scope='session')
 def test_app():
     """Create app with test database configuration."""
@@ -15,6 +19,10 @@ def test_app():
     app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
     app.config['JWT_SECRET_KEY'] = 'test-secret-key'
     app.config['PRESERVE_CONTEXT_ON_EXCEPTION'] = False
+    # Cheapest bcrypt cost keeps the suite fast
+    app.config['BCRYPT_ROUNDS'] = 4
+    # Every test logs in from 127.0.0.1; tests/test_rate_limit.py turns it on
+    app.config['RATE_LIMIT_ENABLED'] = False
 
     with app.app_context():
         db.create_all()
@@ -69,13 +77,31 @@ def create_user(db_session):
 def create_member(db_session):
     """Factory fixture for creating test members."""
     import uuid
-    def _create_member(name=None, email=None, user_id=None):
+    def _create_member(name=None, email=None, user_id=None, **fields):
         if name is None:
             name = f'Member {str(uuid.uuid4())[:8]}'
         if email is None:
             email = f'member-{str(uuid.uuid4())[:8]}@example.com'
-        member = Member(name=name, email=email, user_id=user_id)
+        member = Member(name=name, email=email, user_id=user_id, **fields)
         db_session.session.add(member)
         db_session.session.commit()
         return member
     return _create_member
+
+
+@pytest.fixture
+def login(client, create_user):
+    """Factory fixture: create a user, log in, return (user, auth headers)."""
+    def _login(role='user', email=None, password='password123'):
+        if email is None:
+            email = f'{role}@example.com'
+        user = create_user(email=email, password=password, role=role)
+        response = client.post('/api/auth/login', json={'email': email, 'password': password})
+        return user, {'Authorization': f"Bearer {response.get_json()['access_token']}"}
+    return _login
+
+
+@pytest.fixture
+def admin_headers(login):
+    """Auth headers of a logged-in admin (admin@example.com)."""
+    return login('admin')[1]
@@ -0,0 +1,119 @@
+import json
+from app.models import User
+from app.passwords import hash_cost
+
+
+def events(response):
+    return [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+
+def test_import_csv(client, test_app, db_session, admin_headers):
+    headers = admin_headers
+    test_app.config['USER_IMPORT_BATCH_SIZE'] = 2
+    body = (
+        'name,email,password,phone,role\n'
+        'Ann,ann@example.com,password123,555-0100,\n'
+        'Bob,bob@example.com,password123,,admin\n'
+        'Cid,admin@example.com,password123,,\n'
+        'Dee,,password123,,\n'
+        'Eve,ann@example.com,password123,,\n'
+    )
+    try:
+        response = client.post('/api/admin/users/import', data=body, headers=headers, content_type='text/csv')
+    finally:
+        test_app.config['USER_IMPORT_BATCH_SIZE'] = 500
+
+    assert response.status_code == 200
+    assert response.mimetype == 'application/x-ndjson'
+    stream = events(response)
+    errors = [(e['row'], e['message']) for e in stream if e['type'] == 'error']
+    assert errors == [
+        (3, 'Email already exists'),
+        (4, 'Name, email, and password are required'),
+        (5, 'Duplicate email in import'),
+    ]
+    assert [e['processed'] for e in stream if e['type'] == 'progress'] == [2, 4, 5]
+    assert stream[-1] == {'type': 'done', 'processed': 5, 'created': 2, 'failed': 3}
+
+    ann = User.query.filter_by(email='ann@example.com').one()
+    assert ann.phone == '555-0100' and ann.role == 'user'
+    assert ann.check_password('password123')
+    assert hash_cost(ann.password) == 4
+    assert User.query.filter_by(email='bob@example.com').one().role == 'admin'
+
+
+def test_import_ndjson(client, admin_headers):
+    headers = admin_headers
+    body = '\n'.join([
+        json.dumps({'name': 'Ann', 'email': 'ann@example.com', 'password': 'password123'}),
+        'not json',
+        json.dumps({'name': 'Bob', 'email': 'bob@example.com', 'password': 'pw', 'role': 'owner'}),
+    ])
+
+    response = client.post('/api/admin/users/import', data=body, headers=headers,
+                           content_type='application/x-ndjson')
+
+    stream = events(response)
+    assert [(e['row'], e['message']) for e in stream if e['type'] == 'error'] == [
+        (2, 'Invalid JSON object'),
+        (3, 'Role must be one of user, admin'),
+    ]
+    assert stream[-1]['created'] == 1
+    login = client.post('/api/auth/login', json={'email': 'ann@example.com', 'password': 'password123'})
+    assert login.status_code == 200
+
+
+def test_import_reports_non_string_fields_per_row(client, test_app, admin_headers):
+    headers = admin_headers
+    test_app.config['USER_IMPORT_BATCH_SIZE'] = 2
+    body = '\n'.join(json.dumps(row) for row in [
+        {'name': 'Ann', 'email': 'ann@example.com', 'password': 'password123'},
+        {'name': 'Bob', 'email': 'bob@example.com', 'password': 123},
+        {'name': 'Cid', 'email': 'cid@example.com', 'password': None},
+        {'name': 'Dee', 'email': ['dee@example.com'], 'password': 'password123'},
+        {'name': 'Eve', 'email': 'eve@example.com', 'password': 'password123'},
+    ])
+    try:
+        response = client.post('/api/admin/users/import', data=body, headers=headers,
+                               content_type='application/x-ndjson')
+    finally:
+        test_app.config['USER_IMPORT_BATCH_SIZE'] = 500
+
+    stream = events(response)
+    assert [(e['row'], e['message']) for e in stream if e['type'] == 'error'] == [
+        (2, 'Name, email, and password must be strings'),
+        (3, 'Name, email, and password are required'),
+        (4, 'Name, email, and password must be strings'),
+    ]
+    assert stream[-1] == {'type': 'done', 'processed': 5, 'created': 2, 'failed': 3}
+
+
+def test_import_reports_password_over_72_bytes_per_row(client, test_app, admin_headers):
+    test_app.config['USER_IMPORT_BATCH_SIZE'] = 2
+    body = '\n'.join(json.dumps(row) for row in [
+        {'name': 'Ann', 'email': 'ann@example.com', 'password': 'password123'},
+        {'name': 'Bob', 'email': 'bob@example.com', 'password': 'p' * 73},
+        {'name': 'Cid', 'email': 'cid@example.com', 'password': 'password123'},
+    ])
+    try:
+        response = client.post('/api/admin/users/import', data=body, headers=admin_headers,
+                               content_type='application/x-ndjson')
+    finally:
+        test_app.config['USER_IMPORT_BATCH_SIZE'] = 500
+
+    stream = events(response)
+    assert [(e['row'], e['message']) for e in stream if e['type'] == 'error'] == [
+        (2, 'Password must be at most 72 bytes'),
+    ]
+    assert stream[-1] == {'type': 'done', 'processed': 3, 'created': 2, 'failed': 1}
+
+
+def test_import_requires_admin_and_known_format(client, create_user, admin_headers):
+    create_user(email='user@example.com', password='password123')
+    resp = client.post('/api/auth/login', json={'email': 'user@example.com', 'password': 'password123'})
+    user_headers = {'Authorization': f"Bearer {resp.get_json()['access_token']}"}
+    assert client.post('/api/admin/users/import', data='', headers=user_headers,
+                       content_type='text/csv').status_code == 403
+
+    headers = admin_headers
+    assert client.post('/api/admin/users/import', json=[], headers=headers).status_code == 415
@@ -0,0 +1,34 @@
+import json
+from app import create_app
+from app.config.settings import ProductionConfig
+
+
+def test_build_apispec_matches_dynamic_spec(test_app, client, tmp_path):
+    output = tmp_path / 'apispec.json'
+    result = test_app.test_cli_runner().invoke(args=['build-apispec', '--output', str(output)])
+    assert result.exit_code == 0
+
+    built = json.loads(output.read_bytes())
+    assert built == client.get('/apispec.json').get_json()
+    assert '/api/auth/login' in built['paths']
+
+
+def test_prebuilt_spec_is_served_with_etag(test_app, tmp_path, monkeypatch):
+    output = tmp_path / 'apispec.json'
+    test_app.test_cli_runner().invoke(args=['build-apispec', '--output', str(output)])
+    monkeypatch.setattr(ProductionConfig, 'API_SPEC_PATH', str(output))
+
+    prod_client = create_app('production').test_client()
+
+    response = prod_client.get('/apispec.json')
+    assert response.status_code == 200
+    assert response.data == output.read_bytes()
+    etag = response.headers['ETag']
+
+    response = prod_client.get('/apispec.json', headers={'If-None-Match': etag})
+    assert response.status_code == 304
+    assert response.data == b''
+
+    response = prod_client.get('/api-docs')
+    assert response.status_code == 200
+    assert b'/apispec.json' in response.data
@@ -52,6 +52,68 @@ class TestCheckIn:
         data = response.get_json()
         assert 'already' in data['message'].lower() or 'duplicate' in data['message'].lower()
 
+    def test_check_in_is_a_single_insert(self, client, create_user, create_member, db_session):
+        """The happy path is one INSERT ... ON CONFLICT round trip."""
+        from sqlalchemy import event
+        member = create_member(name='Member', email='member@example.com')
+        other = create_member(name='Other', email='other@example.com')
+        create_user(email='user@example.com', password='password123')
+        login_response = client.post('/api/auth/login', json={
+            'email': 'user@example.com',
+            'password': 'password123'
+        })
+        headers = {'Authorization': f"Bearer {login_response.get_json()['access_token']}"}
+        client.post('/api/attendance/checkin', json={'member_id': other.id}, headers=headers)
+        member_id = member.id
+
+        statements = []
+        def record(conn, cursor, statement, *args):
+            statements.append(statement)
+        event.listen(db_session.engine, 'before_cursor_execute', record)
+        try:
+            response = client.post('/api/attendance/checkin', json={'member_id': member_id}, headers=headers)
+        finally:
+            event.remove(db_session.engine, 'before_cursor_execute', record)
+
+        assert response.status_code == 200
+        assert response.get_json()['data']['memberName'] == 'Member'
+        assert len(statements) == 1
+        assert statements[0].startswith('INSERT INTO attendances')
+        assert Attendance.query.filter_by(member_id=member_id).one().check_in_date == datetime.utcnow().date()
+
+    def test_same_day_duplicate_rejected_by_database(self, create_member, db_session):
+        """Two inserts for one member and day conflict even without the check."""
+        from sqlalchemy.exc import IntegrityError
+        member = create_member()
+        db_session.session.add(Attendance(member_id=member.id, check_in_time=datetime(2024, 1, 1, 9)))
+        db_session.session.commit()
+
+        db_session.session.add(Attendance(member_id=member.id, check_in_time=datetime(2024, 1, 1, 17)))
+        with pytest.raises(IntegrityError):
+            db_session.session.commit()
+        db_session.session.rollback()
+
+        assert Attendance.check_in(member.id, now=datetime(2024, 1, 1, 20)) is None
+        assert Attendance.check_in(member.id, now=datetime(2024, 1, 2, 8)) is not None
+
+    def test_check_in_inactive_member(self, client, create_user, create_member, db_session):
+        """Members whose membership is not active cannot check in."""
+        member = create_member(membership_status='expired')
+        create_user(email='user@example.com', password='password123')
+        login_response = client.post('/api/auth/login', json={
+            'email': 'user@example.com',
+            'password': 'password123'
+        })
+        token = login_response.get_json()['access_token']
+
+        response = client.post(
+            '/api/attendance/checkin',
+            json={'member_id': member.id},
+            headers={'Authorization': f'Bearer {token}'}
+        )
+        assert response.status_code == 400
+        assert 'expired' in response.get_json()['message']
+
     def test_check_in_invalid_member(self, client, create_user):
         """Test check-in fails with invalid member ID."""
         user = create_user(email='user@example.com', password='password123')
@@ -78,6 +140,104 @@ class TestCheckIn:
         assert response.status_code == 401
 
 
+class TestBatchCheckIn:
+    """Test POST /api/attendance/checkin/batch."""
+
+    def test_batch_outcomes_and_idempotent_replay(self, client, create_member, db_session, login):
+        from sqlalchemy import event
+        headers = login()[1]
+        early, late = create_member(), create_member()
+        expired = create_member(membership_status='expired')
+        yesterday = datetime.utcnow() - timedelta(days=1)
+        items = [
+            {'member_id': early.id, 'check_in_time': yesterday.isoformat(), 'client_event_id': 'e1'},
+            {'member_id': early.id, 'check_in_time': (yesterday - timedelta(hours=1)).isoformat(),
+             'client_event_id': 'e2'},
+            {'member_id': late.id, 'check_in_time': yesterday.isoformat() + 'Z', 'client_event_id': 'e3'},
+            {'member_id': expired.id, 'check_in_time': yesterday.isoformat(), 'client_event_id': 'e4'},
+            {'member_id': 'missing', 'check_in_time': yesterday.isoformat(), 'client_event_id': 'e5'},
+            {'member_id': late.id, 'check_in_time': 'yesterday', 'client_event_id': 'e6'},
+            {'member_id': late.id, 'check_in_time': (datetime.utcnow() + timedelta(hours=1)).isoformat(),
+             'client_event_id': 'e7'},
+            {'member_id': late.id, 'check_in_time': yesterday.isoformat(), 'client_event_id': 'e3'},
+        ]
+
+        statements = []
+        def record(conn, cursor, statement, *args):
+            statements.append(statement)
+        event.listen(db_session.engine, 'before_cursor_execute', record)
+        try:
+            response = client.post('/api/attendance/checkin/batch', json=items, headers=headers)
+        finally:
+            event.remove(db_session.engine, 'before_cursor_execute', record)
+
+        assert response.status_code == 200
+        data = response.get_json()
+        assert [r['status'] for r in data['results']] == [
+            'already_checked_in', 'created', 'created', 'error', 'error', 'error', 'error', 'created'
+        ]
+        assert (data['created'], data['alreadyCheckedIn'], data['failed']) == (3, 1, 4)
+        assert data['results'][7]['id'] == data['results'][2]['id']
+        assert data['results'][3]['message'] == 'Cannot check in. Membership status: expired'
+        assert data['results'][4]['message'] == 'Member not found'
+        assert data['results'][6]['message'] == 'check_in_time is in the future'
+        assert sum(s.startswith('INSERT INTO attendances') for s in statements) == 1
+        # Batch statements (the rest is the JWT user lookup): two SELECTs + INSERT
+        assert len([s for s in statements if 'attendances' in s or 'FROM members' in s]) == 3
+
+        # The kiosk did not get the response and sends everything again
+        replay = client.post('/api/attendance/checkin/batch', json=items, headers=headers).get_json()
+        assert [r['status'] for r in replay['results']] == [
+            'already_checked_in', 'replayed', 'replayed', 'error', 'error', 'error', 'error', 'replayed'
+        ]
+        assert [r.get('id') for r in replay['results']] == [r.get('id') for r in data['results']]
+        assert Attendance.query.count() == 2
+        assert Attendance.query.filter_by(client_event_id='e2').one().check_in_time == yesterday - timedelta(hours=1)
+
+    def test_batch_rows_are_inserted_by_hour_then_member(self, client, create_member, db_session, login):
+        from sqlalchemy import text
+        headers = login()[1]
+        for member_id in ('m-a', 'm-b', 'm-c', 'm-d'):
+            create_member(id=member_id, email=f'{member_id}@example.com')
+        nine = (datetime.utcnow() - timedelta(days=1)).replace(hour=9, minute=0, second=0, microsecond=0)
+        items = [
+            {'member_id': member_id, 'check_in_time': (nine + timedelta(minutes=minutes)).isoformat(),
+             'client_event_id': member_id}
+            for member_id, minutes in (('m-c', 65), ('m-a', 110), ('m-d', 80), ('m-b', 30))
+        ]
+        assert client.post('/api/attendance/checkin/batch', json=items, headers=headers).get_json()['created'] == 4
+
+        # Concurrent batches then lock the rollup rows in the same order
+        inserted = db_session.session.execute(text('SELECT member_id FROM attendances ORDER BY rowid')).scalars()
+        assert list(inserted) == ['m-b', 'm-a', 'm-c', 'm-d']
+
+    def test_existing_check_in_that_day_wins(self, client, create_member, db_session, login):
+        headers = login()[1]
+        member = create_member()
+        db_session.session.add(Attendance(member_id=member.id))
+        db_session.session.commit()
+
+        response = client.post('/api/attendance/checkin/batch', json=[
+            {'member_id': member.id, 'check_in_time': datetime.utcnow().isoformat(), 'client_event_id': 'k-1'},
+        ], headers=headers)
+
+        assert response.get_json()['results'][0]['status'] == 'already_checked_in'
+        assert Attendance.query.count() == 1
+
+    def test_batch_body_limits(self, client, test_app, login):
+        headers = login()[1]
+        url = '/api/attendance/checkin/batch'
+        assert client.post(url, json={'member_id': 'x'}, headers=headers).status_code == 400
+        test_app.config['CHECK_IN_BATCH_MAX_ITEMS'] = 1
+        try:
+            assert client.post(url, json=[{}, {}], headers=headers).status_code == 400
+        finally:
+            test_app.config['CHECK_IN_BATCH_MAX_ITEMS'] = 1000
+        results = client.post(url, json=[{}], headers=headers).get_json()['results']
+        assert results == [{'item': 1, 'clientEventId': None, 'status': 'error',
+                            'message': 'member_id is required'}]
+
+
 class TestAttendanceHistory:
     """Test attendance history endpoints."""
 
@@ -163,6 +323,28 @@ class TestAttendanceHistory:
         data = response.get_json()
         assert 'attendances' in data or isinstance(data, list)
 
+    def test_today_is_the_utc_check_in_date(self, client, create_user, create_member, db_session):
+        """/today lists the check-ins whose UTC check_in_date is today."""
+        from datetime import datetime, time, timedelta
+        create_user(email='admin@example.com', password='password123', role='admin')
+        member = create_member()
+        today = datetime.utcnow().date()
+        midnight = datetime.combine(today, time.min)
+        db_session.session.add_all([
+            Attendance(member_id=member.id, check_in_time=midnight + timedelta(seconds=1)),
+            Attendance(member_id=member.id, check_in_time=midnight - timedelta(seconds=1)),
+        ])
+        db_session.session.commit()
+        token = client.post('/api/auth/login', json={
+            'email': 'admin@example.com', 'password': 'password123'
+        }).get_json()['access_token']
+
+        data = client.get('/api/attendance/today', headers={'Authorization': f'Bearer {token}'}).get_json()
+
+        assert data['date'] == today.isoformat()
+        assert [a['checkInTime'][:19] for a in data['attendances']] == [
+            (midnight + timedelta(seconds=1)).isoformat()]
+
     def test_attendance_history_limit(self, client, create_user, create_member, db_session):
         """Test attendance history respects limit parameter."""
         member = create_member(name='Member', email='member@example.com')
@@ -223,6 +405,41 @@ class TestAttendanceStats:
         data = response.get_json()
         assert 'totalCheckins' in data or 'total_checkins' in data
 
+    def test_stats_are_one_aggregate_query(self, client, create_user, create_member, db_session):
+        """Counts come from conditional COUNTs, not from loading every row."""
+        from sqlalchemy import event
+        member = create_member()
+        idle = create_member()
+        now = datetime(2024, 3, 20, 12, 0)
+        for when in (now, now - timedelta(days=3), now - timedelta(days=10),
+                     now - timedelta(days=25), datetime(2023, 3, 20)):
+            db_session.session.add(Attendance(member_id=member.id, check_in_time=when))
+        db_session.session.commit()
+        member_id, idle_id = member.id, idle.id
+
+        stats = Attendance.get_member_stats(member_id, now=now)
+        assert (stats['totalCheckins'], stats['thisMonth'], stats['thisWeek']) == (5, 3, 2)
+        assert stats['lastCheckIn'] == now
+        assert Attendance.get_member_stats(idle_id, now=now)['totalCheckins'] == 0
+        assert Attendance.get_member_stats('nonexistent-id') is None
+
+        create_user(email='user@example.com', password='password123')
+        token = client.post('/api/auth/login', json={
+            'email': 'user@example.com', 'password': 'password123'
+        }).get_json()['access_token']
+        statements = []
+        def record(conn, cursor, statement, *args):
+            statements.append(statement)
+        event.listen(db_session.engine, 'before_cursor_execute', record)
+        try:
+            response = client.get(f'/api/attendance/stats/{member_id}',
+                                  headers={'Authorization': f'Bearer {token}'})
+        finally:
+            event.remove(db_session.engine, 'before_cursor_execute', record)
+        assert response.get_json()['totalCheckins'] == 5
+        assert response.get_json()['lastCheckIn'] == now.isoformat()
+        assert len([s for s in statements if 'attendances' in s]) == 1
+
     def test_attendance_stats_nonexistent_member(self, client, create_user):
         """Test stats endpoint returns 404 for nonexistent member."""
         user = create_user(email='user@example.com', password='password123')
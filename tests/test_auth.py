@@ -37,6 +37,23 @@ class TestAuthRegistration:
         })
         assert response.status_code == 400
 
+    def test_register_password_over_72_bytes(self, client):
+        """Test registration refuses a password bcrypt cannot hash."""
+        response = client.post('/api/auth/register', json={
+            'name': 'John Doe',
+            'email': 'john@example.com',
+            'password': 'p' * 73
+        })
+        assert response.status_code == 400
+        assert response.get_json()['message'] == 'Password must be at most 72 bytes'
+        # 72 bytes, counted in UTF-8
+        response = client.post('/api/auth/register', json={
+            'name': 'John Doe',
+            'email': 'john@example.com',
+            'password': '\u00e9' * 36
+        })
+        assert response.status_code == 201
+
 
 class TestAuthLogin:
     """Test user login endpoints."""
@@ -81,6 +98,15 @@ class TestAuthLogin:
         })
         assert response.status_code == 400
 
+    def test_login_password_over_72_bytes(self, client, create_user):
+        """Test an over-long password is a failed login, not an error."""
+        create_user(email='user@example.com', password='password123')
+        response = client.post('/api/auth/login', json={
+            'email': 'user@example.com',
+            'password': 'p' * 73
+        })
+        assert response.status_code == 401
+
 
 class TestAuthCurrentUser:
     """Test current user endpoint."""
@@ -135,16 +161,13 @@ class TestPasswordReset:
 
     def test_confirm_password_reset(self, client, create_user, db_session):
         """Test confirming password reset."""
-        import hashlib
+        from app.models import PasswordResetToken
         user = create_user(email='user@example.com')
-        
+
         # Generate reset token
-        reset_token = 'test-token-123'
-        user.reset_password_token = hashlib.sha256(reset_token.encode()).hexdigest()
-        from datetime import datetime, timedelta
-        user.reset_password_expires = datetime.utcnow() + timedelta(minutes=10)
+        reset_token = PasswordResetToken.issue(user.id)
         db_session.session.commit()
-        
+
         response = client.post('/api/auth/reset-password/confirm', json={
             'token': reset_token,
             'newPassword': 'newpassword123'
@@ -155,21 +178,53 @@ class TestPasswordReset:
 
     def test_confirm_password_reset_expired_token(self, client, create_user, db_session):
         """Test password reset with expired token."""
-        import hashlib
-        from datetime import datetime, timedelta
-        
+        from datetime import timedelta
+        from app.models import PasswordResetToken
+
         user = create_user(email='user@example.com')
-        reset_token = 'test-token-123'
-        user.reset_password_token = hashlib.sha256(reset_token.encode()).hexdigest()
-        user.reset_password_expires = datetime.utcnow() - timedelta(minutes=1)  # Expired
+        reset_token = PasswordResetToken.issue(user.id, ttl=timedelta(minutes=-1))  # Expired
         db_session.session.commit()
-        
+
         response = client.post('/api/auth/reset-password/confirm', json={
             'token': reset_token,
             'newPassword': 'newpassword123'
         })
         assert response.status_code == 400
 
+    def test_reset_token_is_single_use(self, client, create_user):
+        """Test a reset token from the request endpoint works exactly once."""
+        create_user(email='user@example.com', password='password123')
+        reset_token = client.post('/api/auth/reset-password', json={
+            'email': 'user@example.com'
+        }).get_json()['resetToken']
+
+        first = client.post('/api/auth/reset-password/confirm', json={
+            'token': reset_token, 'password': 'newpassword123'
+        })
+        second = client.post('/api/auth/reset-password/confirm', json={
+            'token': reset_token, 'password': 'otherpassword123'
+        })
+        assert first.status_code == 200
+        assert second.status_code == 400
+
+        response = client.post('/api/auth/login', json={
+            'email': 'user@example.com', 'password': 'newpassword123'
+        })
+        assert response.status_code == 200
+
+    def test_confirm_password_reset_over_72_bytes(self, client, create_user, db_session):
+        """Test a reset to a password bcrypt cannot hash is refused."""
+        from app.models import PasswordResetToken
+        user = create_user(email='user@example.com')
+        reset_token = PasswordResetToken.issue(user.id)
+        db_session.session.commit()
+
+        response = client.post('/api/auth/reset-password/confirm', json={
+            'token': reset_token, 'password': 'p' * 73
+        })
+        assert response.status_code == 400
+        assert response.get_json()['message'] == 'Password must be at most 72 bytes'
+
 
 class TestRoleBasedAccess:
     """Test role-based access control."""
@@ -209,3 +264,234 @@ class TestRoleBasedAccess:
             headers={'Authorization': f'Bearer {token}'}
         )
         assert response.status_code == 200
+
+
+class TestTokenClaims:
+    """Test role/token-version claims and revocation."""
+
+    def _login(self, client, email):
+        resp = client.post('/api/auth/login', json={'email': email, 'password': 'password123'})
+        return resp.get_json()['access_token']
+
+    def test_admin_check_uses_token_claims(self, client, create_user, db_session):
+        from flask_jwt_extended import decode_token
+        from sqlalchemy import event
+        create_user(email='admin@example.com', password='password123', role='admin')
+        token = self._login(client, 'admin@example.com')
+        assert decode_token(token)['role'] == 'admin'
+        headers = {'Authorization': f'Bearer {token}'}
+        client.get('/api/members', headers=headers)  # warm the token-version cache
+
+        statements = []
+        def record(conn, cursor, statement, *args):
+            statements.append(statement)
+        event.listen(db_session.engine, 'before_cursor_execute', record)
+        try:
+            response = client.get('/api/members', headers=headers)
+        finally:
+            event.remove(db_session.engine, 'before_cursor_execute', record)
+
+        assert response.status_code == 200
+        assert not any('FROM users' in s for s in statements)
+
+    def test_role_change_revokes_tokens(self, client, create_user, db_session):
+        user = create_user(email='admin@example.com', password='password123', role='admin')
+        headers = {'Authorization': f"Bearer {self._login(client, 'admin@example.com')}"}
+        assert client.get('/api/members', headers=headers).status_code == 200
+
+        user.role = 'user'
+        db_session.session.commit()
+
+        assert client.get('/api/members', headers=headers).status_code == 401
+        # A fresh login carries the new role
+        headers = {'Authorization': f"Bearer {self._login(client, 'admin@example.com')}"}
+        assert client.get('/api/members', headers=headers).status_code == 403
+
+    def test_deleted_user_token_rejected(self, client, create_user, db_session):
+        user = create_user(email='user@example.com', password='password123')
+        headers = {'Authorization': f"Bearer {self._login(client, 'user@example.com')}"}
+        assert client.get('/api/auth/me', headers=headers).status_code == 200
+
+        db_session.session.delete(user)
+        db_session.session.commit()
+
+        assert client.get('/api/auth/me', headers=headers).status_code == 401
+
+
+class TestPasswordHashing:
+    """Test bcrypt cost handling and executors."""
+
+    def test_login_rehashes_when_cost_changes(self, client, create_user, test_app, db_session):
+        from app.passwords import hash_cost
+        user = create_user(email='user@example.com', password='password123')
+        assert hash_cost(user.password) == 4
+
+        test_app.config['BCRYPT_ROUNDS'] = 5
+        try:
+            response = client.post('/api/auth/login', json={
+                'email': 'user@example.com',
+                'password': 'password123'
+            })
+        finally:
+            test_app.config['BCRYPT_ROUNDS'] = 4
+        assert response.status_code == 200
+
+        db_session.session.expire_all()
+        user = db_session.session.get(User, user.id)
+        assert hash_cost(user.password) == 5
+        assert user.check_password('password123')
+
+    @pytest.mark.parametrize('executor', ['thread', 'process'])
+    def test_hashing_in_executor(self, test_app, executor):
+        from app.passwords import hash_password, verify_password, get_executor
+        test_app.config['BCRYPT_EXECUTOR'] = executor
+        try:
+            assert get_executor() is not None
+            hashed = hash_password('secret')
+            assert verify_password('secret', hashed)
+            assert not verify_password('wrong', hashed)
+        finally:
+            test_app.config['BCRYPT_EXECUTOR'] = 'inline'
+
+
+class TestRefreshTokens:
+    """Test refresh tokens, rotation and logout."""
+
+    def _login(self, client, create_user):
+        create_user(email='user@example.com', password='password123')
+        return client.post('/api/auth/login', json={
+            'email': 'user@example.com', 'password': 'password123'
+        }).get_json()
+
+    def test_refresh_rotates_tokens(self, client, create_user):
+        tokens = self._login(client, create_user)
+        old_refresh = {'Authorization': f"Bearer {tokens['refresh_token']}"}
+
+        response = client.post('/api/auth/refresh', headers=old_refresh)
+        assert response.status_code == 200
+        new_tokens = response.get_json()
+        me = client.get('/api/auth/me', headers={'Authorization': f"Bearer {new_tokens['access_token']}"})
+        assert me.status_code == 200
+
+        # The used refresh token is revoked; the new one works
+        assert client.post('/api/auth/refresh', headers=old_refresh).status_code == 401
+        response = client.post('/api/auth/refresh', headers={'Authorization': f"Bearer {new_tokens['refresh_token']}"})
+        assert response.status_code == 200
+
+    def test_refresh_token_spent_on_another_worker_is_refused(self, client, create_user):
+        from app.middleware.auth import denylist
+        from app.models import RevokedToken
+        tokens = self._login(client, create_user)
+        old_refresh = {'Authorization': f"Bearer {tokens['refresh_token']}"}
+        assert client.post('/api/auth/refresh', headers=old_refresh).status_code == 200
+
+        # A worker that has not synced the revocation yet
+        denylist.reset()
+        response = client.post('/api/auth/refresh', headers=old_refresh)
+
+        assert response.status_code == 401
+        assert 'access_token' not in response.get_json()
+        assert RevokedToken.query.count() == 1
+
+    def test_access_token_cannot_refresh(self, client, create_user):
+        tokens = self._login(client, create_user)
+        response = client.post('/api/auth/refresh', headers={'Authorization': f"Bearer {tokens['access_token']}"})
+        assert response.status_code == 422
+
+    def test_logout_revokes_access_and_refresh_tokens(self, client, create_user):
+        tokens = self._login(client, create_user)
+        access = {'Authorization': f"Bearer {tokens['access_token']}"}
+
+        response = client.post('/api/auth/logout', headers=access, json={'refresh_token': tokens['refresh_token']})
+        assert response.status_code == 200
+
+        assert client.get('/api/auth/me', headers=access).status_code == 401
+        refresh = {'Authorization': f"Bearer {tokens['refresh_token']}"}
+        assert client.post('/api/auth/refresh', headers=refresh).status_code == 401
+
+    def test_revocation_check_does_not_query_database(self, client, create_user, db_session):
+        from sqlalchemy import event
+        tokens = self._login(client, create_user)
+        headers = {'Authorization': f"Bearer {tokens['access_token']}"}
+        client.get('/api/auth/me', headers=headers)  # warm the user cache and sync
+
+        statements = []
+        def record(conn, cursor, statement, *args):
+            statements.append(statement)
+        event.listen(db_session.engine, 'before_cursor_execute', record)
+        try:
+            assert client.get('/api/auth/me', headers=headers).status_code == 200
+        finally:
+            event.remove(db_session.engine, 'before_cursor_execute', record)
+        assert statements == []
+
+    def test_tokens_revoked_by_other_workers_are_synced(self, client, create_user, db_session):
+        from datetime import datetime, timedelta
+        from flask_jwt_extended import decode_token
+        from app.middleware.auth import denylist
+        from app.models import RevokedToken
+        tokens = self._login(client, create_user)
+        headers = {'Authorization': f"Bearer {tokens['access_token']}"}
+        assert client.get('/api/auth/me', headers=headers).status_code == 200
+
+        # Another worker revoked the token: only the table knows
+        db_session.session.add(RevokedToken(
+            jti=decode_token(tokens['access_token'])['jti'],
+            expires_at=datetime.utcnow() + timedelta(minutes=15)
+        ))
+        db_session.session.commit()
+        denylist.sync()
+
+        assert client.get('/api/auth/me', headers=headers).status_code == 401
+
+    def test_sync_picks_up_revocations_that_commit_late(self, db_session):
+        from datetime import datetime, timedelta
+        from app.middleware.auth import denylist
+        from app.models import RevokedToken
+        expires = datetime.utcnow() + timedelta(minutes=15)
+        db_session.session.add(RevokedToken(id=10, jti='committed-first', expires_at=expires))
+        db_session.session.commit()
+        denylist.sync()
+        assert 'committed-first' in denylist.tokens
+
+        # Inserted (id and created_at) before the row above, committed after it
+        db_session.session.add(RevokedToken(id=5, jti='committed-late', expires_at=expires,
+                                            created_at=datetime.utcnow() - timedelta(seconds=2)))
+        db_session.session.commit()
+        denylist.sync()
+        assert 'committed-late' in denylist.tokens
+
+    def test_denylist_is_synced_in_the_background(self, client, create_user, db_session, test_app):
+        from datetime import datetime, timedelta
+        from flask_jwt_extended import decode_token
+        from app.middleware.auth import denylist, start_denylist_sync
+        from app.models import RevokedToken
+        tokens = self._login(client, create_user)
+        headers = {'Authorization': f"Bearer {tokens['access_token']}"}
+        denylist.reset()
+        db_session.session.add(RevokedToken(
+            jti=decode_token(tokens['access_token'])['jti'],
+            expires_at=datetime.utcnow() + timedelta(minutes=15)
+        ))
+        db_session.session.commit()
+
+        # Requests only look at memory, however long since the last sync
+        assert client.get('/api/auth/me', headers=headers).status_code == 200
+
+        # The job syncs once before the worker serves requests
+        job = start_denylist_sync(test_app)
+        try:
+            assert job.name == 'token-denylist-sync' and job.is_alive()
+            assert client.get('/api/auth/me', headers=headers).status_code == 401
+        finally:
+            job.stop()
+            job.join()
+
+    def test_denylist_sync_disabled_with_zero_interval(self, test_app):
+        from app.middleware.auth import start_denylist_sync
+        interval = test_app.config['TOKEN_DENYLIST_SYNC_SECONDS']
+        test_app.config['TOKEN_DENYLIST_SYNC_SECONDS'] = 0
+        try:
+            assert start_denylist_sync(test_app) is None
+        finally:
+            test_app.config['TOKEN_DENYLIST_SYNC_SECONDS'] = interval
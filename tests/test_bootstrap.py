@@ -0,0 +1,120 @@
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from app import create_app
+from app.models import User
+
+
+def test_create_app_does_no_database_io(test_app):
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(Engine, 'before_cursor_execute', record)
+    try:
+        create_app('default')
+    finally:
+        event.remove(Engine, 'before_cursor_execute', record)
+
+    assert statements == []
+
+
+def test_bootstrap_command_seeds_default_users_once(test_app):
+    runner = test_app.test_cli_runner()
+
+    result = runner.invoke(args=['bootstrap-db'])
+    assert result.exit_code == 0
+    assert 'User created: admin@example.com' in result.output
+    assert User.query.filter_by(email='admin@example.com').one().role == 'admin'
+    assert User.query.filter_by(email='user@example.com').one().role == 'user'
+
+    result = runner.invoke(args=['bootstrap-db'])
+    assert result.exit_code == 0
+    assert 'User created' not in result.output
+    assert User.query.count() == 2
+
+
+def test_bootstrap_command_without_seed(test_app):
+    result = test_app.test_cli_runner().invoke(args=['bootstrap-db', '--no-seed'])
+    assert result.exit_code == 0
+    assert User.query.count() == 0
+
+
+def test_bootstrap_adds_new_columns_to_existing_tables(test_app):
+    from sqlalchemy import inspect, text
+    from app import db
+
+    db.session.execute(text('ALTER TABLE users DROP COLUMN token_version'))
+    db.session.commit()
+
+    result = test_app.test_cli_runner().invoke(args=['bootstrap-db', '--no-seed'])
+    assert result.exit_code == 0
+    assert 'Column added: users.token_version' in result.output
+    assert 'token_version' in {c['name'] for c in inspect(db.engine).get_columns('users')}
+
+
+def test_bootstrap_adds_new_indexes_to_existing_tables(test_app):
+    from sqlalchemy import inspect, text
+    from app import db
+
+    db.session.execute(text('DROP INDEX ix_members_created_at_id'))
+    db.session.commit()
+
+    result = test_app.test_cli_runner().invoke(args=['bootstrap-db', '--no-seed'])
+    assert result.exit_code == 0
+    assert 'Index added: ix_members_created_at_id' in result.output
+    assert 'ix_members_created_at_id' in {i['name'] for i in inspect(db.engine).get_indexes('members')}
+
+
+def test_bootstrap_backfills_check_in_dates_before_unique_index(test_app, create_member):
+    from datetime import datetime
+    from sqlalchemy import inspect, text
+    from app import db
+    from app.models import Attendance
+
+    member = create_member()
+    first = Attendance(member_id=member.id, check_in_time=datetime(2024, 3, 1, 8))
+    duplicate = Attendance(member_id=member.id, check_in_time=datetime(2024, 3, 1, 18))
+    next_day = Attendance(member_id=member.id, check_in_time=datetime(2024, 3, 2, 8))
+    db.session.execute(text('DROP INDEX uq_attendances_member_date'))
+    db.session.add_all([first, duplicate, next_day])
+    db.session.commit()
+    # As if the rows were written before check_in_date existed
+    db.session.execute(text('UPDATE attendances SET check_in_date = NULL'))
+    db.session.commit()
+
+    result = test_app.test_cli_runner().invoke(args=['bootstrap-db', '--no-seed'])
+
+    assert result.exit_code == 0
+    assert 'Index added: uq_attendances_member_date' in result.output
+    dates = dict(db.session.query(Attendance.id, Attendance.check_in_date))
+    assert str(dates[first.id]) == '2024-03-01'
+    assert dates[duplicate.id] is None
+    assert str(dates[next_day.id]) == '2024-03-02'
+    assert 'uq_attendances_member_date' in {i['name'] for i in inspect(db.engine).get_indexes('attendances')}
+
+
+def test_bootstrap_installs_and_fills_attendance_rollups(test_app, create_member):
+    from datetime import datetime
+    from sqlalchemy import text
+    from app import db
+    from app.models import Attendance, AttendanceDaily, AttendanceHourly
+
+    member = create_member()
+    db.session.add(Attendance(member_id=member.id, check_in_time=datetime(2024, 3, 1, 8, 30)))
+    db.session.commit()
+    # A database from before the rollups existed
+    for trigger in ('ai', 'ad', 'au'):
+        db.session.execute(text(f'DROP TRIGGER attendance_rollups_{trigger}'))
+    db.session.execute(text('DROP TABLE attendance_daily'))
+    db.session.execute(text('DROP TABLE attendance_hourly'))
+    db.session.commit()
+
+    result = test_app.test_cli_runner().invoke(args=['bootstrap-db', '--no-seed'])
+
+    assert result.exit_code == 0
+    assert db.session.query(AttendanceDaily.checkins).scalar() == 1
+    assert db.session.query(AttendanceHourly.hour).scalar() == datetime(2024, 3, 1, 8)
+    db.session.add(Attendance(member_id=member.id, check_in_time=datetime(2024, 3, 2, 9)))
+    db.session.commit()
+    assert db.session.query(AttendanceDaily).count() == 2
@@ -0,0 +1,93 @@
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import event
+from app.check_ins import checked_in_today, member_statuses
+from app.models import Attendance
+
+
+@pytest.fixture(autouse=True)
+def reset_caches():
+    checked_in_today.reset()
+    member_statuses.clear()
+    yield
+    checked_in_today.reset()
+    member_statuses.clear()
+
+
+def check_in(client, headers, member_id):
+    return client.post('/api/attendance/checkin', json={'member_id': member_id}, headers=headers)
+
+
+def statements_during(engine, fn):
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+    event.listen(engine, 'before_cursor_execute', record)
+    try:
+        result = fn()
+    finally:
+        event.remove(engine, 'before_cursor_execute', record)
+    return result, statements
+
+
+def test_repeated_taps_are_refused_without_queries(client, create_member, db_session, login):
+    headers = login()[1]
+    member = create_member()
+    expired = create_member(membership_status='expired')
+    member_id, expired_id = member.id, expired.id
+
+    assert check_in(client, headers, member_id).status_code == 200
+    assert check_in(client, headers, expired_id).status_code == 400
+    assert check_in(client, headers, 'no-such-member').status_code == 404
+
+    for target, status, message in ((member_id, 400, 'Already checked in today'),
+                                    (expired_id, 400, 'Cannot check in. Membership status: expired'),
+                                    ('no-such-member', 404, 'Member not found')):
+        response, statements = statements_during(db_session.engine, lambda: check_in(client, headers, target))
+        assert response.status_code == status
+        assert response.get_json()['message'] == message
+        assert statements == []
+
+
+def test_other_workers_check_ins_are_loaded_from_the_database(client, create_member, db_session, login):
+    headers = login()[1]
+    member = create_member()
+    # Checked in by another worker: not in this worker's set until it syncs
+    db_session.session.add(Attendance(member_id=member.id))
+    db_session.session.commit()
+    member_id = member.id
+
+    assert check_in(client, headers, member_id).get_json()['message'] == 'Already checked in today'
+    response, statements = statements_during(db_session.engine, lambda: check_in(client, headers, member_id))
+    assert response.status_code == 400
+    assert statements == []
+
+
+def test_set_is_rebuilt_at_day_rollover(client, create_member, db_session, login):
+    headers = login()[1]
+    member = create_member()
+    member_id = member.id
+    yesterday = datetime.utcnow().date() - timedelta(days=1)
+    checked_in_today.reset()
+    checked_in_today._snapshot = (yesterday, {member_id})
+
+    assert member_id not in checked_in_today
+    assert checked_in_today.stats()['day'] == datetime.utcnow().date().isoformat()
+    assert check_in(client, headers, member_id).status_code == 200
+
+
+def test_writes_in_this_worker_update_the_caches(client, create_member, db_session, login):
+    headers = login('admin')[1]
+    member = create_member(membership_status='suspended')
+    member_id = member.id
+
+    assert check_in(client, headers, member_id).status_code == 400
+    client.put(f'/api/members/{member_id}', json={'membershipStatus': 'active'}, headers=headers)
+    checked_in = check_in(client, headers, member_id)
+    assert checked_in.status_code == 200
+
+    # Deleting today's check-in lets the member check in again
+    attendance_id = checked_in.get_json()['data']['id']
+    client.delete(f'/api/attendance/delete/{attendance_id}', headers=headers)
+    assert check_in(client, headers, member_id).status_code == 200
@@ -0,0 +1,97 @@
+from app.models import Member, Workout
+
+
+def revalidate(client, url, headers, etag):
+    return client.get(url, headers={**headers, 'If-None-Match': etag})
+
+
+def test_member_etag_and_304_skip_serialization(client, create_member, db_session, monkeypatch, login):
+    _, headers = login('admin')
+    member = create_member(name='Etag Person', email='etag@example.com')
+    url = f'/api/members/{member.id}'
+
+    first = client.get(url, headers=headers)
+    etag = first.headers['ETag']
+    assert first.status_code == 200
+    assert not etag.startswith('W/')
+    assert first.headers['Last-Modified']
+    assert first.headers['Cache-Control'] == 'private, no-cache'
+
+    def fail(self):
+        raise AssertionError('to_dict called for a 304')
+    with monkeypatch.context() as patch:
+        patch.setattr(Member, 'to_dict', fail)
+        cached = revalidate(client, url, headers, etag)
+        assert cached.status_code == 304
+        assert cached.data == b''
+        assert cached.headers['ETag'] == etag
+        since = client.get(url, headers={**headers, 'If-Modified-Since': first.headers['Last-Modified']})
+        assert since.status_code == 304
+
+    client.put(url, json={'name': 'Renamed'}, headers=headers)
+    changed = revalidate(client, url, headers, etag)
+    assert changed.status_code == 200
+    assert changed.headers['ETag'] != etag
+    assert changed.get_json()['name'] == 'Renamed'
+
+
+def test_workout_etag_follows_embedded_member(client, create_member, db_session, login):
+    user, headers = login('admin')
+    member = create_member(name='Lifter', email='lifter@example.com')
+    workout = Workout(user_id=user.id, member_id=member.id, type='Cardio', duration=30)
+    db_session.session.add(workout)
+    db_session.session.commit()
+    url = f'/api/workouts/{workout.id}'
+
+    etag = client.get(url, headers=headers).headers['ETag']
+    assert revalidate(client, url, headers, etag).status_code == 304
+
+    client.put(f'/api/members/{member.id}', json={'name': 'Renamed Lifter'}, headers=headers)
+    assert revalidate(client, url, headers, etag).status_code == 200
+
+
+def test_workout_types_etag(client, login):
+    _, headers = login()
+    first = client.get('/api/workouts/types', headers=headers)
+    assert first.status_code == 200
+    assert revalidate(client, '/api/workouts/types', headers, first.headers['ETag']).status_code == 304
+
+
+def test_report_version_changes_with_data(client, create_member, login):
+    _, headers = login('admin')
+    create_member()
+    for url in ('/api/reports/revenue', '/api/reports/export/members'):
+        etag = client.get(url, headers=headers).headers['ETag']
+        assert revalidate(client, url, headers, etag).status_code == 304
+
+        create_member()
+        assert revalidate(client, url, headers, etag).status_code == 200
+
+
+def test_attendance_export(client, create_member, db_session, login):
+    from app.models import Attendance
+    _, headers = login('admin')
+    member = create_member(name='Ann Export')
+    db_session.session.add(Attendance(member_id=member.id))
+    db_session.session.commit()
+    url = '/api/reports/export/attendance'
+
+    response = client.get(url, headers=headers)
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data['count'] == 1
+    assert (data['data'][0]['memberId'], data['data'][0]['memberName']) == (member.id, 'Ann Export')
+    assert revalidate(client, url, headers, response.headers['ETag']).status_code == 304
+
+    csv = client.get(f'{url}?format=csv', headers=headers)
+    assert csv.status_code == 200 and csv.mimetype == 'text/csv'
+    assert 'memberName' in csv.get_data(as_text=True).splitlines()[0]
+    assert 'Ann Export' in csv.get_data(as_text=True)
+
+
+def test_errors_carry_no_validators(client, login):
+    _, headers = login('admin')
+    missing = client.get('/api/members/does-not-exist', headers=headers)
+    assert missing.status_code == 404
+    assert 'ETag' not in missing.headers
+    assert client.get('/api/reports/export/bogus', headers=headers).status_code == 400
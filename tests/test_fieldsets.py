@@ -0,0 +1,110 @@
+from contextlib import contextmanager
+from datetime import datetime
+import sqlalchemy as sa
+from app import db
+from app.fieldsets import dump
+from app.models import Attendance, Member, MemberRequest, Workout
+
+
+@contextmanager
+def captured_selects():
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith('SELECT'):
+            statements.append(statement)
+
+    sa.event.listen(db.engine, 'before_cursor_execute', record)
+    try:
+        yield statements
+    finally:
+        sa.event.remove(db.engine, 'before_cursor_execute', record)
+
+
+def test_dump_with_every_field_matches_to_dict(create_user, create_member, db_session):
+    user = create_user()
+    member = create_member(user_id=user.id)
+    workout = Workout(user_id=user.id, member_id=member.id, type='Cardio', duration=30,
+                      exercises=[{'name': 'Row'}], date=datetime(2024, 1, 1))
+    attendance = Attendance(member_id=member.id, user_id=user.id)
+    request = MemberRequest(name='Req', email='req@example.com', phone='555-0100', plan='basic')
+    db_session.session.add_all([workout, attendance, request])
+    db_session.session.commit()
+
+    for obj in (member, workout, attendance, request):
+        fields = list(obj.to_dict())
+        assert set(fields) == set(obj.API_FIELDS) | set(getattr(obj, 'API_RELATIONS', {}))
+        assert dump(obj, fields) == obj.to_dict()
+
+
+def test_members_fields_limit_keys_and_selected_columns(client, create_member, db_session, login):
+    _, headers = login('admin')
+    create_member(name='Alice', email='alice@example.com').notes = 'secret notes'
+    db_session.session.commit()
+
+    with captured_selects() as statements:
+        resp = client.get('/api/members?fields=name,email', headers=headers)
+
+    assert resp.status_code == 200
+    assert resp.get_json()['members'] == [{'name': 'Alice', 'email': 'alice@example.com'}]
+    page_query = next(s for s in statements if 'FROM members' in s and 'count(' not in s.lower())
+    assert 'members.notes' not in page_query
+    assert 'members.emergency_contact_name' not in page_query
+
+
+def test_members_fields_in_cursor_mode(client, create_member, login):
+    _, headers = login('admin')
+    for i in range(3):
+        create_member(name=f'Member {i}', email=f'm{i}@example.com')
+
+    data = client.get('/api/members?fields=id&limit=2&cursor=', headers=headers).get_json()
+    assert all(set(m) == {'id'} for m in data['members'])
+    resp = client.get(f"/api/members?fields=id&limit=2&cursor={data['pagination']['nextCursor']}",
+                      headers=headers)
+    assert len(resp.get_json()['members']) == 1
+
+
+def test_workout_relation_field_is_joined(client, create_member, db_session, login):
+    user, headers = login()
+    member = create_member(name='Bob', email='bob@example.com')
+    db_session.session.add(Workout(user_id=user.id, member_id=member.id, type='Cardio', duration=30))
+    db_session.session.commit()
+
+    with captured_selects() as statements:
+        data = client.get('/api/workouts?fields=type,member', headers=headers).get_json()
+
+    assert data['workouts'][0]['type'] == 'Cardio'
+    assert data['workouts'][0]['member']['name'] == 'Bob'
+    # The member comes from the page query's join, not one query per workout
+    assert not any(s.lstrip().startswith('SELECT members.') for s in statements)
+
+
+def test_attendance_today_and_history_fields(client, create_member, db_session, login):
+    user, headers = login('admin')
+    member = create_member(name='Carol', email='carol@example.com')
+    db_session.session.add(Attendance(member_id=member.id, user_id=user.id))
+    db_session.session.commit()
+
+    today = client.get('/api/attendance/today?fields=memberName', headers=headers).get_json()
+    assert today['attendances'] == [{'memberName': 'Carol'}]
+
+    history = client.get(f'/api/attendance/history/{member.id}?fields=id,checkInTime', headers=headers).get_json()
+    assert set(history['history'][0]) == {'id', 'checkInTime'}
+
+
+def test_member_requests_fields(client, db_session, login):
+    _, headers = login('admin')
+    db_session.session.add(MemberRequest(name='Req', email='req@example.com', phone='555-0100', plan='basic'))
+    db_session.session.commit()
+
+    data = client.get('/api/member-requests?fields=email,status', headers=headers).get_json()
+    assert data == [{'email': 'req@example.com', 'status': 'pending'}]
+
+
+def test_unknown_field_is_rejected(client, login):
+    _, headers = login('admin')
+    resp = client.get('/api/members?fields=name,password', headers=headers)
+    assert resp.status_code == 400
+    assert 'password' in resp.get_json()['message']
+    assert client.get('/api/workouts?fields=bogus', headers=headers).status_code == 400
+    assert client.get('/api/attendance/today?fields=bogus', headers=headers).status_code == 400
@@ -0,0 +1,94 @@
+import os
+from app.config.settings import engine_options
+
+
+def test_engine_options_for_postgres(monkeypatch):
+    monkeypatch.setenv('DB_POOL_SIZE', '3')
+    monkeypatch.setenv('DB_STATEMENT_TIMEOUT_MS', '1500')
+    options = engine_options('postgresql://u:p@localhost/gym_flow')
+    assert options['pool_size'] == 3
+    assert options['pool_pre_ping'] is True
+    assert options['connect_args'] == {'options': '-c statement_timeout=1500'}
+
+
+def test_engine_options_for_sqlite_skip_pool_sizing():
+    options = engine_options('sqlite:///:memory:', statement_timeout_ms=1000)
+    assert 'pool_size' not in options
+    assert 'connect_args' not in options
+
+
+def test_db_pool_stats_for_admin(client, login):
+    headers = login('admin')[1]
+    resp = client.get('/api/internal/db-pool', headers=headers)
+    assert resp.status_code == 200
+    data = resp.get_json()
+    assert data['pid'] == os.getpid()
+    assert 'status' in data['engines']['default']
+
+
+def test_db_pool_stats_requires_admin(client, login):
+    headers = login()[1]
+    resp = client.get('/api/internal/db-pool', headers=headers)
+    assert resp.status_code == 403
+
+
+def test_current_user_cache_hits_and_invalidation(client, create_user, db_session):
+    from app.middleware.auth import user_cache
+    user = create_user(email='cached@example.com', password='password123')
+    resp = client.post('/api/auth/login', json={'email': 'cached@example.com', 'password': 'password123'})
+    headers = {'Authorization': f"Bearer {resp.get_json()['access_token']}"}
+
+    client.get('/api/auth/me', headers=headers)
+    hits = user_cache.hits
+    assert client.get('/api/auth/me', headers=headers).get_json()['name'] == 'Test User'
+    assert user_cache.hits == hits + 1
+
+    user.name = 'Renamed'
+    db_session.session.commit()
+    assert client.get('/api/auth/me', headers=headers).get_json()['name'] == 'Renamed'
+
+
+def test_current_user_is_evicted_when_the_change_commits(create_user, db_session):
+    from app.middleware.auth import resolve_user, user_cache
+    user = create_user(email='cached@example.com')
+    stale = resolve_user(user.id)
+    assert stale.role == 'user'
+
+    user.role = 'admin'
+    db_session.session.flush()
+    # Another request re-caches the committed row between flush and commit
+    user_cache.invalidate(user.id)
+    user_cache.get_or_load(user.id, lambda: stale)
+    db_session.session.commit()
+    assert resolve_user(user.id).role == 'admin'
+
+    # A rolled back change has nothing to evict
+    user.name = 'Renamed'
+    db_session.session.flush()
+    db_session.session.rollback()
+    assert resolve_user(user.id).name == 'Test User'
+
+
+def test_cache_stats_for_admin(client, login):
+    headers = login('admin')[1]
+    client.get('/api/internal/cache-stats', headers=headers)
+    resp = client.get('/api/internal/cache-stats', headers=headers)
+    assert resp.status_code == 200
+    stats = resp.get_json()['caches']['currentUser']
+    assert stats['hits'] >= 1
+    assert {'size', 'maxsize', 'ttl', 'misses'} <= set(stats)
+
+
+def test_expiring_set_drops_whole_buckets():
+    from app.cache import ExpiringSet
+    now = [1000.0]
+    tokens = ExpiringSet(bucket_seconds=60, clock=lambda: now[0])
+    tokens.add('a', 1010)
+    tokens.add('b', 1100)
+    tokens.add('expired', 900)
+    assert 'a' in tokens and 'b' in tokens and 'expired' not in tokens
+
+    now[0] = 1081  # past a's bucket (1020-1080), within b's
+    assert 'a' not in tokens
+    assert 'b' in tokens
+    assert len(tokens) == 1
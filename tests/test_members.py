@@ -170,6 +170,45 @@ class TestMemberCRUD:
         data = response.get_json()
         assert 'attendanceCount' in data or 'total_attendance' in data or 'totalAttendance' in data
 
+    def test_member_stats_query_budget(self, client, create_user, create_member, db_session):
+        """Stats cost a fixed number of queries however many rows are shown."""
+        from datetime import datetime, timedelta
+        from sqlalchemy import event
+        from app.models import Attendance, Workout
+        member = create_member(name='Busy Member', email='busy@example.com')
+        user = create_user(email='user@example.com', password='password123')
+        start = datetime(2024, 1, 1)
+        for i in range(7):
+            db_session.session.add(Attendance(member_id=member.id, user_id=user.id,
+                                              check_in_time=start + timedelta(days=i)))
+            db_session.session.add(Workout(user_id=user.id, member_id=member.id, type='Cardio',
+                                           duration=30, date=start + timedelta(days=i)))
+        db_session.session.commit()
+        member_id = member.id
+        login = client.post('/api/auth/login', json={'email': 'user@example.com', 'password': 'password123'})
+        headers = {'Authorization': f"Bearer {login.get_json()['access_token']}"}
+        url = f'/api/members/{member_id}/stats'
+        client.get(url, headers=headers)  # warm per-worker auth caches
+        # Start from an empty identity map, like a fresh request
+        db_session.session.remove()
+
+        statements = []
+        def record(conn, cursor, statement, *args):
+            statements.append(statement)
+        event.listen(db_session.engine, 'before_cursor_execute', record)
+        try:
+            response = client.get(url, headers=headers)
+        finally:
+            event.remove(db_session.engine, 'before_cursor_execute', record)
+
+        data = response.get_json()
+        assert (data['totalAttendance'], data['totalWorkouts']) == (7, 7)
+        assert len(data['recentAttendance']) == len(data['recentWorkouts']) == 5
+        assert data['recentAttendance'][0]['memberName'] == 'Busy Member'
+        assert data['recentWorkouts'][0]['member']['id'] == member_id
+        # member + totals, recent check-ins, recent workouts
+        assert len(statements) <= 3, statements
+
 
 class TestMembershipStatus:
     """Test membership status and validation."""
@@ -222,3 +261,118 @@ class TestMembershipStatus:
                 headers={'Authorization': f'Bearer {token}'}
             )
             assert response.status_code == 201
+
+
+class TestMemberSearch:
+    """Test indexed, ranked member search."""
+
+    def _search(self, client, headers, term):
+        response = client.get(f'/api/members?search={term}', headers=headers)
+        assert response.status_code == 200
+        return [m['email'] for m in response.get_json()['members']]
+
+    def test_search_matches_substrings_of_name_and_email(self, client, create_member, admin_headers):
+        headers = admin_headers
+        create_member(name='Jonathan Smith', email='jsmith@example.com')
+        create_member(name='Ann Lee', email='ann.johnson@example.com')
+        create_member(name='Bob Stone', email='bob@example.com')
+
+        assert sorted(self._search(client, headers, 'john')) == ['ann.johnson@example.com']
+        assert sorted(self._search(client, headers, 'OHN')) == ['ann.johnson@example.com']
+        assert sorted(self._search(client, headers, 'nath')) == ['jsmith@example.com']
+        # Shorter than a trigram: falls back to ILIKE
+        assert sorted(self._search(client, headers, 'St')) == ['bob@example.com']
+
+    def test_search_index_follows_updates_and_deletes(self, client, create_member, db_session, admin_headers):
+        headers = admin_headers
+        member = create_member(name='Carla Diaz', email='carla@example.com')
+        gone = create_member(name='Carlos Ruiz', email='carlos@example.com')
+        assert sorted(self._search(client, headers, 'carl')) == ['carla@example.com', 'carlos@example.com']
+
+        member.name = 'Maria Diaz'
+        member.email = 'maria@example.com'
+        db_session.session.delete(gone)
+        db_session.session.commit()
+
+        assert self._search(client, headers, 'carl') == []
+        assert self._search(client, headers, 'mari') == ['maria@example.com']
+
+    def test_search_ranks_closer_matches_first(self, client, create_member, admin_headers):
+        headers = admin_headers
+        create_member(name='Sam Patterson', email='sam.patterson.long.address@example.com')
+        create_member(name='Pat', email='pat@example.com')
+
+        assert self._search(client, headers, 'pat')[0] == 'pat@example.com'
+
+    def test_bootstrap_builds_index_for_existing_members(self, db_session, create_member):
+        from sqlalchemy import text
+        from app.bootstrap import create_schema
+        create_member(name='Existing Person', email='existing@example.com')
+        db_session.session.execute(text('DROP TABLE members_fts'))
+        db_session.session.commit()
+
+        create_schema()
+
+        rows = db_session.session.execute(
+            text("SELECT count(*) FROM members_fts WHERE members_fts MATCH '\"xisting\"'")
+        ).scalar()
+        assert rows == 1
+
+
+class TestBulkUpsert:
+    """Test POST /api/members/bulk."""
+
+    def test_json_upsert_creates_updates_and_reports_errors(self, client, create_member, db_session,
+                                                            test_app, admin_headers):
+        headers = admin_headers
+        existing = create_member(name='Old Name', email='old@example.com')
+        existing.phone = '555-0000'
+        db_session.session.commit()
+        rows = [
+            {'name': 'New One', 'email': 'new1@example.com', 'membershipType': 'vip'},
+            {'email': 'old@example.com', 'name': 'Renamed'},
+            {'email': 'nobody@example.com'},
+            {'name': 'Bad', 'email': 'bad@example.com', 'membershipType': 'gold'},
+            {'name': 'Again', 'email': 'new1@example.com'},
+            {'name': 'New Two', 'email': 'new2@example.com', 'membershipEndDate': '2025-12-31'},
+        ]
+        test_app.config['MEMBER_BULK_CHUNK_SIZE'] = 2
+        try:
+            response = client.post('/api/members/bulk', json=rows, headers=headers)
+        finally:
+            test_app.config['MEMBER_BULK_CHUNK_SIZE'] = 1000
+
+        assert response.status_code == 200
+        data = response.get_json()
+        assert (data['processed'], data['created'], data['updated'], data['failed']) == (6, 2, 1, 3)
+        assert [(r['row'], r['status']) for r in data['results']] == [
+            (1, 'created'), (2, 'updated'), (3, 'error'), (4, 'error'), (5, 'error'), (6, 'created')
+        ]
+        assert data['results'][1]['id'] == existing.id
+        assert data['results'][2]['message'] == 'Name is required for new members'
+        assert data['results'][4]['message'] == 'Duplicate email in request'
+
+        old = Member.query.filter_by(email='old@example.com').one()
+        assert old.name == 'Renamed'
+        assert old.phone == '555-0000'  # not in the row, so unchanged
+        new = Member.query.filter_by(email='new1@example.com').one()
+        assert (new.membership_type, new.membership_status) == ('vip', 'active')
+        assert Member.query.filter_by(email='new2@example.com').one().membership_end_date.year == 2025
+
+    def test_csv_upsert_keeps_search_index_in_sync(self, client, create_member, admin_headers):
+        headers = admin_headers
+        create_member(name='Zed Before', email='zed@example.com')
+        body = 'name,email,phone\nZed Renamed,zed@example.com,\nYara Quill,yara@example.com,555-0101\n'
+
+        response = client.post('/api/members/bulk', data=body, headers=headers, content_type='text/csv')
+
+        assert [r['status'] for r in response.get_json()['results']] == ['updated', 'created']
+        assert Member.query.filter_by(email='yara@example.com').one().phone == '555-0101'
+        found = client.get('/api/members?search=renamed', headers=headers).get_json()['members']
+        assert [m['email'] for m in found] == ['zed@example.com']
+
+    def test_bulk_rejects_bad_bodies(self, client, admin_headers):
+        headers = admin_headers
+        assert client.post('/api/members/bulk', json={'name': 'x'}, headers=headers).status_code == 400
+        assert client.post('/api/members/bulk', data='x', headers=headers,
+                           content_type='text/plain').status_code == 415
@@ -0,0 +1,74 @@
+from datetime import datetime, timedelta
+from sqlalchemy import event
+from app.memberships import expire_memberships, expiring_soon
+from app.models import Member, MembershipTransition
+
+
+def test_expire_memberships_in_chunks_records_transitions(db_session, create_member):
+    now = datetime.utcnow()
+    overdue = [create_member(email=f'late{i}@example.com', membership_end_date=now - timedelta(days=i + 1))
+               for i in range(5)]
+    create_member(email='current@example.com', membership_end_date=now + timedelta(days=3))
+    create_member(email='suspended@example.com', membership_end_date=now - timedelta(days=1),
+                  membership_status='suspended')
+
+    assert expire_memberships(now, chunk_size=2) == 5
+    assert expire_memberships(now, chunk_size=2) == 0
+
+    statuses = dict(db_session.session.query(Member.email, Member.membership_status))
+    assert all(statuses[m.email] == 'expired' for m in overdue)
+    assert statuses['current@example.com'] == 'active'
+    assert statuses['suspended@example.com'] == 'suspended'
+    transitions = MembershipTransition.query.all()
+    assert sorted(t.member_id for t in transitions) == sorted(m.id for m in overdue)
+    assert {(t.from_status, t.to_status, t.reason) for t in transitions} == {
+        ('active', 'expired', 'membership_end_date')
+    }
+
+
+def test_rows_expired_by_another_worker_are_not_recorded_twice(db_session, create_member):
+    now = datetime.utcnow()
+    create_member(email='race@example.com', membership_end_date=now - timedelta(days=1))
+
+    def other_worker(conn, cursor, statement, parameters, context, executemany):
+        # Another worker expires the row between our SELECT and UPDATE
+        if statement.startswith('UPDATE members'):
+            cursor.execute("UPDATE members SET membership_status = 'expired'")
+
+    event.listen(db_session.engine, 'before_cursor_execute', other_worker)
+    try:
+        assert expire_memberships(now) == 0
+    finally:
+        event.remove(db_session.engine, 'before_cursor_execute', other_worker)
+    assert MembershipTransition.query.count() == 0
+
+
+def test_expiring_list_is_cached_and_invalidated(client, db_session, admin_headers, create_member):
+    headers = admin_headers
+    expiring_soon.invalidate()
+    now = datetime.utcnow()
+    soon = create_member(email='soon@example.com', membership_end_date=now + timedelta(days=3))
+    create_member(email='later@example.com', membership_end_date=now + timedelta(days=10))
+    create_member(email='far@example.com', membership_end_date=now + timedelta(days=60))
+    create_member(email='gone@example.com', membership_end_date=now - timedelta(days=1))
+
+    week = client.get('/api/members/expiring?days=7', headers=headers).get_json()
+    assert [m['email'] for m in week['members']] == ['soon@example.com']
+    hits = expiring_soon.hits
+    fortnight = client.get('/api/members/expiring?days=14', headers=headers).get_json()
+    assert [m['email'] for m in fortnight['members']] == ['soon@example.com', 'later@example.com']
+    assert expiring_soon.hits == hits + 1
+
+    # Changing a member through the API drops this worker's snapshot
+    client.put(f'/api/members/{soon.id}', json={'membershipStatus': 'suspended'}, headers=headers)
+    assert client.get('/api/members/expiring?days=7', headers=headers).get_json()['total'] == 0
+    assert client.get('/api/members/expiring?days=0', headers=headers).status_code == 400
+
+
+def test_expire_memberships_command(test_app, db_session, create_member):
+    create_member(email='cli@example.com', membership_end_date=datetime.utcnow() - timedelta(days=1))
+
+    result = test_app.test_cli_runner().invoke(args=['expire-memberships'])
+
+    assert result.exit_code == 0
+    assert '1 memberships expired' in result.output
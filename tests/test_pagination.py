@@ -0,0 +1,155 @@
+from datetime import datetime, timedelta
+from app.models import Attendance, Member, Workout
+from app.pagination import InvalidCursor, decode_cursor, encode_cursor
+import pytest
+
+
+def walk(client, url, headers, key, cursor_path=('pagination', 'nextCursor')):
+    """Follow cursors from the first page to the last; returns the pages."""
+    pages = []
+    cursor = ''
+    while cursor is not None:
+        sep = '&' if '?' in url else '?'
+        resp = client.get(f'{url}{sep}cursor={cursor}', headers=headers)
+        assert resp.status_code == 200
+        data = resp.get_json()
+        pages.append(data[key])
+        for part in cursor_path:
+            data = data[part]
+        cursor = data
+    return pages
+
+
+def test_cursor_round_trip():
+    when = datetime(2024, 5, 1, 12, 30, 15, 123456)
+    cursor = encode_cursor([when, 'abc'])
+    assert decode_cursor(cursor, (Member.created_at, Member.id)) == [when, 'abc']
+    with pytest.raises(InvalidCursor):
+        decode_cursor('not-a-cursor', (Member.created_at, Member.id))
+
+
+def test_member_cursor_pages_are_stable_and_complete(client, db_session, login):
+    _, headers = login('admin')
+    same_time = datetime(2024, 1, 1)
+    # Duplicate timestamps: the id tiebreaker keeps the order total
+    for i in range(7):
+        db_session.session.add(Member(name=f'Member {i}', email=f'm{i}@example.com',
+                                      created_at=same_time if i < 4 else same_time + timedelta(days=i)))
+    db_session.session.commit()
+
+    pages = walk(client, '/api/members?limit=3', headers, 'members')
+
+    assert [len(page) for page in pages] == [3, 3, 1]
+    emails = [m['email'] for page in pages for m in page]
+    assert len(set(emails)) == 7
+    assert emails[:3] == ['m6@example.com', 'm5@example.com', 'm4@example.com']
+
+
+def test_member_cursor_with_search_and_invalid_cursor(client, create_member, login):
+    _, headers = login('admin')
+    for i in range(5):
+        create_member(name=f'Searchable {i}', email=f'searchable{i}@example.com')
+    create_member(name='Other', email='other@example.com')
+
+    pages = walk(client, '/api/members?search=searchable&limit=2', headers, 'members')
+    assert sum(len(page) for page in pages) == 5
+
+    assert client.get('/api/members?cursor=garbage', headers=headers).status_code == 400
+
+
+def test_page_mode_still_works(client, create_member, login):
+    _, headers = login('admin')
+    for i in range(3):
+        create_member()
+    data = client.get('/api/members?page=2&limit=2', headers=headers).get_json()
+    assert len(data['members']) == 1
+    assert data['pagination']['total'] == 3
+
+
+def test_workout_cursor_pages(client, db_session, login):
+    user, headers = login()
+    for i in range(5):
+        db_session.session.add(Workout(user_id=user.id, type='Cardio', duration=30,
+                                       date=datetime(2024, 1, 1) + timedelta(days=i)))
+    db_session.session.commit()
+
+    pages = walk(client, '/api/workouts?limit=2', headers, 'workouts')
+
+    dates = [w['date'] for page in pages for w in page]
+    assert len(dates) == 5
+    assert dates == sorted(dates, reverse=True)
+
+
+def test_workout_cursor_pages_include_undated_workouts(client, db_session, login):
+    user, headers = login()
+    for i in range(6):
+        db_session.session.add(Workout(user_id=user.id, type='Cardio', duration=30,
+                                       date=datetime(2024, 1, 1) + timedelta(days=i)))
+    db_session.session.commit()
+    # The column default fills in a None date on insert
+    db_session.session.query(Workout).filter(Workout.date >= datetime(2024, 1, 4)).update({'date': None})
+    db_session.session.commit()
+
+    pages = walk(client, '/api/workouts?limit=2', headers, 'workouts')
+
+    # Dated first, newest first; then the undated ones (a NULL-date cursor
+    # between pages 2 and 3)
+    assert [len(page) for page in pages] == [2, 2, 2]
+    workouts = [w for page in pages for w in page]
+    assert len({w['id'] for w in workouts}) == 6
+    assert [w['date'] is None for w in workouts] == [False] * 3 + [True] * 3
+    assert [w['date'] for w in workouts[:3]] == sorted((w['date'] for w in workouts[:3]), reverse=True)
+
+
+def test_attendance_history_cursor(client, create_member, db_session, login):
+    _, headers = login('admin')
+    member = create_member()
+    for i in range(5):
+        db_session.session.add(Attendance(member_id=member.id,
+                                          check_in_time=datetime(2024, 1, 1) + timedelta(days=i)))
+    db_session.session.commit()
+
+    pages = walk(client, f'/api/attendance/history/{member.id}?limit=2', headers, 'history',
+                 cursor_path=('nextCursor',))
+
+    assert [len(page) for page in pages] == [2, 2, 1]
+    # The first page without a cursor is unchanged
+    data = client.get(f'/api/attendance/history/{member.id}', headers=headers).get_json()
+    assert data['totalCheckins'] == 5 and data['nextCursor'] is None
+
+
+def test_total_kinds(client, create_member, login):
+    from app.pagination import count_cache
+    count_cache.clear()
+    _, headers = login('admin')
+    for i in range(3):
+        create_member()
+
+    exact = client.get('/api/members?limit=2', headers=headers).get_json()['pagination']
+    assert (exact['total'], exact['pages'], exact['totalKind']) == (3, 2, 'exact')
+
+    cached = client.get('/api/members?count=cached', headers=headers).get_json()['pagination']
+    assert (cached['total'], cached['totalKind']) == (3, 'cached')
+    create_member()
+    # Reused until the TTL expires; the same filters spelled differently share the entry
+    cached = client.get('/api/members?count=cached&status=all&search=', headers=headers).get_json()['pagination']
+    assert cached['total'] == 3
+    assert client.get('/api/members', headers=headers).get_json()['pagination']['total'] == 4
+
+    # No planner estimates on SQLite: falls back to the cached count
+    estimated = client.get('/api/members?count=estimated', headers=headers).get_json()['pagination']
+    assert estimated['totalKind'] == 'cached'
+
+    none = client.get('/api/members?count=none', headers=headers).get_json()['pagination']
+    assert none['total'] is None and none['totalKind'] == 'none'
+
+    assert client.get('/api/members?count=bogus', headers=headers).status_code == 400
+
+
+def test_cursor_mode_counts_only_on_request(client, create_member, login):
+    _, headers = login('admin')
+    create_member()
+    pagination = client.get('/api/members?cursor=', headers=headers).get_json()['pagination']
+    assert pagination['totalKind'] == 'none' and pagination['total'] is None
+    pagination = client.get('/api/members?cursor=&count=exact', headers=headers).get_json()['pagination']
+    assert pagination['total'] == 1
@@ -0,0 +1,103 @@
+import pytest
+from app.middleware.rate_limit import (
+    MemoryBackend, SQLiteBackend, limiter, parse_limit, sliding_window
+)
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def rate_limited(test_app):
+    """Enable rate limiting with small limits on a fresh in-memory backend."""
+    backend = limiter.backend
+    limiter.backend = MemoryBackend()
+    test_app.config.update(
+        RATE_LIMIT_ENABLED=True, RATE_LIMIT_AUTH_IP='5/60', RATE_LIMIT_AUTH_EMAIL='3/60'
+    )
+    yield
+    test_app.config['RATE_LIMIT_ENABLED'] = False
+    limiter.backend = backend
+
+
+def test_parse_limit():
+    assert parse_limit('10/60') == (10, 60)
+    assert parse_limit('5') == (5, 60)
+
+
+def test_sliding_window_weights_previous_window():
+    # 10 hits in the previous window, half of it still overlaps
+    allowed, state, _ = sliding_window((0, 10, 0), 90, limit=10, window=60)
+    assert allowed and state == (60, 1, 10)
+    # 10 * 0.5 + 5 = 10: the next hit is over the limit
+    allowed, _, retry_after = sliding_window((60, 5, 10), 90, limit=10, window=60)
+    assert not allowed
+    assert retry_after == 6
+    # Two windows later nothing is carried over
+    allowed, state, _ = sliding_window((0, 10, 0), 130, limit=10, window=60)
+    assert allowed and state == (120, 1, 0)
+
+
+@pytest.mark.parametrize('make_backend', [
+    lambda clock, tmp_path: MemoryBackend(clock=clock),
+    lambda clock, tmp_path: SQLiteBackend(str(tmp_path / 'limits.sqlite3'), clock=clock),
+], ids=['memory', 'sqlite'])
+def test_backend_limits_and_recovers(make_backend, tmp_path):
+    clock = FakeClock(0)
+    backend = make_backend(clock, tmp_path)
+    assert [backend.hit('k', 3, 60)[0] for _ in range(4)] == [True, True, True, False]
+    assert backend.hit('other', 3, 60)[0]
+    clock.now = 120
+    assert backend.hit('k', 3, 60)[0]
+
+
+def test_sqlite_backend_is_shared_between_instances(tmp_path):
+    path = str(tmp_path / 'limits.sqlite3')
+    first, second = SQLiteBackend(path), SQLiteBackend(path)
+    assert first.hit('k', 2, 60)[0]
+    assert second.hit('k', 2, 60)[0]
+    assert not first.hit('k', 2, 60)[0]
+
+
+def test_memory_backend_is_bounded():
+    backend = MemoryBackend(max_keys=100)
+    for i in range(1000):
+        backend.hit(f'key-{i}', 5, 60)
+    assert len(backend) == 100
+
+
+def test_login_rejected_by_email_before_password_check(client, create_user, rate_limited, monkeypatch):
+    create_user(email='user@example.com', password='password123')
+    checks = []
+    monkeypatch.setattr('app.models.user.verify_password', lambda *args: checks.append(args) or False)
+
+    statuses = [
+        client.post('/api/auth/login', json={'email': 'user@example.com', 'password': 'wrong'}).status_code
+        for _ in range(4)
+    ]
+
+    assert statuses == [401, 401, 401, 429]
+    assert len(checks) == 3
+
+
+def test_register_rejected_by_ip(client, rate_limited):
+    for i in range(5):
+        response = client.post('/api/auth/register', json={
+            'name': 'User', 'email': f'user{i}@example.com', 'password': 'password123'
+        })
+        assert response.status_code == 201
+
+    response = client.post('/api/auth/register', json={
+        'name': 'User', 'email': 'user5@example.com', 'password': 'password123'
+    })
+    assert response.status_code == 429
+    assert int(response.headers['Retry-After']) >= 1
+
+    # Limits are per endpoint
+    response = client.post('/api/auth/reset-password', json={'email': 'user0@example.com'})
+    assert response.status_code == 200
@@ -0,0 +1,101 @@
+import pytest
+from app import create_app, db
+from app.config.settings import DevelopmentConfig
+from app.models import Member, User
+
+
+@pytest.fixture
+def replica_app(tmp_path, monkeypatch):
+    primary = f"sqlite:///{tmp_path / 'primary.db'}"
+    replica = f"sqlite:///{tmp_path / 'replica.db'}"
+    monkeypatch.setattr(DevelopmentConfig, 'SQLALCHEMY_DATABASE_URI', primary)
+    monkeypatch.setattr(DevelopmentConfig, 'SQLALCHEMY_ENGINE_OPTIONS', {})
+    monkeypatch.setattr(DevelopmentConfig, 'SQLALCHEMY_BINDS', {'replica': replica})
+
+    app = create_app('development')
+    with app.app_context():
+        db.metadata.create_all(db.engines[None])
+        db.metadata.create_all(db.engines['replica'])
+    yield app
+    # The bind's metadata is registered on the shared extension; drop it so
+    # the session-wide test app does not look for a replica engine.
+    db.metadatas.pop('replica', None)
+
+
+def test_reporting_blueprints_read_from_replica(replica_app):
+    with replica_app.test_request_context('/api/reports/summary'):
+        assert db.session.get_bind() is db.engines['replica']
+
+    with replica_app.test_request_context('/api/admin/reports/members-activity'):
+        assert db.session.get_bind() is db.engines['replica']
+
+    with replica_app.test_request_context('/api/members'):
+        assert db.session.get_bind() is db.engines[None]
+
+    with replica_app.app_context():
+        assert db.session.get_bind() is db.engines[None]
+
+
+def test_writes_pin_the_session_to_primary(replica_app):
+    with replica_app.test_request_context('/api/reports/summary'):
+        db.session.add(Member(name='New', email='new@example.com'))
+        db.session.flush()
+        assert db.session.get_bind() is db.engines[None]
+        assert Member.query.filter_by(email='new@example.com').count() == 1
+        db.session.rollback()
+
+
+def test_report_endpoint_serves_replica_data(replica_app):
+    # Same admin on both databases; the member only exists on the replica
+    with replica_app.app_context():
+        for engine in (db.engines[None], db.engines['replica']):
+            with db.Session(bind=engine) as session:
+                admin = User(id='admin-1', name='Admin', email='admin@example.com', role='admin')
+                admin.set_password('password123')
+                session.add(admin)
+                session.commit()
+        with db.Session(bind=db.engines['replica']) as session:
+            session.add(Member(name='Replica Only', email='replica@example.com'))
+            session.commit()
+
+    client = replica_app.test_client()
+    resp = client.post('/api/auth/login', json={'email': 'admin@example.com', 'password': 'password123'})
+    headers = {'Authorization': f"Bearer {resp.get_json()['access_token']}"}
+
+    resp = client.get('/api/reports/membership', headers=headers)
+    assert resp.status_code == 200
+    assert resp.get_json()['active'] == 1
+
+
+def test_current_user_is_loaded_from_primary(replica_app):
+    from app.middleware.auth import resolve_user, user_cache
+    # The replica still has the user's old role
+    with replica_app.app_context():
+        for engine, role in ((db.engines[None], 'user'), (db.engines['replica'], 'admin')):
+            with db.Session(bind=engine) as session:
+                session.add(User(id='user-1', name='User', email='user@example.com', role=role, password='x'))
+                session.commit()
+
+    user_cache.invalidate('user-1')
+    with replica_app.test_request_context('/api/reports/summary'):
+        assert db.session.get_bind() is db.engines['replica']
+        assert resolve_user('user-1').role == 'user'
+        with db.session().using_primary():
+            assert db.session.get_bind() is db.engines[None]
+        assert db.session.get_bind() is db.engines['replica']
+    user_cache.invalidate('user-1')
+
+
+def test_token_denylist_syncs_from_primary(replica_app):
+    from datetime import datetime, timedelta
+    from app.middleware.auth import TokenDenylist
+    from app.models import RevokedToken
+    with replica_app.app_context():
+        with db.Session(bind=db.engines[None]) as session:
+            session.add(RevokedToken(jti='primary-only', expires_at=datetime.utcnow() + timedelta(minutes=5)))
+            session.commit()
+
+    denylist = TokenDenylist()
+    with replica_app.test_request_context('/api/reports/summary'):
+        denylist.sync()
+    assert 'primary-only' in denylist.tokens
@@ -0,0 +1,259 @@
+import os
+from datetime import datetime, timedelta
+import pytest
+import sqlalchemy as sa
+from sqlalchemy import event, func, text
+from sqlalchemy.dialects import postgresql
+from app import db
+from app.models import Attendance, AttendanceDaily, AttendanceHourly, AttendanceRollupVersion, Member
+from app.rollups import POSTGRES_DDL, TRIGGER, VERSION_SHARDS, _day_and_hour, install_rollup_triggers
+
+# A Postgres database the Postgres-only tests may drop and recreate tables in
+POSTGRES_URL = os.environ.get('TEST_POSTGRES_URL')
+
+
+def rollups(db):
+    daily = {(str(day), member_id): checkins for day, member_id, checkins in
+             db.session.query(AttendanceDaily.day, AttendanceDaily.member_id, AttendanceDaily.checkins)}
+    hourly = {hour: checkins for hour, checkins in
+              db.session.query(AttendanceHourly.hour, AttendanceHourly.checkins)}
+    return daily, hourly
+
+
+def from_attendances(db):
+    daily, hourly = {}, {}
+    for member_id, when in db.session.query(Attendance.member_id, Attendance.check_in_time):
+        key = (str(when.date()), member_id)
+        daily[key] = daily.get(key, 0) + 1
+        hour = when.replace(minute=0, second=0, microsecond=0)
+        hourly[hour] = hourly.get(hour, 0) + 1
+    return daily, hourly
+
+
+def test_every_write_path_keeps_rollups_in_step(client, create_member, db_session, admin_headers):
+    headers = admin_headers
+    alice, bob = create_member(), create_member()
+    yesterday = datetime.utcnow() - timedelta(days=1)
+
+    checked_in = client.post('/api/attendance/checkin', json={'member_id': alice.id}, headers=headers)
+    client.post('/api/attendance/checkin/batch', json=[
+        {'member_id': alice.id, 'check_in_time': yesterday.isoformat(), 'client_event_id': 'r-1'},
+        {'member_id': bob.id, 'check_in_time': yesterday.isoformat(), 'client_event_id': 'r-2'},
+    ], headers=headers)
+    old = Attendance(member_id=bob.id, check_in_time=datetime(2024, 1, 5, 7, 30))
+    db_session.session.add(old)
+    db_session.session.commit()
+    assert rollups(db_session) == from_attendances(db_session)
+    assert len(rollups(db_session)[0]) == 4
+
+    client.delete(f"/api/attendance/delete/{checked_in.get_json()['data']['id']}", headers=headers)
+    old.check_in_time = datetime(2024, 1, 6, 9)
+    db_session.session.commit()
+
+    daily, hourly = rollups(db_session)
+    assert (daily, hourly) == from_attendances(db_session)
+    assert ('2024-01-05', bob.id) not in daily
+    assert hourly[datetime(2024, 1, 6, 9)] == 1
+
+
+def test_rebuild_command(test_app, create_member, db_session):
+    member = create_member()
+    for day, hour in ((1, 8), (2, 9), (3, 9)):
+        db_session.session.add(Attendance(member_id=member.id, check_in_time=datetime(2024, 2, day, hour)))
+    db_session.session.commit()
+    db_session.session.execute(text('DELETE FROM attendance_daily'))
+    db_session.session.execute(text('UPDATE attendance_hourly SET checkins = 7'))
+    db_session.session.commit()
+
+    result = test_app.test_cli_runner().invoke(args=['rebuild-attendance-rollups'])
+
+    assert result.exit_code == 0
+    assert rollups(db_session) == from_attendances(db_session)
+
+
+def test_reports_read_the_rollups(client, create_member, db_session, admin_headers):
+    headers = admin_headers
+    alice, bob = create_member(), create_member()
+    db_session.session.add_all([
+        Attendance(member_id=alice.id, check_in_time=datetime(2024, 3, 1, 7, 15)),
+        Attendance(member_id=bob.id, check_in_time=datetime(2024, 3, 1, 18, 5)),
+        Attendance(member_id=alice.id, check_in_time=datetime(2024, 3, 2, 18, 40)),
+        Attendance(member_id=bob.id, check_in_time=datetime(2024, 3, 2, 18, 50)),
+        Attendance(member_id=bob.id, check_in_time=datetime(2024, 3, 4, 6)),
+    ])
+    db_session.session.commit()
+
+    report = client.get('/api/reports/attendance?startDate=2024-03-01T00:00:00Z&endDate=2024-03-02T12:00:00Z',
+                        headers=headers).get_json()
+    assert report == [
+        {'date': '2024-03-01', 'checkins': 2, 'uniqueMembers': 2, 'peakHour': 7},
+        {'date': '2024-03-02', 'checkins': 2, 'uniqueMembers': 2, 'peakHour': 18},
+    ]
+
+    summary = client.get('/api/reports/summary?startDate=2024-03-01T07:30:00Z&endDate=2024-03-02T18:00:00Z',
+                         headers=headers).get_json()
+    # Whole hours: 07:00 on the 1st through 18:59 on the 2nd
+    assert summary['totalCheckins'] == 4
+
+    # The counts come from the rollup rows, not from attendances
+    db_session.session.query(AttendanceHourly).filter(
+        AttendanceHourly.hour == datetime(2024, 3, 4, 6)).update({'checkins': 40})
+    db_session.session.commit()
+    summary = client.get('/api/reports/summary?startDate=2024-03-04T00:00:00Z', headers=headers).get_json()
+    assert summary['totalCheckins'] == 40
+    assert db_session.session.query(func.count(Attendance.id)).scalar() == 5
+
+
+def test_attendance_frequency_counts_whole_days(client, create_member, db_session, admin_headers):
+    headers = admin_headers
+    regular, casual = create_member(name='Regular'), create_member(name='Casual')
+    now = datetime.utcnow()
+    for days_ago in (0, 1, 2, 3):
+        db_session.session.add(Attendance(member_id=regular.id, check_in_time=now - timedelta(days=days_ago)))
+    db_session.session.add(Attendance(member_id=casual.id, check_in_time=now - timedelta(days=2)))
+    db_session.session.add(Attendance(member_id=casual.id, check_in_time=now - timedelta(days=30)))
+    db_session.session.commit()
+
+    data = client.get('/api/admin/reports/attendance-frequency?days=7', headers=headers).get_json()
+
+    assert data['totalCheckins'] == 5
+    assert [(m['memberName'], m['checkins']) for m in data['topMembers']] == [('Regular', 4), ('Casual', 1)]
+
+
+def test_report_etags_follow_the_rollup_version(client, create_member, db_session, admin_headers):
+    headers = admin_headers
+    member = create_member()
+    attendance = Attendance(member_id=member.id, check_in_time=datetime(2024, 3, 1, 7, 15))
+    db_session.session.add(attendance)
+    db_session.session.commit()
+
+    def etag():
+        resp = client.get('/api/reports/attendance', headers=headers)
+        assert client.get('/api/reports/attendance', headers={
+            **headers, 'If-None-Match': resp.headers['ETag']}).status_code == 304
+        return resp.headers['ETag']
+
+    seen = [etag()]
+    attendance.check_in_time = datetime(2024, 3, 2, 9)
+    db_session.session.commit()
+    seen.append(etag())
+    db_session.session.delete(attendance)
+    db_session.session.commit()
+    seen.append(etag())
+    assert len(set(seen)) == 3
+
+    # The version is one row; attendances is not read
+    statements = []
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+    engine = db_session.engine
+    event.listen(engine, 'before_cursor_execute', record)
+    try:
+        client.get('/api/reports/attendance', headers={**headers, 'If-None-Match': seen[-1]})
+    finally:
+        event.remove(engine, 'before_cursor_execute', record)
+    assert statements and not any('attendances' in s for s in statements)
+
+
+def test_report_etag_sums_the_version_shards(client, create_member, db_session, admin_headers):
+    db_session.session.add(Attendance(member_id=create_member().id, check_in_time=datetime(2024, 3, 1, 7)))
+    db_session.session.add(AttendanceRollupVersion(id=5, version=100))
+    db_session.session.commit()
+    before = client.get('/api/reports/attendance', headers=admin_headers).headers['ETag']
+
+    # A bump in a shard below the largest still changes the ETag
+    db_session.session.get(AttendanceRollupVersion, 0).version += 1
+    db_session.session.commit()
+    after = client.get('/api/reports/attendance', headers=admin_headers).headers['ETag']
+    assert after != before
+
+
+def test_postgres_ddl_buckets_like_the_rebuild():
+    function, version_function, drop, create, drop_version, create_version = POSTGRES_DDL
+    assert 'AFTER INSERT OR DELETE OR UPDATE OF check_in_time, member_id' in create
+    assert f'FOR EACH ROW EXECUTE FUNCTION {TRIGGER}()' in create
+    # The version is bumped once per statement, in a row picked per transaction
+    assert 'attendance_rollup_version' not in function
+    assert 'AFTER INSERT OR DELETE OR UPDATE OF check_in_time, member_id' in create_version
+    assert f'FOR EACH STATEMENT EXECUTE FUNCTION {TRIGGER}_version()' in create_version
+    assert f'VALUES (txid_current() % {VERSION_SHARDS}, 1)' in version_function
+
+    # The trigger removes OLD and adds NEW with the day/hour the rebuild groups by
+    day, hour = _day_and_hour('postgresql', sa.column('check_in_time'))
+    day, hour = (str(expr.compile(dialect=postgresql.dialect(), compile_kwargs={'literal_binds': True}))
+                 for expr in (day, hour))
+    assert (day, hour) == ('CAST(check_in_time AS DATE)', "date_trunc('hour', check_in_time)")
+    for row in ('OLD', 'NEW'):
+        assert f'{row}.check_in_time::date' in function
+        assert f"date_trunc('hour', {row}.check_in_time)" in function
+    assert function.index("IF TG_OP IN ('DELETE', 'UPDATE')") < function.index("IF TG_OP IN ('INSERT', 'UPDATE')")
+
+
+@pytest.mark.postgres
+@pytest.mark.skipif(not POSTGRES_URL, reason='TEST_POSTGRES_URL is not set')
+def test_postgres_triggers_and_bootstrap_rebuild():
+    engine = sa.create_engine(POSTGRES_URL)
+    attendances = Attendance.__table__
+    db.metadata.drop_all(engine)
+
+    def check(conn):
+        expected_daily, expected_hourly = {}, {}
+        for member_id, when in conn.execute(sa.select(attendances.c.member_id, attendances.c.check_in_time)):
+            key = (when.date(), member_id)
+            expected_daily[key] = expected_daily.get(key, 0) + 1
+            hour = when.replace(minute=0, second=0, microsecond=0)
+            expected_hourly[hour] = expected_hourly.get(hour, 0) + 1
+        daily = {(d, m): c for d, m, c in conn.execute(sa.select(AttendanceDaily.__table__))}
+        hourly = dict(conn.execute(sa.select(AttendanceHourly.__table__)).all())
+        assert (daily, hourly) == (expected_daily, expected_hourly)
+        return conn.execute(sa.select(sa.func.sum(AttendanceRollupVersion.version))).scalar()
+
+    def add(conn, member_id, when):
+        return conn.execute(attendances.insert().values(member_id=member_id, check_in_time=when)
+                            .returning(attendances.c.id)).scalar()
+
+    try:
+        # create_all installs the trigger (the bootstrap-db path)
+        db.metadata.create_all(engine)
+        with engine.begin() as conn:
+            alice, bob = (conn.execute(Member.__table__.insert().values(name=name, email=f'{name}@example.com')
+                                       .returning(Member.__table__.c.id)).scalar() for name in ('alice', 'bob'))
+            add(conn, alice, datetime(2024, 3, 1, 7, 15))
+            moved = add(conn, bob, datetime(2024, 3, 1, 7, 45))
+            gone = add(conn, alice, datetime(2024, 3, 2, 18))
+            inserted = check(conn)
+
+            conn.execute(attendances.delete().where(attendances.c.id == gone))
+            deleted = check(conn)
+            # To another day and hour: both rollups move the count
+            conn.execute(attendances.update().where(attendances.c.id == moved).values(
+                check_in_time=datetime(2024, 3, 3, 9, 5), check_in_date=datetime(2024, 3, 3).date()))
+            updated = check(conn)
+            assert inserted < deleted < updated
+            assert conn.execute(sa.select(AttendanceHourly.checkins).where(
+                AttendanceHourly.hour == datetime(2024, 3, 1, 7))).scalar() == 1
+
+        # Check-ins in other hours do not wait on an open check-in
+        # transaction, whichever version row it bumped
+        with engine.connect() as first, engine.connect() as second:
+            add(first, alice, datetime(2024, 3, 5, 7))
+            second.exec_driver_sql("SET lock_timeout = '2s'")
+            add(second, bob, datetime(2024, 3, 5, 8))
+            second.commit()
+            first.commit()
+        with engine.begin() as conn:
+            check(conn)
+
+        # A database with check-ins from before the trigger: installing it
+        # locks attendances and rebuilds
+        with engine.begin() as conn:
+            conn.exec_driver_sql(f'DROP TRIGGER {TRIGGER}_version ON attendances')
+            conn.exec_driver_sql(f'DROP TRIGGER {TRIGGER} ON attendances')
+            add(conn, bob, datetime(2024, 3, 4, 6))
+            conn.execute(AttendanceDaily.__table__.delete())
+            assert install_rollup_triggers(conn) is True
+            assert install_rollup_triggers(conn) is False
+            check(conn)
+    finally:
+        db.metadata.drop_all(engine)
+        engine.dispose()
@@ -0,0 +1,69 @@
+import importlib.util
+import os
+import runpy
+import pytest
+from app import create_app
+from app.config.settings import ProductionConfig, config
+from app.config.serving import serving_profile
+
+
+class Settings(ProductionConfig):
+    GUNICORN_WORKERS = 0
+    GUNICORN_THREADS = 0
+    GUNICORN_MAX_WORKERS = 8
+
+
+def make_settings(**overrides):
+    return type('TestSettings', (Settings,), overrides)
+
+
+@pytest.mark.parametrize('worker_class, workers, threads', [
+    ('sync', 5, 1),
+    ('gthread', 3, 4),
+    ('gevent', 2, 1),
+])
+def test_auto_sizing_from_cpu_count(worker_class, workers, threads):
+    profile = serving_profile(make_settings(GUNICORN_WORKER_CLASS=worker_class), cpus=2)
+    assert profile['worker_class'] == worker_class
+    assert profile['workers'] == workers
+    assert profile['threads'] == threads
+
+
+def test_workers_capped_and_overridable():
+    profile = serving_profile(make_settings(GUNICORN_WORKER_CLASS='sync'), cpus=16)
+    assert profile['workers'] == 8
+
+    profile = serving_profile(
+        make_settings(GUNICORN_WORKER_CLASS='gthread', GUNICORN_WORKERS=2, GUNICORN_THREADS=16), cpus=16)
+    assert (profile['workers'], profile['threads']) == (2, 16)
+
+
+def test_max_requests_jitter_disabled_without_recycling():
+    profile = serving_profile(make_settings(GUNICORN_WORKER_CLASS='sync', GUNICORN_MAX_REQUESTS=0), cpus=1)
+    assert profile['max_requests'] == 0
+    assert profile['max_requests_jitter'] == 0
+
+
+def test_unknown_worker_class_rejected():
+    with pytest.raises(ValueError):
+        serving_profile(make_settings(GUNICORN_WORKER_CLASS='eventlet'), cpus=1)
+
+
+GUNICORN_CONF = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'gunicorn.conf.py')
+
+
+def test_gunicorn_conf_falls_back_to_default_config(monkeypatch):
+    monkeypatch.setenv('FLASK_ENV', 'staging')
+    monkeypatch.delenv('GUNICORN_WORKER_CLASS', raising=False)
+    settings = runpy.run_path(GUNICORN_CONF)
+    assert settings['_settings'] is config['default']
+    assert create_app('staging').config['DEBUG'] == config['default'].DEBUG
+
+
+def test_gunicorn_conf_names_missing_gevent_packages(monkeypatch):
+    monkeypatch.setenv('GUNICORN_WORKER_CLASS', 'gevent')
+    find_spec = importlib.util.find_spec
+    monkeypatch.setattr(importlib.util, 'find_spec',
+                        lambda name, *args: None if name == 'psycogreen' else find_spec(name, *args))
+    with pytest.raises(RuntimeError, match=r'needs psycogreen: pip install -r requirements-gevent.txt'):
+        runpy.run_path(GUNICORN_CONF)
@@ -0,0 +1,45 @@
+from datetime import datetime, timedelta
+from app.models import PasswordResetToken, RevokedToken
+from app.sweeper import start_sweeper, sweep_expired
+
+
+def test_sweep_deletes_expired_and_used_rows_in_chunks(create_user, db_session):
+    user = create_user()
+    past = timedelta(minutes=-5)
+    for _ in range(5):
+        PasswordResetToken.issue(user.id, ttl=past)
+    live = PasswordResetToken.issue(user.id)
+    used = PasswordResetToken.issue(user.id)
+    db_session.session.add_all([
+        RevokedToken(jti=f'expired-{i}', expires_at=datetime.utcnow() + past) for i in range(3)
+    ])
+    db_session.session.add(RevokedToken(jti='live', expires_at=datetime.utcnow() + timedelta(hours=1)))
+    db_session.session.commit()
+    PasswordResetToken.redeem(used)
+    db_session.session.commit()
+
+    deleted = sweep_expired(chunk_size=2)
+
+    assert deleted == {'password_reset_tokens': 6, 'revoked_tokens': 3}
+    assert PasswordResetToken.redeem(live) == user.id
+    assert [jti for (jti,) in db_session.session.query(RevokedToken.jti)] == ['live']
+
+
+def test_sweeper_disabled_with_zero_interval(test_app):
+    interval = test_app.config['SWEEPER_INTERVAL_SECONDS']
+    test_app.config['SWEEPER_INTERVAL_SECONDS'] = 0
+    try:
+        assert start_sweeper(test_app) is None
+    finally:
+        test_app.config['SWEEPER_INTERVAL_SECONDS'] = interval
+
+
+def test_sweep_expired_command(test_app, create_user, db_session):
+    user = create_user()
+    PasswordResetToken.issue(user.id, ttl=timedelta(minutes=-1))
+    db_session.session.commit()
+
+    result = test_app.test_cli_runner().invoke(args=['sweep-expired'])
+
+    assert result.exit_code == 0
+    assert 'password_reset_tokens: 1 rows deleted' in result.output